@@ -4,8 +4,14 @@ import mysql.connector
 import requests
 import time
 from datetime import datetime
+import os
+import sys
 import password
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from rate_governor import print_governor_report
+from http_client import http_get, print_connection_report
+
 # Country names mapping
 COUNTRY_NAMES = {
     "ad": "Andorra", "ae": "United Arab Emirates", "al": "Albania", "ar": "Argentina", "at": "Austria", "au": "Australia",
@@ -45,7 +51,8 @@ def fetch_data(url, retries=3, delay=2):
     """Fetch JSON from API with retry mechanism."""
     for attempt in range(1, retries + 1):
         try:
-            r = requests.get(url, timeout=10)
+            # Paced (and 429-retried) by the host's adaptive rate governor
+            r = http_get(url, timeout=10)
             r.raise_for_status()
             return r.json()
         except requests.exceptions.RequestException as e:
@@ -102,10 +109,11 @@ def fetch_and_save():
 
         conn.commit()
         print(f"[OK] Inserted {len(items)} rows for {code}")
-        time.sleep(1)  # <-- slow down to 1 req/sec
 
     cur.close()
     conn.close()
+    print_governor_report()
+    print_connection_report()
 
 if __name__ == "__main__":
     fetch_and_save()
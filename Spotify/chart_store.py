@@ -0,0 +1,195 @@
+# Columnar snapshot store for Spotify chart history (Parquet, partitioned by date/region/category)
+import argparse
+import os
+import uuid
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import quote, unquote
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+DEFAULT_STORE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "chart_store")
+PARTITION_KEYS = ("date", "region", "category")
+
+# Show/episode IDs and the rank-move strings repeat across snapshots, so they are dictionary-encoded
+CHART_SCHEMA = pa.schema([
+    ("snapshot_time", pa.timestamp("s")),
+    ("rank", pa.int16()),
+    ("show_id", pa.dictionary(pa.int32(), pa.string())),
+    ("episode_id", pa.dictionary(pa.int32(), pa.string())),
+    ("show_name", pa.string()),
+    ("episode_name", pa.string()),
+    ("publisher", pa.string()),
+    ("image_url", pa.string()),
+    ("description", pa.string()),
+    ("chart_rank_move", pa.dictionary(pa.int32(), pa.string())),
+])
+
+# Partition values are strings; ISO dates still compare correctly
+PARTITIONING = ds.partitioning(pa.schema([(key, pa.string()) for key in PARTITION_KEYS]), flavor="hive")
+
+# CSV header (storing_in_csv scripts) -> store column
+CSV_COLUMNS = {
+    "Rank": "rank", "ShowID": "show_id", "EpisodeID": "episode_id", "ShowName": "show_name",
+    "EpisodeName": "episode_name", "Publisher": "publisher", "ImageURL": "image_url",
+    "Description": "description", "ChartRankMove": "chart_rank_move",
+}
+
+
+def category_label(category: str) -> str:
+    """Readable form of an API category: 'health%252520%2526%252520fitness' -> 'health & fitness'"""
+    previous = None
+    while previous != category:
+        previous, category = category, unquote(category)
+    return category
+
+
+def _uri_id(uri: str) -> str:
+    return uri.split(":")[-1] if uri else ""
+
+
+def chart_columns(items: List[Dict]) -> Dict[str, list]:
+    """Columns for one chart from the podcastcharts.byspotify.com items (rank = position)"""
+    return {
+        "rank": list(range(1, len(items) + 1)),
+        "show_id": [_uri_id(item.get("showUri", "")) for item in items],
+        "episode_id": [_uri_id(item.get("episodeUri", "")) for item in items],
+        "show_name": [item.get("showName", "") for item in items],
+        "episode_name": [item.get("episodeName", "") for item in items],
+        "publisher": [item.get("showPublisher", "") for item in items],
+        "image_url": [item.get("showImageUrl", "") for item in items],
+        "description": [item.get("showDescription", "") for item in items],
+        "chart_rank_move": [str(item.get("chartRankMove", "")) for item in items],
+    }
+
+
+class ChartStore:
+    """Append-only Parquet dataset of chart snapshots.
+
+    Every chart fetched is written as its own small file under
+    ``date=YYYY-MM-DD/region=xx/category=...``, so a write never touches
+    existing data. Reads filter on the partition keys first, which means
+    asking for one region's history only opens that region's files.
+    """
+
+    def __init__(self, root: str = DEFAULT_STORE_PATH):
+        self.root = root
+
+    def partition_dir(self, day: str, region: str, category: str) -> str:
+        return os.path.join(self.root, f"date={day}", f"region={quote(region, safe='')}",
+                            f"category={quote(category_label(category), safe='')}")
+
+    def _write(self, region: str, category: str, snapshot_time: datetime, columns: Dict[str, list]) -> str:
+        rows = len(columns["rank"])
+        columns = dict(columns, snapshot_time=[snapshot_time.replace(microsecond=0)] * rows)
+        table = pa.Table.from_pydict({name: columns[name] for name in CHART_SCHEMA.names}, schema=CHART_SCHEMA)
+
+        directory = self.partition_dir(snapshot_time.date().isoformat(), region, category)
+        os.makedirs(directory, exist_ok=True)
+        name = f"part-{snapshot_time:%H%M%S}-{uuid.uuid4().hex[:8]}.parquet"
+        path = os.path.join(directory, name)
+        # Dot-prefixed while being written, so readers never pick up a partial file
+        tmp_path = os.path.join(directory, f".{name}.tmp")
+        pq.write_table(table, tmp_path, compression="zstd")
+        os.replace(tmp_path, path)
+        return path
+
+    def append(self, region: str, category: str, items: List[Dict],
+               snapshot_time: Optional[datetime] = None) -> Optional[str]:
+        """Store one fetched chart; returns the file written (None for an empty chart)"""
+        if not items:
+            return None
+        return self._write(region, category, snapshot_time or datetime.now(), chart_columns(items))
+
+    def import_csv(self, csv_path: str, snapshot_time: datetime) -> int:
+        """Backfill a day from a storing_in_csv output file; returns the number of rows stored"""
+        frame = pd.read_csv(csv_path, dtype=str, keep_default_na=False)
+        for column in CSV_COLUMNS:
+            if column not in frame:
+                frame[column] = ""
+        frame = frame.rename(columns=CSV_COLUMNS)
+        frame["rank"] = frame["rank"].astype(int)
+        for (region, category), chart in frame.groupby(["Region", "Category"], sort=False):
+            self._write(region, category, snapshot_time,
+                        {name: chart[name].tolist() for name in CSV_COLUMNS.values()})
+        return len(frame)
+
+    def dataset(self) -> Optional[ds.Dataset]:
+        if not os.path.isdir(self.root):
+            return None
+        return ds.dataset(self.root, format="parquet", partitioning=PARTITIONING)
+
+    def read(self, start: Optional[str] = None, end: Optional[str] = None,
+             regions: Optional[Iterable[str]] = None, categories: Optional[Iterable[str]] = None,
+             columns: Optional[List[str]] = None) -> pa.Table:
+        """Rows of the snapshots between two ISO dates (inclusive), pruned by partition first"""
+        dataset = self.dataset()
+        if dataset is None:
+            return CHART_SCHEMA.empty_table()
+
+        condition = None
+        for expression in (
+            ds.field("date") >= start if start else None,
+            ds.field("date") <= end if end else None,
+            ds.field("region").isin(list(regions)) if regions is not None else None,
+            ds.field("category").isin([category_label(c) for c in categories]) if categories is not None else None,
+        ):
+            if expression is not None:
+                condition = expression if condition is None else condition & expression
+        return dataset.to_table(columns=columns, filter=condition)
+
+    def snapshot(self, day: str, regions: Optional[Iterable[str]] = None,
+                 categories: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """The last chart of each region/category stored on a given day"""
+        frame = self.read(day, day, regions, categories).to_pandas()
+        if frame.empty:
+            return frame
+        latest = frame.groupby(["region", "category"], observed=True)["snapshot_time"].transform("max")
+        return frame[frame["snapshot_time"] == latest].reset_index(drop=True)
+
+    def dates(self) -> List[str]:
+        """Days that have at least one snapshot, from the directory names alone"""
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name.split("=", 1)[1] for name in os.listdir(self.root) if name.startswith("date="))
+
+    def print_summary(self) -> None:
+        dataset = self.dataset()
+        days = self.dates()
+        if dataset is None or not days:
+            print(f"📭 Chart store {self.root} is empty")
+            return
+        files = dataset.files
+        size = sum(os.path.getsize(path) for path in files)
+        print(f"📦 Chart store {self.root}: {len(days)} days ({days[0]} .. {days[-1]}), "
+              f"{len(files)} files, {dataset.count_rows()} rows, {size / (1024 * 1024):.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the Parquet store of Spotify chart snapshots")
+    parser.add_argument("--store", default=DEFAULT_STORE_PATH, help="Store directory")
+    parser.add_argument("--import-csv", nargs="*", default=[], help="storing_in_csv outputs to backfill")
+    parser.add_argument("--date", default=date.today().isoformat(),
+                        help="Snapshot date (YYYY-MM-DD) for --import-csv")
+    parser.add_argument("--region", help="Print this region's chart history")
+    parser.add_argument("--category", default="top", help="Category for --region")
+    args = parser.parse_args()
+
+    store = ChartStore(args.store)
+    snapshot_time = datetime.fromisoformat(args.date)
+    for csv_path in args.import_csv:
+        rows = store.import_csv(csv_path, snapshot_time)
+        print(f"➕ Imported {rows} rows from {csv_path} as {args.date}")
+
+    if args.region:
+        history = store.read(regions=[args.region], categories=[args.category],
+                             columns=["date", "rank", "show_id", "show_name"]).to_pandas()
+        print(history.sort_values(["date", "rank"]).to_string(index=False))
+    store.print_summary()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+# Vectorized rank-movement engine over chart snapshots (pairs of CSVs or the Parquet chart store)
+import argparse
+import os
+import time
+from typing import Iterable, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+from chart_store import ChartStore
+
+# One chart entry: episodes are told apart by episode_id, shows have an empty one
+KEY_COLUMNS = ["region", "category", "show_id", "episode_id"]
+CHART_COLUMNS = ["region", "category"]
+MOVEMENTS = np.array(["NEW", "UP", "DOWN", "SAME", "DOWN_OUT"], dtype=object)
+NEW, UP, DOWN, SAME, DOWN_OUT = range(5)
+
+
+def rank_movements(snapshots: pd.DataFrame) -> pd.DataFrame:
+    """Movement of every chart entry between consecutive snapshots of its chart, in one pass.
+
+    ``snapshots`` has one row per entry per snapshot with KEY_COLUMNS,
+    ``date`` (anything that sorts) and ``rank``; other columns are carried
+    along. Rows are sorted by (entry, snapshot) once, so each entry is
+    compared with its neighbour instead of being looked up in a dict.
+
+    The earliest date is the baseline and produces no rows. Every later
+    snapshot yields NEW/UP/DOWN/SAME for the entries it contains and a
+    DOWN_OUT row for each entry that was in the chart's previous snapshot
+    but not in this one (ranked after the chart's last entry).
+    """
+    frame = snapshots.reset_index(drop=True)
+    frame["episode_id"] = frame["episode_id"].fillna("").astype(str)
+    if frame.empty:
+        return frame.assign(previous_rank=pd.Series(dtype="Int64"), rank_change=pd.Series(dtype="Int64"),
+                            movement=pd.Series(dtype=object))
+
+    day = pd.factorize(frame["date"], sort=True)[0]
+    chart = frame.groupby(CHART_COLUMNS, sort=False, observed=True).ngroup().to_numpy()
+    entry = frame.groupby(KEY_COLUMNS, sort=False, observed=True).ngroup().to_numpy()
+    # Position of each snapshot within its own chart (charts can miss a day)
+    seq = pd.Series(day).groupby(chart).rank(method="dense").to_numpy(np.int64) - 1
+    last_seq = np.zeros(chart.max() + 1, dtype=np.int64)
+    np.maximum.at(last_seq, chart, seq)
+    rank = frame["rank"].to_numpy(np.int64)
+
+    order = np.lexsort((seq, entry))
+    e, s, c, r, d = entry[order], seq[order], chart[order], rank[order], day[order]
+    same_prev = np.r_[False, e[1:] == e[:-1]] & (np.r_[-2, s[:-1]] == s - 1)
+    same_next = np.r_[e[1:] == e[:-1], False] & (np.r_[s[1:], -2] == s + 1)
+    prev_rank = np.r_[0, r[:-1]]
+
+    # Entries present in a snapshot after the baseline
+    present = d > 0
+    movement = np.select(
+        [~same_prev, prev_rank > r, prev_rank < r],
+        [NEW, UP, DOWN],
+        SAME,
+    )
+    current = frame.iloc[order[present]].copy()
+    current["previous_rank"] = pd.array(np.where(same_prev, prev_rank, 0)[present], dtype="Int64")
+    current.loc[~same_prev[present], "previous_rank"] = pd.NA
+    current["movement"] = MOVEMENTS[movement[present]]
+
+    # Entries that the chart's next snapshot no longer contains
+    dropped = ~same_next & (s < last_seq[c])
+    gone = frame.iloc[order[dropped]].copy()
+    if len(gone):
+        # Date of the chart's next snapshot, looked up by (chart, seq + 1)
+        width = int(seq.max()) + 2
+        date_of = np.empty(last_seq.size * width, dtype=object)
+        date_of[chart * width + seq] = frame["date"].to_numpy(dtype=object)
+        gone["date"] = date_of[c[dropped] * width + s[dropped] + 1]
+        gone["previous_rank"] = pd.array(r[dropped], dtype="Int64")
+        gone["movement"] = MOVEMENTS[DOWN_OUT]
+
+        # Rank drop-outs after the last entry of that snapshot, in their previous order
+        keys = CHART_COLUMNS + ["date"]
+        last_rank = current.groupby(keys)["rank"].max().rename("last_rank")
+        gone = gone.sort_values("previous_rank", kind="stable")
+        gone["rank"] = (gone.join(last_rank, on=keys)["last_rank"].fillna(0).astype(np.int64)
+                        + gone.groupby(keys).cumcount() + 1)
+
+    result = pd.concat([current, gone], ignore_index=True)
+    result["rank"] = result["rank"].astype("Int64")
+    result["rank_change"] = result["previous_rank"] - result["rank"]
+    result.loc[result["movement"] == MOVEMENTS[DOWN_OUT], "rank_change"] = pd.NA
+    return result.sort_values(["date"] + CHART_COLUMNS + ["rank"], kind="stable").reset_index(drop=True)
+
+
+def compare_snapshots(old: pd.DataFrame, new: pd.DataFrame) -> pd.DataFrame:
+    """Movements from one snapshot to the next (both with KEY_COLUMNS and rank)"""
+    both = pd.concat([old.assign(date=0), new.assign(date=1)], ignore_index=True)
+    return rank_movements(both).drop(columns="date")
+
+
+def movement_history(store: ChartStore, start: str, end: str, regions: Optional[Iterable[str]] = None,
+                     categories: Optional[Iterable[str]] = None) -> Iterator[pd.DataFrame]:
+    """Daily movements between two dates, one region at a time so memory stays at one region's history.
+
+    ``start`` is the baseline day; each day uses the last snapshot stored
+    for it.
+    """
+    if regions is None:
+        regions = sorted(set(store.read(start, end, columns=["region"]).column("region").to_pylist()))
+    for region in regions:
+        frame = store.read(start, end, [region], categories).to_pandas()
+        if frame.empty:
+            continue
+        latest = frame.groupby(["date", "category"], observed=True)["snapshot_time"].transform("max")
+        frame = frame[frame["snapshot_time"] == latest]
+        for column in KEY_COLUMNS:
+            frame[column] = frame[column].astype(str)
+        yield rank_movements(frame)
+
+
+def print_movement_summary(movements: pd.DataFrame) -> None:
+    counts = movements["movement"].value_counts()
+    print("📈 " + ", ".join(f"{name}: {counts.get(name, 0)}" for name in MOVEMENTS))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rank movements (NEW/UP/DOWN/SAME/DOWN_OUT) from the chart store")
+    parser.add_argument("--start", required=True, help="Baseline date (YYYY-MM-DD)")
+    parser.add_argument("--end", required=True, help="Last date (YYYY-MM-DD)")
+    parser.add_argument("--region", action="append", help="Region(s) to include (default: all)")
+    parser.add_argument("--category", action="append", help="Category(s) to include (default: all)")
+    parser.add_argument("--store", default=None, help="Chart store directory")
+    parser.add_argument("--output", default="rank_movements.csv")
+    args = parser.parse_args()
+
+    store = ChartStore(args.store) if args.store else ChartStore()
+    start_time = time.time()
+    rows = 0
+    if os.path.exists(args.output):
+        os.remove(args.output)
+    for movements in movement_history(store, args.start, args.end, args.region, args.category):
+        movements.to_csv(args.output, mode="a", header=rows == 0, index=False)
+        rows += len(movements)
+        print(f"✅ {movements['region'].iloc[0]}: {len(movements)} movements")
+        print_movement_summary(movements)
+    print(f"💾 Saved {rows} rows to {args.output} in {time.time() - start_time:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
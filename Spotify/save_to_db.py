@@ -1,9 +1,14 @@
 # using same table to store all data about countries with and without categories
 import mysql.connector
-import requests
 from datetime import datetime
 import password
 import time
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from rate_governor import print_governor_report
+from http_client import http_get, print_connection_report
 
 # Country mapping
 COUNTRY_NAMES = {
@@ -52,7 +57,7 @@ CATEGORIES_3 = ["top", "trending", "top_episodes"]
 def fetch_items_with_retry(url, retries=3, delay=5):
     for attempt in range(retries):
         try:
-            r = requests.get(url, timeout=10)
+            r = http_get(url, timeout=10)
             r.raise_for_status()
             data = r.json()
             if isinstance(data, dict):
@@ -118,6 +123,8 @@ def fetch_and_save():
 
     cur.close()
     conn.close()
+    print_governor_report()
+    print_connection_report()
 
 if __name__ == "__main__":
     fetch_and_save()
@@ -1,7 +1,14 @@
 from collections import defaultdict
-import requests
 import csv
-import time
+import os
+from datetime import datetime
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from rate_governor import print_governor_report
+from http_client import http_get, print_connection_report
+from chart_store import ChartStore
 
 # List of ISO 3166-1 alpha-2 country codes
 # Has three categories only - top podcasts, trending podcasts, top episodes
@@ -50,7 +57,7 @@ def fetch_charts(country, category):
     url = f"https://podcastcharts.byspotify.com/api/charts/{category}?region={country}"
     print(f"[INFO] Fetching {country.upper()} - {category} → {url}")
     try:
-        r = requests.get(url, timeout=10)
+        r = http_get(url, timeout=10)
         r.raise_for_status()
         items = r.json()
         if isinstance(items, dict):
@@ -75,6 +82,10 @@ def main():
     region_category_counts = defaultdict(int)
 
     failed_requests = []
+
+    # Every chart is also appended to the Parquet history, all under one snapshot time
+    store = ChartStore()
+    snapshot_time = datetime.now()
     
     # Combine all countries and process in sorted order
     for country in sorted(set( Three + Seventeen)):
@@ -90,6 +101,7 @@ def main():
                 print(f"[ERROR] Failed or empty data for {country.upper()} - {category}")
                 failed_requests.append((country, category))
                 continue
+            store.append(country, category, items, snapshot_time)
 
             for idx, item in enumerate(items, start=1):
                 show_uri = item.get("showUri", "")
@@ -111,7 +123,6 @@ def main():
                     unique_show_ids.add(show_id)
 
             region_category_counts[(country, category)] = len(items)
-            time.sleep(0.5)  # avoid hammering the server
 
     if failed_requests:
         print(f"\n[INFO] Retrying {len(failed_requests)} failed requests...\n")
@@ -124,6 +135,7 @@ def main():
             print(f"[ERROR] Retry failed for {country.upper()} - {category}")
             retry_failed.append((country, category))
             continue
+        store.append(country, category, items, snapshot_time)
 
         for idx, item in enumerate(items, start=1):
             show_uri = item.get("showUri", "")
@@ -145,7 +157,6 @@ def main():
                 unique_show_ids.add(show_id)
 
         region_category_counts[(country, category)] = region_category_counts.get((country, category), 0) + len(items)
-        time.sleep(0.5)
 
     if retry_failed:
         print(f"\n[ERROR] These requests failed even after retry:")
@@ -154,6 +165,8 @@ def main():
 
 
     save_to_csv(all_rows)
+    print_governor_report()
+    print_connection_report()
 
     print(f"\n[DONE] Saved {len(all_rows)} rows to spotify_podcast_charts_by_website.csv")
     print(f"[SUMMARY] Total entries: {len(all_rows)}")
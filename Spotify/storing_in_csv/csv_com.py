@@ -1,89 +1,47 @@
 # comparison with top episodes
-import csv
+import os
+import sys
+
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from rank_movement import compare_snapshots, print_movement_summary
 
 # File paths
 old_file = "13_08_with_top_episodes.csv"                         # yesterday's data
 new_file = "14_08_with_top_episodes.csv"                             # today's data
 output_file = "14_08_rank_changes.csv"
-all_columns = set()
-# Read yesterday's data into a dictionary with dynamic keys
-old_data = {}
-with open(old_file, newline='', encoding="utf-8") as f:
-    reader = csv.DictReader(f)
-    for row in reader:
-        all_columns.update(row.keys())
-        if row["Category"] == "top_episodes":
-            key = (row["Region"], row["Category"], row["ShowID"], row["EpisodeID"])
-        else:
-            key = (row["Region"], row["Category"], row["ShowID"])
-        old_data[key] = int(row["Rank"])
 
-# Read today's data and calculate movement
-new_data = []
-with open(new_file, newline='', encoding="utf-8") as f:
-    reader = csv.DictReader(f)
-    for row in reader:
-        all_columns.update(row.keys())
-        if row["Category"] == "top_episodes":
-            key = (row["Region"], row["Category"], row["ShowID"], row["EpisodeID"])
-        else:
-            key = (row["Region"], row["Category"], row["ShowID"])
-        today_rank = int(row["Rank"])
-        yesterday_rank = old_data.get(key)
+# CSV header -> engine key column; episodes are keyed by EpisodeID, shows by an empty one
+KEY_NAMES = {"Region": "region", "Category": "category", "ShowID": "show_id", "EpisodeID": "episode_id", "Rank": "rank"}
+fieldnames = ["Region", "Category", "Rank", "ShowName", "Publisher", "ImageURL", "Description",
+              "ChartRankMove", "ShowID", "EpisodeID", "EpisodeName", "Movement"]
+
 
-        # Determine movement
-        if yesterday_rank is None:
-            movement = "NEW"
-        else:
-            diff = yesterday_rank - today_rank
-            if diff > 0:
-                movement = f"+{diff}"
-            elif diff < 0:
-                movement = f"{diff}"
-            else:
-                movement = "0"
+def read_snapshot(path):
+    frame = pd.read_csv(path, dtype=str, keep_default_na=False)
+    for column in fieldnames:
+        if column not in frame:
+            frame[column] = ""
+    frame = frame.rename(columns=KEY_NAMES)
+    frame["rank"] = frame["rank"].astype(int)
+    return frame
 
-        row["ChartRankMove"] = movement
-        new_data.append(row)
 
-# Check for items that dropped out
-max_rank_today = max(int(row["Rank"]) for row in new_data)
-dropped_out_count = 0
-existing_keys_today = set()
-for row in new_data:
-    if row["Category"] == "top_episodes":
-        existing_keys_today.add((row["Region"], row["Category"], row["ShowID"], row["EpisodeID"], row["EpisodeName"]))
-    else:
-        existing_keys_today.add((row["Region"], row["Category"], row["ShowID"]))
+def chart_rank_move(changes):
+    """Old ChartRankMove text: NEW / DOWN_OUT / signed rank difference"""
+    diff = changes["rank_change"]
+    text = diff.astype(str)
+    text = text.where(~diff.gt(0).fillna(False), "+" + text)
+    fixed = changes["movement"].isin(["NEW", "DOWN_OUT"])
+    return text.where(~fixed, changes["movement"])
 
-for key, yesterday_rank in old_data.items():
-    if key not in existing_keys_today:
-        dropped_out_count += 1
-        if len(key) == 4:  # top_episodes
-            region, category, show_id, episode_id = key
-        else:
-            region, category, show_id = key
-            episode_id = ""
-            episode_name = ""
-        new_data.append({
-            "Region": region,
-            "Category": category,
-            "Rank": max_rank_today + dropped_out_count,
-            "ShowName": "",
-            "Publisher": "",
-            "ImageURL": "",
-            "Description": "",
-            "ChartRankMove": "DOWN_OUT",
-            "ShowID": show_id,
-            "EpisodeID": episode_id,
-            "EpisodeName": episode_name
-        })
 
-# Write updated data
-fieldnames = ["Region", "Category", "Rank", "ShowName", "Publisher", "ImageURL", "Description", "ChartRankMove", "ShowID", "EpisodeID","EpisodeName"]
-with open(output_file, "w", newline='', encoding="utf-8") as f:
-    writer = csv.DictWriter(f, fieldnames=fieldnames)
-    writer.writeheader()
-    writer.writerows(new_data)
+changes = compare_snapshots(read_snapshot(old_file), read_snapshot(new_file))
+changes["ChartRankMove"] = chart_rank_move(changes)
+changes["Movement"] = changes["movement"]
+changes = changes.rename(columns={value: key for key, value in KEY_NAMES.items()})
+changes[fieldnames].to_csv(output_file, index=False)
 
+print_movement_summary(changes)
 print(f"✅ Rank comparison done! Output saved to {output_file}")
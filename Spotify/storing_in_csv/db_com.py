@@ -1,20 +1,12 @@
 import mysql.connector
-import pandas as pd
+import argparse
+import csv
 import sys
 import os
+import time
 from datetime import date, timedelta
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-import password 
-# ------------------
-# DB Connection
-# ------------------
-conn = mysql.connector.connect(
-    host="localhost",
-    user="root",
-    password=password.Password,
-    database="yourdb"
-)
-cursor = conn.cursor(dictionary=True)
+import password
 
 # ------------------
 # Config
@@ -42,67 +34,154 @@ CATEGORIES_20 = [
 
 CATEGORIES_3 = ["top", "trending", "top_episodes"]
 
-# ------------------
-# Dates
-# ------------------
-today = date.today()
-yesterday = today - timedelta(days=1)
+OUTPUT_FILE = "rank.csv"
+FIELDNAMES = ["Country", "Category", "ShowID", "ShowName", "Today Rank", "Yesterday Rank", "Movement"]
+FETCH_SIZE = 5000
 
-# ------------------
-# Main comparison loop
-# ------------------
-results = []
-
-for country in COUNTRY_NAMES.keys():
-    categories = CATEGORIES_20 if country in SEVENTEEN else CATEGORIES_3
-    
-    for category in categories:
-        # JOIN query to compare today and yesterday
-        query = f"""
-            SELECT 
-                t_today.ShowID,
-                t_today.Rank AS today_rank,
-                t_yest.Rank AS yesterday_rank,
-                t_today.ShowName
-            FROM charts_table t_today
-            LEFT JOIN charts_table t_yest
-                ON t_today.ShowID = t_yest.ShowID
-                AND t_today.CountryCode = t_yest.CountryCode
-                AND t_today.Category = t_yest.Category
-                AND t_yest.Date = '{yesterday}'
-            WHERE t_today.Date = '{today}'
-              AND t_today.CountryCode = %s
-              AND t_today.Category = %s
-        """
-        cursor.execute(query, (country, category))
-        rows = cursor.fetchall()
-
-        for row in rows:
-            if row['yesterday_rank'] is None:
-                movement = "NEW"
-                diff = None
-            else:
-                diff = row['yesterday_rank'] - row['today_rank']
-                if diff > 0:
-                    movement = f"UP {diff}"
-                elif diff < 0:
-                    movement = f"DOWN {abs(diff)}"
-                else:
-                    movement = "SAME"
-
-            results.append({
-                "Country": COUNTRY_NAMES[country],
-                "Category": category,
-                "ShowID": row['ShowID'],
-                "ShowName": row['ShowName'],
-                "Today Rank": row['today_rank'],
-                "Yesterday Rank": row['yesterday_rank'],
-                "Movement": movement
-            })
+# Date first, so the window query range-scans just the two report days instead of the whole table;
+# the per-chart lookups and the self-join use the (Date, CountryCode, Category, ShowID) prefix.
+# ShowName is not in the index, so it is still read from the row for each matched chart entry
+INDEX_NAME = "idx_charts_date_country_category_show"
+INDEX_SQL = f"CREATE INDEX {INDEX_NAME} ON charts_table (`Date`, CountryCode, Category, ShowID, `Rank`)"
 
-# ------------------
-# Save to CSV
-# ------------------
-df = pd.DataFrame(results)
-df.to_csv("rank.csv", index=False, encoding="utf-8")
-print("✅ CSV saved: rank_changes.csv")
+# Old per-chart query: one round trip per country x category
+PER_CHART_QUERY = """
+    SELECT
+        t_today.ShowID,
+        t_today.Rank AS today_rank,
+        t_yest.Rank AS yesterday_rank,
+        t_today.ShowName
+    FROM charts_table t_today
+    LEFT JOIN charts_table t_yest
+        ON t_today.ShowID = t_yest.ShowID
+        AND t_today.CountryCode = t_yest.CountryCode
+        AND t_today.Category = t_yest.Category
+        AND t_yest.Date = %s
+    WHERE t_today.Date = %s
+      AND t_today.CountryCode = %s
+      AND t_today.Category = %s
+"""
+
+# Every region/category at once: LAG gives each show's rank on the previous day it charted
+WINDOW_QUERY = """
+    SELECT CountryCode, Category, ShowID, ShowName, today_rank,
+           CASE WHEN previous_date = %s THEN previous_rank END AS yesterday_rank
+    FROM (
+        SELECT CountryCode, Category, ShowID, ShowName, `Date`,
+               `Rank` AS today_rank,
+               LAG(`Rank`) OVER w AS previous_rank,
+               LAG(`Date`) OVER w AS previous_date
+        FROM charts_table
+        WHERE `Date` BETWEEN %s AND %s
+        WINDOW w AS (PARTITION BY CountryCode, Category, ShowID ORDER BY `Date`)
+    ) AS ranked
+    WHERE `Date` = %s
+    ORDER BY CountryCode, Category, today_rank
+"""
+
+
+def movement(today_rank, yesterday_rank):
+    if yesterday_rank is None:
+        return "NEW"
+    diff = yesterday_rank - today_rank
+    if diff > 0:
+        return f"UP {diff}"
+    if diff < 0:
+        return f"DOWN {abs(diff)}"
+    return "SAME"
+
+
+def ensure_index(conn):
+    """Create the report index unless it already exists"""
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT 1 FROM information_schema.statistics "
+        "WHERE table_schema = DATABASE() AND table_name = 'charts_table' AND index_name = %s LIMIT 1",
+        (INDEX_NAME,)
+    )
+    exists = cursor.fetchone() is not None
+    if not exists:
+        print(f"🔨 Creating index {INDEX_NAME}...")
+        cursor.execute(INDEX_SQL)
+    cursor.close()
+
+
+def diff_per_chart(conn, writer, today, yesterday):
+    """Original mode: hundreds of parameterized self-join queries"""
+    cursor = conn.cursor(dictionary=True)
+    count = 0
+    for country in COUNTRY_NAMES.keys():
+        categories = CATEGORIES_20 if country in SEVENTEEN else CATEGORIES_3
+        for category in categories:
+            cursor.execute(PER_CHART_QUERY, (yesterday, today, country, category))
+            for row in cursor.fetchall():
+                writer.writerow([COUNTRY_NAMES[country], category, row['ShowID'], row['ShowName'],
+                                 row['today_rank'], row['yesterday_rank'],
+                                 movement(row['today_rank'], row['yesterday_rank'])])
+                count += 1
+    cursor.close()
+    return count
+
+
+def diff_window(conn, writer, today, yesterday):
+    """One LAG window query, streamed row batches straight into the CSV"""
+    # Unbuffered cursor: rows stay on the server until fetched, so memory does not grow with the result
+    cursor = conn.cursor(buffered=False)
+    cursor.execute(WINDOW_QUERY, (yesterday, yesterday, today, today))
+    count = 0
+    while True:
+        rows = cursor.fetchmany(FETCH_SIZE)
+        if not rows:
+            break
+        for country, category, show_id, show_name, today_rank, yesterday_rank in rows:
+            writer.writerow([COUNTRY_NAMES.get(country, country), category, show_id, show_name,
+                             today_rank, yesterday_rank, movement(today_rank, yesterday_rank)])
+        count += len(rows)
+    cursor.close()
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Daily chart movement report from charts_table")
+    parser.add_argument("--mode", choices=["window", "per-chart"], default="window",
+                        help="window: one set-based query (default); per-chart: one query per country x category")
+    parser.add_argument("--date", default=date.today().isoformat(), help="Report date (YYYY-MM-DD)")
+    parser.add_argument("--output", default=OUTPUT_FILE)
+    parser.add_argument("--create-index", action="store_true",
+                        help=f"Create {INDEX_NAME} on charts_table first if it is missing")
+    args = parser.parse_args()
+
+    # ------------------
+    # Dates
+    # ------------------
+    today = date.fromisoformat(args.date)
+    yesterday = today - timedelta(days=1)
+
+    # ------------------
+    # DB Connection
+    # ------------------
+    conn = mysql.connector.connect(
+        host="localhost",
+        user="root",
+        password=password.Password,
+        database="yourdb"
+    )
+    if args.create_index:
+        ensure_index(conn)
+
+    start_time = time.time()
+    with open(args.output, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(FIELDNAMES)
+        if args.mode == "window":
+            count = diff_window(conn, writer, today, yesterday)
+        else:
+            count = diff_per_chart(conn, writer, today, yesterday)
+    conn.close()
+
+    elapsed = time.time() - start_time
+    print(f"✅ CSV saved: {args.output} ({count} rows, {args.mode} mode, {elapsed:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,9 +7,17 @@ import json
 import time
 import sys
 import traceback
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Dict, List, Any
+import os
 import password
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from rate_governor import get_governor
+from http_client import get_session, connection_stats
+
 # Setup comprehensive logging
 def setup_logging():
     """Setup multiple log files for different types of information"""
@@ -109,31 +117,46 @@ class SpotifyScrapingStats:
         self.countries_processed = 0
         self.categories_processed = 0
         self.request_times = []
+        # Fetcher threads update the counters concurrently in pipeline mode
+        self._lock = threading.Lock()
         
     def log_request(self, success: bool, response_time: float, error_type: str = None):
         """Log individual request statistics"""
-        self.total_requests += 1
-        self.request_times.append(response_time)
-        
-        if success:
-            self.successful_requests += 1
-        else:
-            self.failed_requests += 1
-            if error_type == "rate_limit":
-                self.rate_limited_requests += 1
-            elif error_type == "timeout":
-                self.timeout_requests += 1
+        with self._lock:
+            self.total_requests += 1
+            self.request_times.append(response_time)
+            
+            if success:
+                self.successful_requests += 1
+            else:
+                self.failed_requests += 1
+                if error_type == "rate_limit":
+                    self.rate_limited_requests += 1
+                elif error_type == "timeout":
+                    self.timeout_requests += 1
     
     def log_database_error(self):
         """Log database error"""
-        self.database_errors += 1
+        with self._lock:
+            self.database_errors += 1
     
     def log_items_inserted(self, count: int):
         """Log items inserted"""
-        self.total_items_inserted += count
+        with self._lock:
+            self.total_items_inserted += count
+    
+    def log_processed(self, countries: int = 0, categories: int = 0):
+        """Log finished countries/categories"""
+        with self._lock:
+            self.countries_processed += countries
+            self.categories_processed += categories
     
     def get_summary(self) -> Dict[str, Any]:
         """Get comprehensive summary statistics"""
+        with self._lock:
+            return self._summary()
+    
+    def _summary(self) -> Dict[str, Any]:
         elapsed_time = time.time() - self.start_time
         avg_response_time = sum(self.request_times) / len(self.request_times) if self.request_times else 0
         requests_per_minute = (self.total_requests / elapsed_time) * 60 if elapsed_time > 0 else 0
@@ -154,12 +177,23 @@ class SpotifyScrapingStats:
             "categories_processed": self.categories_processed
         }
 
+# Concurrent fetchers in pipeline mode
+PIPELINE_WORKERS = 16
+# Starting pace of the sequential mode, the same as the old 0.1s sleep between calls
+SEQUENTIAL_RATE = 10.0
+
 # Global stats tracker
 stats = SpotifyScrapingStats()
 
+# api_requests.json is appended to from several threads in pipeline mode
+request_log_lock = threading.Lock()
+
 def make_api_request(url: str, country: str, category: str, timeout: int = 5) -> tuple:
     """Make API request with detailed logging and error handling"""
     
+    # Wait for a token from the host's adaptive rate governor
+    governor = get_governor(url)
+    governor.acquire()
     request_start_time = time.time()
     
     try:
@@ -171,8 +205,10 @@ def make_api_request(url: str, country: str, category: str, timeout: int = 5) ->
             'Connection': 'keep-alive'
         }
         
-        response = requests.get(url, timeout=timeout, headers=headers)
+        # Shared keep-alive session: one TLS handshake per pooled connection, not per request
+        response = get_session().get(url, timeout=timeout, headers=headers)
         response_time = time.time() - request_start_time
+        governor.record_response(response)
         
         # Log detailed request info
         request_info = {
@@ -186,7 +222,7 @@ def make_api_request(url: str, country: str, category: str, timeout: int = 5) ->
         }
         
         # Write request details to JSON log
-        with open('api_requests.json', 'a') as f:
+        with request_log_lock, open('api_requests.json', 'a') as f:
             f.write(json.dumps(request_info) + '\n')
         
         if response.status_code == 200:
@@ -229,8 +265,30 @@ def make_api_request(url: str, country: str, category: str, timeout: int = 5) ->
         logger.error(f"Full traceback: {traceback.format_exc()}")
         return False, None, error_msg
 
-def insert_to_database(cur, conn, items: List[Dict], country: str, category: str) -> bool:
-    """Insert items to database with detailed error logging"""
+def build_chart_rows(items: List[Dict], country: str, category: str, snapshot_time: datetime) -> List[tuple]:
+    """Turn one chart into insert rows sharing a single snapshot timestamp"""
+    rows = []
+    for idx, item in enumerate(items):
+        show_uri = item.get("showUri", "")
+        show_id = show_uri.split(":")[-1] if show_uri else ""
+        rows.append((
+            show_id,
+            item.get("showName", ""),
+            item.get("showPublisher", ""),
+            item.get("showImageUrl", ""),
+            item.get("showDescription", ""),
+            COUNTRY_NAMES.get(country, ""),
+            country,
+            category.replace("-", " ").title(),
+            idx + 1,
+            snapshot_time,
+            snapshot_time
+        ))
+    return rows
+
+def insert_to_database(cur, conn, items: List[Dict], country: str, category: str,
+                       snapshot_time: datetime = None) -> bool:
+    """Insert one chart with a single multi-row INSERT and detailed error logging"""
     
     insert_sql = """
     INSERT INTO spotify_podcast_charts_with_category
@@ -240,65 +298,19 @@ def insert_to_database(cur, conn, items: List[Dict], country: str, category: str
     """
     
     try:
-        inserted_count = 0
-        
-        for idx, item in enumerate(items):
-            try:
-                show_uri = item.get("showUri", "")
-                show_id = show_uri.split(":")[-1] if show_uri else ""
-                
-                # Log item details
-                item_info = {
-                    'country': country,
-                    'category': category,
-                    'rank': idx + 1,
-                    'show_id': show_id,
-                    'show_name': item.get("showName", "")[:100],  # Truncate for logging
-                    'show_publisher': item.get("showPublisher", "")[:100]
-                }
-                
-                cur.execute(insert_sql, (
-                    show_id,
-                    item.get("showName", ""),
-                    item.get("showPublisher", ""),
-                    item.get("showImageUrl", ""),
-                    item.get("showDescription", ""),
-                    COUNTRY_NAMES.get(country, ""),
-                    country,
-                    category.replace("-", " ").title(),
-                    idx + 1,
-                    datetime.now(),
-                    datetime.now()
-                ))
-                
-                inserted_count += 1
-                
-                # Log every 10th item for detailed tracking
-                if (idx + 1) % 10 == 0:
-                    logger.debug(f"Inserted item #{idx + 1} for {country.upper()}-{category}")
-                
-            except mysql.connector.Error as db_error:
-                stats.log_database_error()
-                logger.error(f"🗃️ DATABASE ERROR inserting item #{idx + 1} for {country.upper()}-{category}: {db_error}")
-                logger.error(f"Item data: {json.dumps(item_info, indent=2)}")
-                continue
-                
-            except Exception as item_error:
-                stats.log_database_error()
-                logger.error(f"💥 ITEM PROCESSING ERROR #{idx + 1} for {country.upper()}-{category}: {item_error}")
-                logger.error(f"Full traceback: {traceback.format_exc()}")
-                continue
+        rows = build_chart_rows(items, country, category, snapshot_time or datetime.now())
         
-        # Commit the transaction
+        # mysql.connector rewrites executemany on an INSERT into one multi-row VALUES statement
+        cur.executemany(insert_sql, rows)
         conn.commit()
-        stats.log_items_inserted(inserted_count)
+        stats.log_items_inserted(len(rows))
         
-        logger.info(f"💾 DATABASE SUCCESS {country.upper()}-{category}: {inserted_count}/{len(items)} items inserted")
+        logger.info(f"💾 DATABASE SUCCESS {country.upper()}-{category}: {len(rows)}/{len(items)} items inserted")
         return True
         
     except mysql.connector.Error as db_error:
         stats.log_database_error()
-        logger.error(f"🗃️ DATABASE COMMIT ERROR {country.upper()}-{category}: {db_error}")
+        logger.error(f"🗃️ DATABASE ERROR {country.upper()}-{category}: {db_error}")
         logger.error(f"Full traceback: {traceback.format_exc()}")
         
         try:
@@ -315,6 +327,14 @@ def insert_to_database(cur, conn, items: List[Dict], country: str, category: str
         logger.error(f"Full traceback: {traceback.format_exc()}")
         return False
 
+def get_categories(country: str) -> List[str]:
+    """Chart categories available for a country"""
+    if country in Seventeen:
+        return CATEGORIES_20
+    if country in Three:
+        return CATEGORIES_3
+    return CATEGORIES_1
+
 def fetch_and_save():
     """Enhanced main function with comprehensive logging"""
     
@@ -338,12 +358,7 @@ def fetch_and_save():
     
     # Process all countries
     all_countries = sorted(set(One + Three + Seventeen))
-    total_combinations = sum([
-        len(CATEGORIES_20) if country in Seventeen else
-        len(CATEGORIES_3) if country in Three else
-        len(CATEGORIES_1)
-        for country in all_countries
-    ])
+    total_combinations = sum(len(get_categories(country)) for country in all_countries)
     
     logger.info(f"📊 SCRAPING PLAN:")
     logger.info(f"   • Countries to process: {len(all_countries)}")
@@ -354,28 +369,26 @@ def fetch_and_save():
     logger.info("=" * 80)
     
     processed_combinations = 0
+    # Start the shared governor at the old fixed pacing; it backs off on 429s
+    get_governor("podcastcharts.byspotify.com", rate=SEQUENTIAL_RATE)
+    snapshot_time = datetime.now()  # One timestamp for the whole snapshot
     
     for country in all_countries:
         try:
-            stats.countries_processed += 1
+            stats.log_processed(countries=1)
             
             # Determine categories for this country
-            if country in Seventeen:
-                categories = CATEGORIES_20
-                logger.info(f"🌟 Processing {country.upper()} ({COUNTRY_NAMES.get(country)}) - 20 categories")
-            elif country in Three:
-                categories = CATEGORIES_3
-                logger.info(f"🥉 Processing {country.upper()} ({COUNTRY_NAMES.get(country)}) - 3 categories")
-            else:
-                categories = CATEGORIES_1
-                logger.info(f"🥇 Processing {country.upper()} ({COUNTRY_NAMES.get(country)}) - 1 category")
+            categories = get_categories(country)
+            icon = "🌟" if country in Seventeen else "🥉" if country in Three else "🥇"
+            label = "1 category" if len(categories) == 1 else f"{len(categories)} categories"
+            logger.info(f"{icon} Processing {country.upper()} ({COUNTRY_NAMES.get(country)}) - {label}")
             
             country_start_time = time.time()
             country_success = 0
             country_failures = 0
             
             for category in categories:
-                stats.categories_processed += 1
+                stats.log_processed(categories=1)
                 processed_combinations += 1
                 
                 url = f"https://podcastcharts.byspotify.com/api/charts/{category}?region={country}"
@@ -398,7 +411,7 @@ def fetch_and_save():
                     
                     # Insert to database
                     if items:
-                        db_success = insert_to_database(cur, conn, items, country, category)
+                        db_success = insert_to_database(cur, conn, items, country, category, snapshot_time)
                         if db_success:
                             country_success += 1
                         else:
@@ -409,9 +422,7 @@ def fetch_and_save():
                 else:
                     country_failures += 1
                     logger.error(f"❌ Failed to fetch {country.upper()}-{category}: {error}")
-                
-                # Small delay between requests to be respectful
-                time.sleep(0.1)
+
             
             # Country summary
             country_duration = time.time() - country_start_time
@@ -433,6 +444,77 @@ def fetch_and_save():
     # Final comprehensive report
     print_final_report()
 
+def fetch_chart(country: str, category: str) -> tuple:
+    """Fetcher task for pipeline mode: (country, category, success, items, error)"""
+    url = f"https://podcastcharts.byspotify.com/api/charts/{category}?region={country}"
+    success, data, error = make_api_request(url, country, category)
+    items = []
+    if success and data:
+        items = data if isinstance(data, list) else data.get("items", [])
+        if not isinstance(items, list):
+            items = []
+            logger.warning(f"⚠️ Unexpected data format for {country.upper()}-{category}")
+    return country, category, success, items, error
+
+def fetch_and_save_pipeline(workers: int = PIPELINE_WORKERS):
+    """Pipeline mode: concurrent fetchers feed a single database writer"""
+    
+    logger.info(f"🚀 STARTING SPOTIFY PODCAST CHART SCRAPING (pipeline, {workers} fetchers)")
+    logger.info("=" * 80)
+    
+    try:
+        conn = mysql.connector.connect(
+            host="localhost",
+            user="root",
+            password=password.Password,
+            database="trial"
+        )
+        cur = conn.cursor()
+        logger.info("✅ Database connection established")
+        
+    except mysql.connector.Error as db_error:
+        logger.error(f"🗃️ DATABASE CONNECTION FAILED: {db_error}")
+        return
+    
+    all_countries = sorted(set(One + Three + Seventeen))
+    tasks = [(country, category) for country in all_countries for category in get_categories(country)]
+    remaining = {country: len(get_categories(country)) for country in all_countries}
+    logger.info(f"📊 SCRAPING PLAN: {len(all_countries)} countries, {len(tasks)} API calls")
+    
+    # Start the shared governor at a pace that keeps the fetchers busy; it backs off on 429s
+    get_governor("podcastcharts.byspotify.com", rate=float(workers), burst=float(workers))
+    get_session(pool_size=workers)  # Enough pooled connections for every fetcher thread
+    snapshot_time = datetime.now()  # One timestamp for the whole snapshot
+    
+    # Only this thread touches the MySQL connection
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(fetch_chart, country, category) for country, category in tasks]
+        for done, future in enumerate(as_completed(futures), 1):
+            country, category, success, items, error = future.result()
+            
+            if success:
+                logger.info(f"📊 [{done}/{len(tasks)}] Retrieved {len(items)} items for {country.upper()}-{category}")
+                if items:
+                    insert_to_database(cur, conn, items, country, category, snapshot_time)
+                else:
+                    logger.warning(f"⚠️ No items to insert for {country.upper()}-{category}")
+            else:
+                logger.error(f"❌ [{done}/{len(tasks)}] Failed to fetch {country.upper()}-{category}: {error}")
+            
+            stats.log_processed(categories=1)
+            remaining[country] -= 1
+            if remaining[country] == 0:
+                stats.log_processed(countries=1)
+    
+    try:
+        cur.close()
+        conn.close()
+        logger.info("✅ Database connection closed")
+    except Exception as cleanup_error:
+        logger.error(f"❌ Error closing database: {cleanup_error}")
+    
+    print_final_report()
+
 def print_final_report():
     """Print comprehensive final scraping report"""
     
@@ -455,6 +537,11 @@ def print_final_report():
     logger.info(f"   • Rate Limited: {summary['rate_limited_requests']:,}")
     logger.info(f"   • Timeouts: {summary['timeout_requests']:,}")
     logger.info(f"   • Success Rate: {summary['success_rate_percent']}%")
+    governor = get_governor("podcastcharts.byspotify.com")
+    logger.info(f"   • Governor Rate (final): {governor.rate:.2f} req/s, {governor.throttled} throttled responses")
+    for host, conn_stats in connection_stats().items():
+        logger.info(f"   • Connections [{host}]: {conn_stats['new_connections']} handshakes, "
+                    f"{conn_stats['reused']} of {conn_stats['requests']} requests reused a connection")
     logger.info(f"")
     
     logger.info(f"🗃️ DATABASE STATISTICS:")
@@ -479,8 +566,18 @@ def print_final_report():
     logger.info(f"💾 Summary saved to scraping_summary.json")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scrape Spotify podcast charts into MySQL")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="Fetch charts concurrently and insert them from a single writer")
+    parser.add_argument("--workers", type=int, default=PIPELINE_WORKERS,
+                        help="Number of concurrent fetchers in pipeline mode")
+    args = parser.parse_args()
+    
     try:
-        fetch_and_save()
+        if args.pipeline:
+            fetch_and_save_pipeline(args.workers)
+        else:
+            fetch_and_save()
     except KeyboardInterrupt:
         logger.info("\n⚠️ Scraping interrupted by user")
         print_final_report()
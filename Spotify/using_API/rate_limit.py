@@ -3,11 +3,19 @@ import requests
 from datetime import datetime, timedelta
 from collections import deque
 import json
+import os
+import sys
 from typing import Optional, Dict, Any
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from rate_governor import get_governor
+from http_client import get_session
+
 class APIRateLimiter:
     def __init__(self, api_url: str = "https://podcastcharts.byspotify.com/api/charts/top?region=us"):
         self.api_url = api_url
+        # Shared per-host token bucket; adapts to 200s/429s seen by every caller
+        self.governor = get_governor(api_url)
         self.request_times = deque()  # Store timestamps of requests
         self.start_time = time.time()
         self.total_requests = 0
@@ -44,7 +52,8 @@ class APIRateLimiter:
     
     def make_request(self, params: Optional[Dict[str, Any]] = None, 
                     headers: Optional[Dict[str, str]] = None) -> requests.Response:
-        """Make a request and track timing/success"""
+        """Make a request through the host governor and track timing/success"""
+        self.governor.acquire()
         current_time = time.time()
         self.request_times.append(current_time)
         self.total_requests += 1
@@ -57,7 +66,8 @@ class APIRateLimiter:
                     'Accept': 'application/json'
                 }
             
-            response = requests.get(self.api_url, params=params, headers=headers, timeout=10)
+            response = get_session().get(self.api_url, params=params, headers=headers, timeout=10)
+            self.governor.record_response(response)
             
             if response.status_code == 200:
                 self.successful_requests += 1
@@ -92,6 +102,7 @@ class APIRateLimiter:
         print(f"")
         print(f"🏃 Current rate (last 60s): {self.get_current_rate_per_minute():.1f} req/min ({self.get_current_rate_per_second():.2f} req/s)")
         print(f"📊 Average rate: {self.get_average_rate_per_minute():.1f} req/min ({self.get_average_rate_per_second():.2f} req/s)")
+        print(f"🚦 Governor rate: {self.governor.rate:.2f} req/s ({self.governor.throttled} throttled)")
         
         if self.total_requests > 0:
             success_rate = (self.successful_requests / self.total_requests) * 100
@@ -135,6 +146,25 @@ def test_rate_limits(delay_seconds: float = 1.0, max_requests: int = 100):
     limiter.print_stats()
     return limiter
 
+def find_adaptive_rate(max_requests: int = 200):
+    """Let the governor climb until the API pushes back and report where it settles"""
+    limiter = APIRateLimiter()
+    print(f"🚀 Adaptive rate probe: {max_requests} requests, starting at {limiter.governor.rate:.2f} req/s")
+
+    try:
+        for i in range(max_requests):
+            try:
+                limiter.make_request()
+            except Exception as e:
+                print(f"Error: {e}")
+            if (i + 1) % 20 == 0:
+                print(f"Request {i+1}/{max_requests}: governor at {limiter.governor.rate:.2f} req/s")
+    except KeyboardInterrupt:
+        print(f"\n⏹️  Probe interrupted by user")
+
+    limiter.print_stats()
+    return limiter.governor.rate
+
 def find_optimal_rate():
     """Try different request rates to find the optimal one"""
     print("🔍 Finding optimal request rate...")
@@ -181,6 +211,10 @@ if __name__ == "__main__":
     #2. Find optimal rate
     print("\n2️⃣ Finding optimal request rate:")
     find_optimal_rate()
+
+    #2b. Let the adaptive governor find it instead
+    print("\n2️⃣b Adaptive governor probe:")
+    find_adaptive_rate()
     
     #3. Custom test
     limiter = APIRateLimiter()
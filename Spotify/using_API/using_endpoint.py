@@ -1,8 +1,12 @@
 # Collecting data from all possible country wise endpoints for top podcasts
 from collections import defaultdict
-import requests
 import csv
-import time
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from rate_governor import print_governor_report
+from http_client import http_get, print_connection_report
 
 # List of ISO 3166-1 alpha-2 country codes
 Three = [
@@ -52,7 +56,7 @@ failed_requests = []
 def fetch_charts(region_code):
     url = f"https://podcastcharts.byspotify.com/api/charts/top?region={region_code}"
     try:
-        resp = requests.get(url, timeout=10)
+        resp = http_get(url, timeout=10)
         resp.raise_for_status()
         data = resp.json()
 
@@ -130,8 +134,6 @@ def main():
             if show_id:
                 unique_show_ids.add(show_id)
 
-        time.sleep(0.5)
-
     if retry_failed:
         print(f"\n[ERROR] These requests failed even after retry:")
         for country in retry_failed:
@@ -139,6 +141,8 @@ def main():
 
 
     save_to_csv(all_rows)
+    print_governor_report()
+    print_connection_report()
 
     print(f"[DONE] Saved {len(all_rows)} rows to spotify_podcast_top_charts.csv\n")
     print(f"Unique ids {len(unique_show_ids)}")
@@ -3,11 +3,12 @@ from playwright.sync_api import sync_playwright
 import re
 import requests
 import base64
-import time
 import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 import password 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from scroll_harvester import SPOTIFY_SHOW_HREF, harvest_links
 
 CLIENT_ID = password.CLIENT_ID
 CLIENT_SECRET = password.CLIENT_SECRET
@@ -54,20 +55,8 @@ def scrape_genre_for_market(page, market_code):
     # Wait for page to load
     page.wait_for_selector("a[href*='/show/']", timeout=30000)
     
-    # Scroll until no more new content
-    last_height = 0
-    while True:
-        page.mouse.wheel(0, 4000)
-        time.sleep(1)
-        height = page.evaluate("document.body.scrollHeight")
-        if height == last_height:
-            break
-        last_height = height
-    
-    # Extract show IDs
-    links = page.query_selector_all("a[href*='/show/']")
-    for link in links:
-        href = link.get_attribute("href")
+    # Scroll until no more nodes are added, collecting show links as they appear
+    for href in harvest_links(page, pattern=SPOTIFY_SHOW_HREF, scroll_step=4000):
         match = re.search(r"/show/([A-Za-z0-9]+)", href)
         if match:
             shows.add(match.group(1))
@@ -1,9 +1,16 @@
 import requests
 from bs4 import BeautifulSoup
-import re
-import time
-import csv
+import argparse
 import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from id_store import open_known_ids
+from rate_governor import print_governor_report
+from http_client import http_get, print_connection_report
+from crawl_checkpoint import CrawlCheckpoint
+from url_frontier import UrlFrontier
+from id_extract import href_ids
 
 genre_ids = [
     1301, 1302, 1303, 1304, 1305, 1306, 1309, 1310, 1314, 1318, 1320, 1321,
@@ -18,51 +25,46 @@ country_codes = ["us", "de", "ca", "ph", "pt", "ro", "sk", "th", "ua", "ve", "vn
 CSV_FILENAME = "../apple_ids.csv"
 NEW_FILENAME = "new_ids.txt"
 
-# Load existing podcast IDs from CSV
-def load_existing_ids(filename):
-    if not os.path.exists(filename):
-        return set()
-    with open(filename, mode="r", newline="", encoding="utf-8") as file:
-        reader = csv.reader(file)
-        return {row[0] for row in reader if row}
-    
-# Generate links
+# Generate links (repeated genre IDs or countries are dropped by the frontier)
 def generate_apple_podcast_links(genre_ids, country_codes):
     base_url = "https://podcasts.apple.com/{country}/genre/id{genre_id}"
-    links = []
+    frontier = UrlFrontier()
     for country in country_codes:
         for genre_id in genre_ids:
-            links.append(base_url.format(country=country, genre_id=genre_id))
-    return links
+            frontier.add(base_url.format(country=country, genre_id=genre_id))
+    return frontier
 
-def extract_podcast_ids_from_page(url):
+def extract_podcast_ids_from_page(url, frontier=None):
     print(f"Fetching: {url}")
     headers = {
         "User-Agent": "Mozilla/5.0 (compatible; ApplePodcastScraper/1.0)"
     }
 
     try:
-        response = requests.get(url, headers=headers, timeout=10)
+        response = http_get(url, headers=headers, timeout=10)
         response.raise_for_status()
     except requests.RequestException as e:
         print(f"Error fetching {url}: {e}")
-        return []
+        return None
+
+    # A page with the same content as an earlier one has the same IDs
+    if frontier is not None:
+        cached = frontier.parsed(response.content)
+        if cached is not None:
+            return list(cached)
 
     soup = BeautifulSoup(response.text, "lxml")
-    podcast_ids = []
 
     main_tag = soup.find("main")
     if not main_tag:
         print("No <main> tag found.")
         return []
 
-    # Find all <a> tags within <main> and extract hrefs
-    for a_tag in main_tag.find_all("a", href=True):
-        href = a_tag["href"]
-        match = re.search(r'/id(\d+)', href)
-        if match:
-            podcast_ids.append(match.group(1))
+    # Scan the hrefs of all <a> tags within <main> for IDs in one pass
+    podcast_ids = sorted(href_ids(a_tag["href"] for a_tag in main_tag.find_all("a", href=True)))
 
+    if frontier is not None:
+        frontier.remember(response.content, podcast_ids)
     return podcast_ids
 
 
@@ -74,44 +76,52 @@ def save_ids_to_txt(ids, filename):
             f.write(f"{pid}\n")
     print(f"✅ Saved {len(ids)} IDs to {filename}")
 
-# Load existing IDs from CSV
-def load_existing_ids_from_csv(filename):
-    if not os.path.exists(filename):
-        print("⚠️ CSV file not found.")
-        return set()
-    with open(filename, "r", newline="", encoding="utf-8") as file:
-        reader = csv.reader(file)
-        return {row[0] for row in reader if row}
-
-# Compare two ID sets
-def compare_ids(new_ids, existing_ids):
-    new_only = new_ids - existing_ids
-    common = new_ids & existing_ids
+# Compare scraped IDs against the known ID store
+def compare_ids(new_ids, known_ids):
+    new_only = {str(i) for i in known_ids.missing(new_ids)}
+    common = new_ids - new_only
     return new_only, common
 
 
 # MAIN
 if __name__ == "__main__":
-    links = generate_apple_podcast_links(genre_ids, country_codes)
-
-    all_ids = set()
-
-    for link in links:
-        ids = extract_podcast_ids_from_page(link)
+    parser = argparse.ArgumentParser(description="Collect podcast IDs from Apple genre pages")
+    parser.add_argument("--fresh", action="store_true", help="Ignore an unfinished checkpoint and start over")
+    args = parser.parse_args()
+
+    frontier = generate_apple_podcast_links(genre_ids, country_codes)
+
+    # Each finished genre page is committed with its IDs, so a restart skips it
+    checkpoint = CrawlCheckpoint("apple_ids_using_genre", fresh=args.fresh)
+    done_links = checkpoint.done_units()
+
+    for link in frontier:
+        if link in done_links:
+            continue
+        ids = extract_podcast_ids_from_page(link, frontier)
+        if ids is None:
+            checkpoint.mark_failed(link, "fetch failed")
+            continue
         print(f"Found {len(ids)} podcast IDs")
-        all_ids.update(ids)
-        time.sleep(1)  # Be polite and avoid being blocked
+        checkpoint.mark_done(link, ids)
 
+    # Includes the pages finished before a restart
+    all_ids = checkpoint.all_ids()
     print(f"\n🔢 Total unique podcast IDs collected: {len(all_ids)}")
+    checkpoint.print_report()
+    frontier.print_report()
     save_ids_to_txt(all_ids, TXT_FILENAME)
 
     # Comparison with CSV
-    existing_ids = load_existing_ids_from_csv(CSV_FILENAME)
-    new_only, common = compare_ids(all_ids, existing_ids)
+    known_ids = open_known_ids(CSV_FILENAME)
+    new_only, common = compare_ids(all_ids, known_ids)
 
     print(f"🆕 New IDs (not in CSV): {len(new_only)}")
     print(f"✅ Already in CSV: {len(common)}")
     save_ids_to_txt(new_only, NEW_FILENAME)
+    print_governor_report()
+    print_connection_report()
+    checkpoint.finish()
 
 # Extract podcast IDs from each genre page
 # def extract_podcast_ids_from_page(url):
@@ -1,12 +1,13 @@
 import time
 import hashlib
-import requests
 import os
-import csv
 import sys
 
 sys.path.append(os.path.abspath("..")) 
 import password
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from id_store import open_known_ids
+from http_client import get_session
 
 API_KEY = password.API_KEY
 API_SECRET = password.API_SECRET
@@ -36,15 +37,8 @@ CSV_FILE = os.path.join(BASE_DIR, "apple_ids.csv")            # ← Your CSV fil
 ALL_IDS_TXT = "all_unique_apple_ids.txt"     # ← Master list to store all fetched IDs
 NEW_IDS_TXT = "new_unique_ids.txt"           # ← Output file for new IDs only
 
-# Step 1: Load existing CSV file IDs into a set
-existing_ids = set()
-if os.path.exists(CSV_FILE):
-    with open(CSV_FILE, newline='', encoding="utf-8") as csvfile:
-        reader = csv.reader(csvfile)
-        for row in reader:
-            for cell in row:
-                if cell.strip().isdigit():
-                    existing_ids.add(cell.strip())
+# Step 1: Open the memory-mapped store of known CSV IDs
+existing_ids = open_known_ids(CSV_FILE)
 
 # Step 2: Load previously fetched IDs to avoid duplication in master file
 stored_ids = set()
@@ -69,7 +63,7 @@ all_fetched_ids = set()
 for category in CATEGORIES:
     print(f"🔍 Fetching category: {category}")
     url = f"https://api.podcastindex.org/api/1.0/search/byterm?q={category}&max=100"
-    response = requests.get(url, headers=headers)
+    response = get_session().get(url, headers=headers)
 
     if response.status_code == 200:
         feeds = response.json().get("feeds", [])
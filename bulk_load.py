@@ -0,0 +1,191 @@
+# Bulk loader for Apple ID imports into MySQL (LOAD DATA LOCAL INFILE, multi-row INSERT IGNORE fallback)
+import argparse
+import itertools
+import os
+import tempfile
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import mysql.connector
+import numpy as np
+
+from id_validation import (CSV_CHUNK_ROWS, MAX_BIGINT_DIGITS, MIN_ID_DIGITS, ValidationReport, pa,
+                           read_id_chunks, validate_chunks)
+
+if pa is not None:
+    import pyarrow.csv as pacsv
+
+INSERT_CHUNK_ROWS = 50_000      # rows per executemany (one multi-row INSERT), well under max_allowed_packet
+
+# Client or server refuses LOAD DATA LOCAL: fall back to multi-row INSERT IGNORE
+LOCAL_INFILE_ERRNOS = {1148, 2068, 3948, 3950}
+
+
+class LoadStats:
+    """Counters for one bulk load"""
+
+    def __init__(self, table: str):
+        self.table = table
+        self.rows = 0           # rows read from the source
+        self.invalid = 0
+        self.staged = 0         # valid IDs sent to the server
+        self.reasons: Dict[str, int] = {}
+        self.inserted = 0
+        self.method = None
+        self.started = time.time()
+        self.elapsed = 0.0
+
+    @property
+    def duplicates(self) -> int:
+        return self.staged - self.inserted
+
+    def finish(self) -> "LoadStats":
+        self.elapsed = time.time() - self.started
+        return self
+
+    def print_report(self) -> None:
+        rows = self.rows or self.staged
+        rate = rows / self.elapsed if self.elapsed else 0.0
+        print(f"✅ Inserted into {self.table}: {self.inserted}")
+        print(f"🚫 Skipped: {self.duplicates} duplicates, {self.invalid} invalid")
+        if self.reasons:
+            print("❌ Invalid: " + ", ".join(f"{name}: {n}" for name, n in self.reasons.items()))
+        print(f"⚡ {rows} rows in {self.elapsed:.1f}s ({rate:,.0f} rows/sec, {self.method})")
+
+
+def _load_data_infile(conn, table: str, column: str, path: str, extra: Dict) -> int:
+    sql = f"LOAD DATA LOCAL INFILE %(path)s IGNORE INTO TABLE `{table}` LINES TERMINATED BY '\\n' (`{column}`)"
+    if extra:
+        sql += " SET " + ", ".join(f"`{name}` = %({name})s" for name in extra)
+    cursor = conn.cursor()
+    try:
+        cursor.execute(sql, dict(extra, path=path))
+        return cursor.rowcount
+    finally:
+        cursor.close()
+
+
+def _insert_ignore(conn, table: str, column: str, path: str, extra: Dict) -> int:
+    """INSERT IGNORE the staged file ``INSERT_CHUNK_ROWS`` lines at a time, so memory stays at one chunk"""
+    columns = ", ".join(f"`{c}`" for c in (column, *extra))
+    placeholders = ", ".join(["%s"] * (1 + len(extra)))
+    sql = f"INSERT IGNORE INTO `{table}` ({columns}) VALUES ({placeholders})"
+    values = tuple(extra.values())
+    cursor = conn.cursor()
+    inserted = 0
+    try:
+        with open(path, encoding="ascii") as f:
+            while True:
+                rows = [(line.rstrip("\n"), *values) for line in itertools.islice(f, INSERT_CHUNK_ROWS)]
+                if not rows:
+                    break
+                # mysql.connector sends each batch as a single multi-row INSERT
+                cursor.executemany(sql, rows)
+                inserted += cursor.rowcount
+    finally:
+        cursor.close()
+    return inserted
+
+
+def _stage(chunks: Iterable[np.ndarray], f, stats: LoadStats) -> None:
+    """Write ID chunks (int64 or text) to ``f`` one per line"""
+    if pa is not None:
+        # pyarrow's CSV writer formats integers ~10x faster than joining str() values
+        writer = None
+        try:
+            for ids in chunks:
+                stats.staged += len(ids)
+                table = pa.table({"id": pa.array(ids, type=pa.string() if ids.dtype == object else pa.int64())})
+                if writer is None:
+                    options = pacsv.WriteOptions(include_header=False, quoting_style="none")
+                    writer = pacsv.CSVWriter(f, table.schema, write_options=options)
+                writer.write_table(table)
+        finally:
+            if writer is not None:
+                writer.close()
+        return
+    for ids in chunks:
+        stats.staged += len(ids)
+        if len(ids):
+            f.write("\n".join(ids.astype(str)).encode("ascii") + b"\n")
+
+
+def load_ids(conn, table: str, chunks: Iterable[np.ndarray], column: str = "apple_id",
+             extra: Optional[Dict] = None, stats: Optional[LoadStats] = None) -> LoadStats:
+    """Load ID chunks (int64, or strings for text columns) into ``table`` with one LOAD DATA statement.
+
+    Chunks are staged into a temp file as they arrive, so memory stays at
+    one chunk. ``extra`` sets constant values for other columns (e.g. a
+    timestamp). The connection needs ``allow_local_infile=True``; when
+    LOAD DATA LOCAL is refused, the staged file is streamed in
+    multi-row INSERT IGNORE batches instead. Commits when done.
+    """
+    stats = stats or LoadStats(table)
+    extra = dict(extra or {})
+    fd, path = tempfile.mkstemp(prefix="bulk_load_", suffix=".txt")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            _stage(chunks, f, stats)
+        try:
+            stats.inserted = _load_data_infile(conn, table, column, path, extra)
+            stats.method = "LOAD DATA LOCAL INFILE"
+        except mysql.connector.Error as e:
+            if e.errno not in LOCAL_INFILE_ERRNOS:
+                raise
+            print(f"⚠️ LOAD DATA LOCAL unavailable ({e.msg}), using multi-row INSERT IGNORE")
+            stats.inserted = _insert_ignore(conn, table, column, path, extra)
+            stats.method = "INSERT IGNORE"
+        conn.commit()
+    finally:
+        os.remove(path)
+    return stats.finish()
+
+
+def load_csv_ids(conn, csv_path: str, table: str, column: str = "apple_id", extra: Optional[Dict] = None,
+                 rejects: Optional[List[Tuple[str, str]]] = None, chunk_rows: int = CSV_CHUNK_ROWS,
+                 min_len: int = MIN_ID_DIGITS, max_len: int = MAX_BIGINT_DIGITS,
+                 as_text: bool = False) -> LoadStats:
+    """Validate an ID CSV chunk by chunk and bulk load the valid IDs into ``table``.
+
+    Invalid values are appended to ``rejects`` as (value, reason) when it
+    is given. Pass ``as_text`` for VARCHAR ID columns: the values are then
+    loaded as written instead of as integers, keeping leading zeros.
+    """
+    report = ValidationReport()
+    stats = LoadStats(table)
+    chunks = validate_chunks(read_id_chunks(csv_path, column, chunk_rows), report, rejects, min_len, max_len,
+                             as_text)
+    load_ids(conn, table, chunks, column, extra, stats)
+    stats.rows = report.rows
+    stats.invalid = report.invalid
+    stats.reasons = report.reasons
+    return stats
+
+
+def main():
+    import password
+
+    parser = argparse.ArgumentParser(description="Bulk load an Apple ID CSV into a MySQL table")
+    parser.add_argument("csv", nargs="?", default="apple_ids.csv")
+    parser.add_argument("--table", default="podcast")
+    parser.add_argument("--column", default="apple_id")
+    parser.add_argument("--database", default="store")
+    parser.add_argument("--as-text", action="store_true",
+                        help="The ID column is VARCHAR: load values as written (keeps leading zeros)")
+    args = parser.parse_args()
+
+    conn = mysql.connector.connect(
+        host="localhost",
+        user="root",
+        password=password.Password,
+        database=args.database,
+        allow_local_infile=True
+    )
+    try:
+        load_csv_ids(conn, args.csv, args.table, args.column, as_text=args.as_text).print_report()
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,9 @@
 import time
 import hashlib
-import requests
 import password
-import csv
+
+from id_store import open_known_ids
+from http_client import get_session
 
 API_KEY = password.API_KEY
 API_SECRET = password.API_SECRET
@@ -43,7 +44,7 @@ headers = {
 # Iterate over categories
 for category in CATEGORIES:
     url = f"https://api.podcastindex.org/api/1.0/search/byterm?q={category}"
-    response = requests.get(url, headers=headers)
+    response = get_session().get(url, headers=headers)
 
     if response.status_code == 200:
         feeds = response.json().get("feeds", [])
@@ -64,17 +65,15 @@ with open("all_apple_ids.txt", "w", encoding="utf-8") as f:
 print(f"📦 Saved {len(all_ids)} Apple IDs to 'all_apple_ids.txt'")
 
 
-# Load existing Apple IDs from CSV
-with open("apple_ids.csv", "r", encoding="utf-8") as csvfile:
-    reader = csv.reader(csvfile)
-    existing_ids = {row[0].strip() for row in reader if row}  # Handle blank rows
+# Open the known Apple ID store (shadows apple_ids.csv)
+known_ids = open_known_ids("apple_ids.csv")
 
 # Load newly fetched Apple IDs from TXT
 with open("all_apple_ids.txt", "r", encoding="utf-8") as txtfile:
     new_ids = {line.strip() for line in txtfile if line.strip()}
 
 # Get IDs that are in new list but not in existing CSV
-unique_ids = new_ids - existing_ids
+unique_ids = {str(i) for i in known_ids.missing(new_ids)}
 
 # Print or save
 print(f"🆕 Found {len(unique_ids)} new Apple IDs")
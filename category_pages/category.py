@@ -1,7 +1,10 @@
 
-import requests
-from bs4 import BeautifulSoup
-import re
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from http_client import print_connection_report
+from genre_crawler import GenreCrawler, IdSink
 
 category = [
     1301, # arts
@@ -70,61 +73,24 @@ category = [
     ]
 
 
-base_url = "https://podcasts.apple.com/us/genre/"
+base_url = "https://podcasts.apple.com/{country}/genre/{category}"
 min_len = 8
 max_len = 16
 
+# Save to new.txt as IDs are found
+sink = IdSink("new.txt")
+crawler = GenreCrawler(sink, url_template=base_url, min_len=min_len, max_len=max_len)
+failed = crawler.run(["us"], category)
+sink.close()
 
-all_ids = set()
-failed = []
-for categoryid in category:
-    url = f"{base_url}{categoryid}"
-    print(f"Fetching: {url}")
-    try:
-        r = requests.get(url, headers={
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"
-        }, timeout=10)
-        
-        if r.status_code != 200:
-            print(f"Failed to fetch {url} (status {r.status_code})")
-            failed.append((categoryid,url))
-            continue
-        
-        soup = BeautifulSoup(r.text, "html.parser")
-      
-        for a in soup.select("a[href*='/podcast/']"):
-            href = a.get("href", "")
-            match = re.search(r"/id(\d+)", href)
-            if match:
-                pid = match.group(1)
-                if (min_len <= len(pid) <= max_len):
-                    all_ids.add(pid)
- 
-
-    except Exception as e:
-        print(f"Error fetching {url}: {e}")
-        failed.append(categoryid)
-        
-print("length of all ids is : ", len(all_ids))
-# ===== RESULTS =====
-# for ids in all_ids:
-#     print(ids)
-
-
+print("length of all ids is : ", len(sink.ids))
+print_connection_report()
 
 if failed:
     print("\n=== Failed Fetches ===")
-    for categoryid, url in failed:
+    for country, categoryid, url in failed:
         print(f"Genre {categoryid} | URL: {url}")
 
-# Save to new.txt
-with open("new.txt", "w", encoding="utf-8") as f:
-    for itunes_id in sorted(all_ids):
-        f.write(f"{itunes_id}\n")
-
-
-
-
 
 subcategories =[
     1306, #Food
@@ -1,6 +1,19 @@
-import requests
-from bs4 import BeautifulSoup
-import re
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from http_client import print_connection_report
+from crawl_checkpoint import CrawlCheckpoint
+from genre_crawler import GenreCrawler, IdSink, GLOBAL_CONCURRENCY, PER_COUNTRY_CONCURRENCY
+from rate_governor import print_governor_report
+
+parser = argparse.ArgumentParser(description="Collect podcast IDs from every genre page in every country")
+parser.add_argument("--fresh", action="store_true", help="Ignore an unfinished checkpoint and start over")
+parser.add_argument("--concurrency", type=int, default=GLOBAL_CONCURRENCY, help="Genre pages in flight overall")
+parser.add_argument("--per-country", type=int, default=PER_COUNTRY_CONCURRENCY,
+                    help="Genre pages in flight per country")
+args = parser.parse_args()
 
 # Countries to iterate over
 countries = [
@@ -31,48 +44,27 @@ categories = [
 base_url = "https://podcasts.apple.com/{country}/genre/{category}"
 min_len = 8
 max_len = 16
-all_ids = set()       # master set for unique IDs
-failed_logs = []      # store (country, category_id, url) for all failures
-
-for country in countries:
-    print(f"\n=== Scraping for country: {country} ===")
-    
-    for category_id in categories:
-        url = base_url.format(country=country, category=category_id)
-        print(f"Fetching: {url}")
-        
-        try:
-            r = requests.get(url, headers={
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"
-            }, timeout=10)
 
-            if r.status_code != 200:
-                print(f"Failed to fetch {url} (status {r.status_code})")
-                failed_logs.append((country, category_id, url))
-                continue
+# Every finished (country, genre) page is committed with its IDs, so a restart skips it
+checkpoint = CrawlCheckpoint("category_pages_forcountries", fresh=args.fresh)
 
-            soup = BeautifulSoup(r.text, "html.parser")
-            for a in soup.select("a[href*='/podcast/']"):
-                href = a.get("href", "")
-                match = re.search(r"/id(\d+)", href)
-                if match:
-                    pid = match.group(1)
-                    if min_len <= len(pid) <= max_len:
-                        all_ids.add(pid)
+# IDs are streamed to podcast_ids.txt as they are found (seeded with any resumed pages)
+sink = IdSink("podcast_ids.txt", seed=checkpoint.all_ids())
+crawler = GenreCrawler(sink, checkpoint=checkpoint, url_template=base_url,
+                       global_concurrency=args.concurrency, per_country_concurrency=args.per_country,
+                       min_len=min_len, max_len=max_len)
+failed_logs = crawler.run(countries, categories)  # (country, category_id, url) still failing after retries
+sink.close()
 
-        except Exception as e:
-            print(f"Error fetching {url}: {e}")
-            failed_logs.append((country, category_id, url))
-
-print(f"\n✅ Total unique IDs collected: {len(all_ids)}")
-
-# Save all unique IDs in one file
-with open("podcast_ids.txt", "w", encoding="utf-8") as f:
-    for pid in sorted(all_ids):
-        f.write(f"{pid}\n")
+print(f"\n✅ Total unique IDs collected: {len(sink.ids)}")
+checkpoint.print_report()
+print_governor_report()
+print_connection_report()
 
 # Save all failures in one file
 if failed_logs:
     with open("failed.txt", "w", encoding="utf-8") as f:
         for country, category_id, url in failed_logs:
             f.write(f"Country: {country} | Genre: {category_id} | URL: {url}\n")
+
+checkpoint.finish()
@@ -1,32 +1,26 @@
 
 import csv
-import os
+
+from id_store import open_known_ids, as_id_array
+from id_diff import subtract_ids
 
 CSV_FILENAME = "apple_ids.csv"
 new_file = "using_gzip_files/new.txt"
 
-# Load existing podcast IDs from CSV
-def load_existing_ids(filename):
-    if not os.path.exists(filename):
-        return set()
-    with open(filename, mode="r", newline="", encoding="utf-8") as file:
-        reader = csv.reader(file)
-        return {row[0] for row in reader if row}
-    
 # Load existing Apple IDs from TXT (one ID per line)
 with open(new_file, "r", encoding="utf-8") as f:
-    new_ids = {line.strip() for line in f if line.strip()}
+    new_ids = as_id_array(line for line in f)
 
-# existing ids
-existing_ids = load_existing_ids(CSV_FILENAME)
+# existing ids (memory-mapped store shadowing the CSV)
+known_ids = open_known_ids(CSV_FILENAME)
 
 
 # Compare to find new IDs
-unique_ids = new_ids - existing_ids
+unique_ids = subtract_ids(new_ids, known_ids)
 
 
 # Output result
-print(f"Total itunesIds in CSV: {len(existing_ids)}")
+print(f"Total itunesIds in CSV: {len(known_ids)}")
 print(f"Total ituneIds in TXT: {len(new_ids)}")
 print(f"Found {len(unique_ids)} new Apple IDs to verify...")
     
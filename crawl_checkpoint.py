@@ -0,0 +1,146 @@
+# Durable checkpoints so long crawls can resume where they stopped
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from typing import Iterable, List, Set, Tuple
+
+DEFAULT_CHECKPOINT_PATH = "crawl_checkpoint.db"
+
+
+def unit_key(*parts) -> str:
+    """Key for one unit of work, e.g. unit_key("us", 1301) -> "us/1301" """
+    return "/".join(str(p) for p in parts)
+
+
+class CrawlCheckpoint:
+    """SQLite (WAL mode) record of the finished work units of a named crawl and the IDs each found.
+
+    Every unit is committed on its own as soon as it completes, so a crash
+    loses at most the page in flight. Opening the checkpoint of a crawl
+    that did not reach :meth:`finish` resumes it; opening one that did (or
+    passing ``fresh=True``) starts a new run.
+    """
+
+    def __init__(self, crawl: str, path: str = DEFAULT_CHECKPOINT_PATH, fresh: bool = False):
+        self.crawl = crawl
+        self.path = path
+        self.completed_this_run = 0
+        self.failed_this_run = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS crawls (
+                crawl TEXT PRIMARY KEY,
+                started_at REAL NOT NULL,
+                finished_at REAL
+            )
+        """)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS units (
+                crawl TEXT NOT NULL,
+                unit TEXT NOT NULL,
+                status TEXT NOT NULL,
+                ids BLOB,
+                id_count INTEGER NOT NULL DEFAULT 0,
+                detail TEXT,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (crawl, unit)
+            )
+        """)
+        self._conn.commit()
+
+        row = self._conn.execute(
+            "SELECT started_at, finished_at FROM crawls WHERE crawl = ?", (crawl,)
+        ).fetchone()
+        if row is None or row[1] is not None or fresh:
+            self._start_run()
+        else:
+            done = len(self.done_units())
+            print(f"♻️ Resuming crawl '{crawl}' started {time.ctime(row[0])}: "
+                  f"{done} units already done, {len(self.all_ids())} IDs so far")
+
+    def _start_run(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM units WHERE crawl = ?", (self.crawl,))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO crawls (crawl, started_at, finished_at) VALUES (?, ?, NULL)",
+                (self.crawl, time.time())
+            )
+            self._conn.commit()
+        print(f"🆕 Starting crawl '{self.crawl}' (checkpoint: {os.path.abspath(self.path)})")
+
+    def done_units(self) -> Set[str]:
+        """Units that completed in this run, including before a restart"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT unit FROM units WHERE crawl = ? AND status = 'done'", (self.crawl,)
+            ).fetchall()
+        return {unit for (unit,) in rows}
+
+    def is_done(self, unit: str) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM units WHERE crawl = ? AND unit = ? AND status = 'done'", (self.crawl, unit)
+            ).fetchone()
+        return row is not None
+
+    def mark_done(self, unit: str, ids: Iterable) -> None:
+        """Durably record a completed unit together with the IDs it found"""
+        packed = array("q", sorted({int(i) for i in ids}))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO units VALUES (?, ?, 'done', ?, ?, NULL, ?)",
+                (self.crawl, unit, packed.tobytes(), len(packed), time.time())
+            )
+            self._conn.commit()
+            self.completed_this_run += 1
+
+    def mark_failed(self, unit: str, detail: str = "") -> None:
+        """Record a failed unit; it is retried when the crawl resumes"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO units VALUES (?, ?, 'failed', NULL, 0, ?, ?)",
+                (self.crawl, unit, detail, time.time())
+            )
+            self._conn.commit()
+            self.failed_this_run += 1
+
+    def failed_units(self) -> List[Tuple[str, str]]:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT unit, detail FROM units WHERE crawl = ? AND status = 'failed' ORDER BY unit",
+                (self.crawl,)
+            ).fetchall()
+
+    def all_ids(self) -> Set[str]:
+        """Union of the IDs found by every completed unit"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT ids FROM units WHERE crawl = ? AND status = 'done'", (self.crawl,)
+            ).fetchall()
+        ids: Set[str] = set()
+        for (blob,) in rows:
+            packed = array("q")
+            packed.frombytes(blob)
+            ids.update(str(i) for i in packed)
+        return ids
+
+    def finish(self) -> None:
+        """Mark the run complete; the next open starts over"""
+        with self._lock:
+            self._conn.execute("UPDATE crawls SET finished_at = ? WHERE crawl = ?", (time.time(), self.crawl))
+            self._conn.commit()
+
+    def print_report(self) -> None:
+        done = len(self.done_units())
+        print(f"📌 Checkpoint '{self.crawl}': {done} units done "
+              f"({done - self.completed_this_run} resumed, {self.completed_this_run} this run), "
+              f"{self.failed_this_run} failed this run")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -3,13 +3,16 @@ import json
 import mysql.connector
 from datetime import datetime
 import password
+from bulk_load import load_ids
+from id_store import as_id_array
 
 # MySQL DB connection
 db = mysql.connector.connect(
     host="localhost",
     user="root",
     password=password.Password,
-    database="store"
+    database="store",
+    allow_local_infile=True
 )
 cursor = db.cursor()
 
@@ -30,12 +33,9 @@ new_ids = json_ids - existing_ids
 # Step 5: Insert new IDs into `new_ids` table with timestamp
 if new_ids:
     print(f"Found {len(new_ids)} new IDs. \nInserting into database...")
-    for aid in new_ids:
-        cursor.execute(
-            "INSERT INTO new_ids (apple_id, discovered_at) VALUES (%s, %s)",
-            (int(aid), datetime.now())
-        )
-    db.commit()
+    # One bulk load, every row stamped with the same discovery time
+    stats = load_ids(db, "new_ids", [as_id_array(new_ids)], extra={"discovered_at": datetime.now()})
+    stats.print_report()
     print("Insertion complete.")
 else:
     print("No new IDs found.")
@@ -1,51 +1,36 @@
 import mysql.connector
 import password
-
-# Database connection
-conn = mysql.connector.connect(
-    host=password.dbhost,
-    user=password.dbuser,
-    password=password.dbpass,
-    database=password.dbname
-)
-cursor = conn.cursor()
+from snapshot_diff import DiffWriter, diff_tables
 
 # Tables to compare
 table1 = "spotify_charts_20250827_080606"
 table2 = "spotify_charts_20250827_131212"
 
-# Define the key columns for comparison
-key_columns = ["showId", "countryCode", "category", "chart_rank"]
-
-# Build SELECT queries
-columns_str = ", ".join(key_columns)
-
-query1 = f"SELECT {columns_str} FROM {table1}"
-query2 = f"SELECT {columns_str} FROM {table2}"
+# A chart entry is identified by these columns; chart_rank is compared, so a rank change shows up as "changed"
+key_columns = ["showId", "countryCode", "category"]
+value_columns = ["chart_rank"]
+output_file = "different.csv"
 
-# Fetch data
-cursor.execute(query1)
-data1 = set(cursor.fetchall())
 
-cursor.execute(query2)
-data2 = set(cursor.fetchall())
+def connect():
+    return mysql.connector.connect(
+        host=password.dbhost,
+        user=password.dbuser,
+        password=password.dbpass,
+        database=password.dbname
+    )
 
-# Find differences
-only_in_table1 = data1 - data2
-only_in_table2 = data2 - data1
 
-# Save results to file
-with open("different.txt", "w", encoding="utf-8") as f:
-    f.write(f"--- Present in {table1} but not in {table2} ---\n")
-    for row in only_in_table1:
-        f.write(str(row) + "\n")
+# Both tables are streamed in key order at the same time, one connection each
+conn1 = connect()
+conn2 = connect()
 
-    f.write(f"\n--- Present in {table2} but not in {table1} ---\n")
-    for row in only_in_table2:
-        f.write(str(row) + "\n")
+with DiffWriter(output_file, key_columns, value_columns) as writer:
+    stats = diff_tables(conn1, conn2, table1, table2, writer, key_columns, value_columns)
 
-print("Comparison complete. Differences saved to different.txt")
+stats.print_report()
+print(f"Comparison complete. Differences saved to {output_file}")
 
 # Cleanup
-cursor.close()
-conn.close()
+conn1.close()
+conn2.close()
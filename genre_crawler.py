@@ -0,0 +1,159 @@
+# Async crawl engine for the Apple genre-page matrix (countries x genres)
+import asyncio
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import httpx
+from selectolax.lexbor import LexborHTMLParser
+
+from crawl_checkpoint import CrawlCheckpoint, unit_key
+from http_client import get_async_client
+from id_extract import href_ids
+from rate_governor import get_governor
+from url_frontier import UrlFrontier
+
+GENRE_URL = "https://podcasts.apple.com/{country}/genre/{category}"
+GLOBAL_CONCURRENCY = 32     # Genre pages in flight overall
+PER_COUNTRY_CONCURRENCY = 4 # ... and per country storefront
+START_RATE = 10.0           # Starting requests/sec for podcasts.apple.com; the governor adapts it
+RETRY_ROUNDS = 2            # Extra passes over failed pages at the end
+RETRY_PAUSE = 10.0          # Seconds before each retry pass
+TIMEOUT = 15
+
+# (country, category, url)
+FailedPage = Tuple[str, object, str]
+
+
+def parse_genre_page(html: str, min_len: int = 1, max_len: int = 18) -> Set[str]:
+    """Podcast IDs linked from a genre page"""
+    nodes = LexborHTMLParser(html).css("a[href*='/podcast/']")
+    return href_ids((node.attributes.get("href") or "" for node in nodes), min_len, max_len)
+
+
+class IdSink:
+    """Append each newly seen ID to a text file as soon as it is found"""
+
+    def __init__(self, path: str, seed: Iterable[str] = ()):
+        self.path = path
+        self.ids: Set[str] = set(seed)
+        self._file = open(path, "w", encoding="utf-8")
+        for pid in sorted(self.ids):
+            self._file.write(f"{pid}\n")
+        self._file.flush()
+
+    def add(self, ids: Iterable[str]) -> int:
+        new_ids = [pid for pid in ids if pid not in self.ids]
+        if new_ids:
+            self.ids.update(new_ids)
+            self._file.write("".join(f"{pid}\n" for pid in new_ids))
+            self._file.flush()
+        return len(new_ids)
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class GenreCrawler:
+    """Fetch every (country, genre) page concurrently and stream the IDs found.
+
+    Concurrency is bounded both overall and per country storefront, and
+    request starts go through the podcasts.apple.com rate governor. Pages
+    that fail are collected in ``failed_logs`` and retried in extra passes
+    once everything else is done. With a checkpoint, finished pages are
+    skipped and each page is committed as soon as it is parsed. Repeated
+    (country, genre) URLs are fetched once, and a page whose body matches
+    one already parsed reuses that page's IDs.
+    """
+
+    def __init__(self, sink: IdSink, checkpoint: Optional[CrawlCheckpoint] = None,
+                 url_template: str = GENRE_URL, global_concurrency: int = GLOBAL_CONCURRENCY,
+                 per_country_concurrency: int = PER_COUNTRY_CONCURRENCY, retry_rounds: int = RETRY_ROUNDS,
+                 timeout: float = TIMEOUT, min_len: int = 1, max_len: int = 18):
+        self.sink = sink
+        self.checkpoint = checkpoint
+        self.url_template = url_template
+        self.global_concurrency = global_concurrency
+        self.per_country_concurrency = per_country_concurrency
+        self.retry_rounds = retry_rounds
+        self.timeout = timeout
+        self.min_len = min_len
+        self.max_len = max_len
+        self.governor = get_governor(url_template.format(country="us", category=0), rate=START_RATE)
+        self.frontier = UrlFrontier()
+        self.failed_logs: List[FailedPage] = []
+        self.pages_done = 0
+        self.pages_total = 0
+
+    async def _crawl_page(self, client: httpx.AsyncClient, country: str, category,
+                          global_sem: asyncio.Semaphore, country_sems: Dict[str, asyncio.Semaphore]) -> None:
+        url = self.url_template.format(country=country, category=category)
+        unit = unit_key(country, category)
+        try:
+            # Country slot first: tasks are queued country by country, so taking a global slot first
+            # would park them there while they wait on their own country
+            async with country_sems[country], global_sem:
+                await self.governor.acquire_async()
+                response = await client.get(url)
+            self.governor.record_response(response)
+            if response.status_code != 200:
+                raise RuntimeError(f"status {response.status_code}")
+            ids = self.frontier.parsed(response.content)
+            if ids is None:
+                ids = parse_genre_page(response.text, self.min_len, self.max_len)
+                self.frontier.remember(response.content, ids)
+        except Exception as e:
+            print(f"❌ {url}: {e}")
+            self.failed_logs.append((country, category, url))
+            if self.checkpoint:
+                self.checkpoint.mark_failed(unit, str(e))
+            return
+
+        new_count = self.sink.add(ids)
+        if self.checkpoint:
+            self.checkpoint.mark_done(unit, ids)
+        self.pages_done += 1
+        print(f"✅ [{self.pages_done}/{self.pages_total}] {country}/{category}: "
+              f"{len(ids)} IDs, {new_count} new ({len(self.sink.ids)} total)")
+
+    async def _crawl(self, pages: List[Tuple[str, object]]) -> None:
+        global_sem = asyncio.Semaphore(self.global_concurrency)
+        country_sems = defaultdict(lambda: asyncio.Semaphore(self.per_country_concurrency))
+        async with get_async_client(max_connections=self.global_concurrency, timeout=self.timeout,
+                                    follow_redirects=True) as client:
+            await asyncio.gather(*(
+                self._crawl_page(client, country, category, global_sem, country_sems)
+                for country, category in pages
+            ))
+
+    def run(self, countries: Iterable[str], categories: Iterable) -> List[FailedPage]:
+        """Crawl the matrix, then retry failures; returns the pages that still failed"""
+        done = self.checkpoint.done_units() if self.checkpoint else set()
+        categories = list(categories)
+        pages = [
+            (country, category) for country in countries for category in categories
+            if unit_key(country, category) not in done
+            and self.frontier.add(self.url_template.format(country=country, category=category))
+        ]
+        self.pages_total = len(pages)
+        start_time = time.time()
+        print(f"🚀 Crawling {len(pages)} genre pages ({len(done)} already done), "
+              f"{self.global_concurrency} in flight, {self.per_country_concurrency} per country")
+        asyncio.run(self._crawl(pages))
+
+        for round_no in range(1, self.retry_rounds + 1):
+            if not self.failed_logs:
+                break
+            retry = [(country, category) for country, category, _ in self.failed_logs]
+            self.failed_logs = []
+            print(f"\n🔁 Retry pass {round_no}/{self.retry_rounds}: {len(retry)} failed pages "
+                  f"(after {RETRY_PAUSE:.0f}s)")
+            time.sleep(RETRY_PAUSE)
+            asyncio.run(self._crawl(retry))
+
+        elapsed = time.time() - start_time
+        rate = self.pages_done / elapsed if elapsed else 0.0
+        print(f"\n⚡ {self.pages_done} pages in {elapsed:.1f}s ({rate:.1f} pages/sec), "
+              f"{len(self.failed_logs)} still failing, {len(self.sink.ids)} unique IDs")
+        self.frontier.print_report()
+        return self.failed_logs
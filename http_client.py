@@ -0,0 +1,142 @@
+# Shared HTTP client layer: pooled keep-alive sessions for every fetcher
+import importlib.util
+import threading
+from collections import Counter
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from rate_governor import governed_request
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+# httpx only speaks HTTP/2 when h2 is installed
+HTTP2_AVAILABLE = httpx is not None and importlib.util.find_spec("h2") is not None
+
+POOL_SIZE = 16              # Keep-alive connections kept per host
+MAX_HOSTS = 64              # Per-host pools kept before the least recently used is dropped
+RETRIES = 3                 # Connection errors and 500/502/504 on safe methods
+BACKOFF_FACTOR = 0.5
+ASYNC_MAX_CONNECTIONS = 32
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+_session: Optional[requests.Session] = None
+_session_pool_size = 0
+_session_lock = threading.Lock()
+_retired_stats: Dict[str, Counter] = {}
+_async_versions: Counter = Counter()
+
+
+def _make_adapter(pool_size: int) -> HTTPAdapter:
+    # 429/503 are left to the rate governor so it can slow the host down
+    retry = Retry(
+        total=RETRIES,
+        backoff_factor=BACKOFF_FACTOR,
+        status_forcelist=(500, 502, 504),
+        allowed_methods=frozenset(["GET", "HEAD", "OPTIONS"]),
+        raise_on_status=False,
+    )
+    return HTTPAdapter(pool_connections=MAX_HOSTS, pool_maxsize=pool_size, max_retries=retry)
+
+
+def _pool_stats(adapter: HTTPAdapter) -> Dict[str, Counter]:
+    stats = {}
+    pools = adapter.poolmanager.pools
+    for key in list(pools.keys()):
+        pool = pools.get(key)
+        if pool is None:
+            continue
+        host = f"{key.key_host}:{key.key_port}" if key.key_port else key.key_host
+        stats[host] = Counter(connections=pool.num_connections, requests=pool.num_requests)
+    return stats
+
+
+def get_session(pool_size: int = POOL_SIZE) -> requests.Session:
+    """The process-wide session; its per-host pools grow to ``pool_size`` if needed"""
+    global _session, _session_pool_size
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            _session.headers["User-Agent"] = USER_AGENT
+        if pool_size > _session_pool_size:
+            old = _session.adapters.get("https://")
+            if old is not None:
+                # Keep the counters of the pools that are about to be replaced
+                for host, counts in _pool_stats(old).items():
+                    _retired_stats.setdefault(host, Counter()).update(counts)
+                # Idle connections are closed now; ones in use are closed when they are released
+                old.close()
+            adapter = _make_adapter(pool_size)
+            _session.mount("https://", adapter)
+            _session.mount("http://", adapter)
+            _session_pool_size = pool_size
+        return _session
+
+
+def http_request(method: str, url: str, governed: bool = True, **kwargs) -> requests.Response:
+    """Send a request over the shared session, paced by the host's rate governor"""
+    session = get_session()
+    if governed:
+        return governed_request(method, url, session=session, **kwargs)
+    return session.request(method, url, **kwargs)
+
+
+def http_get(url: str, governed: bool = True, **kwargs) -> requests.Response:
+    """GET over the shared session (see :func:`http_request`)"""
+    return http_request("GET", url, governed=governed, **kwargs)
+
+
+async def _count_async_response(response) -> None:
+    _async_versions[response.http_version] += 1
+
+
+def get_async_client(max_connections: int = ASYNC_MAX_CONNECTIONS, timeout: float = 30, **kwargs):
+    """httpx.AsyncClient with keep-alive pooling, speaking HTTP/2 when h2 is installed"""
+    if httpx is None:
+        raise ImportError("httpx is required for the async client (pip install httpx[http2])")
+    limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+    return httpx.AsyncClient(
+        http2=HTTP2_AVAILABLE,
+        limits=limits,
+        timeout=timeout,
+        headers={"User-Agent": USER_AGENT},
+        event_hooks={"response": [_count_async_response]},
+        **kwargs
+    )
+
+
+def connection_stats() -> Dict[str, Dict[str, int]]:
+    """Per-host new connections (handshakes) vs. requests served over the shared session"""
+    totals: Dict[str, Counter] = {host: Counter(c) for host, c in _retired_stats.items()}
+    with _session_lock:
+        adapter = _session.adapters.get("https://") if _session is not None else None
+    if adapter is not None:
+        for host, counts in _pool_stats(adapter).items():
+            totals.setdefault(host, Counter()).update(counts)
+    return {
+        host: {
+            "requests": c["requests"],
+            "new_connections": c["connections"],
+            "reused": max(0, c["requests"] - c["connections"]),
+        }
+        for host, c in totals.items()
+    }
+
+
+def print_connection_report() -> None:
+    """Print connection reuse per host for this process"""
+    stats = connection_stats()
+    if stats:
+        print("🔌 Connection reuse:")
+    for host, s in sorted(stats.items()):
+        ratio = s["reused"] / s["requests"] * 100 if s["requests"] else 0.0
+        print(f"   {host}: {s['requests']} requests, {s['new_connections']} handshakes, "
+              f"{s['reused']} reused ({ratio:.1f}%)")
+    if _async_versions:
+        versions = ", ".join(f"{v}: {n}" for v, n in sorted(_async_versions.items()))
+        print(f"   async client responses by protocol: {versions}")
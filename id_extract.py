@@ -0,0 +1,230 @@
+# Regex-free extraction of Apple IDs ("/id<digits>") from raw bytes
+import argparse
+import mmap
+import os
+import re
+import time
+from typing import Callable, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from id_store import as_id_array, sorted_unique
+from id_validation import MAX_ID_DIGITS
+
+SLASH, LOWER_I, LOWER_D, ZERO = b"/id0"
+MARKER_LEN = 3              # len(b"/id")
+INITIAL_CAPACITY = 4096     # IDs the scanner has room for before it grows its output array
+
+
+def _as_bytes_array(data) -> np.ndarray:
+    """Zero-copy uint8 view of bytes, bytearray, memoryview or mmap (str is encoded)"""
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return np.frombuffer(data, dtype=np.uint8)
+
+
+def _scan(buf: np.ndarray, limit: int, min_len: int, max_len: int) -> np.ndarray:
+    """IDs after every "/id" that starts before `limit`.
+
+    `buf` has to extend at least max_len + MARKER_LEN bytes past `limit`,
+    so every candidate can be read as a fixed-width window.
+    """
+    # "d" is the rarest of the three marker bytes in URLs, so look for it first
+    starts = np.flatnonzero(buf[2:max(limit, 0) + 2] == LOWER_D)
+    starts = starts[(buf[starts] == SLASH) & (buf[starts + 1] == LOWER_I)]
+    if not len(starts):
+        return np.empty(0, dtype=np.int64)
+
+    # One row per candidate: the max_len + 1 bytes after "/id", as digit values (non-digits wrap to >= 10)
+    window = sliding_window_view(buf, max_len + 1)[starts + MARKER_LEN] - np.uint8(ZERO)
+    # Length of the digit run; a run longer than max_len has no non-digit in the window and gives 0
+    lengths = np.argmin(window < 10, axis=1)
+    keep = lengths >= min_len
+    window, lengths = window[keep], lengths[keep]
+
+    values = np.zeros(len(lengths), dtype=np.int64)
+    for k in range(int(lengths.max(initial=0))):
+        values = np.where(lengths > k, values * 10 + window[:, k], values)
+    return values
+
+
+class IdScanner:
+    """Incremental byte scanner for "/id<digits>" that handles IDs split across chunks.
+
+    Each chunk is scanned in place; only the last max_len + 3 bytes are
+    carried over to the next one, because an ID starting there may not be
+    complete yet. IDs are written, in order of appearance and with
+    repeats, into one preallocated int64 array that grows when full.
+    """
+
+    def __init__(self, min_len: int = 1, max_len: int = MAX_ID_DIGITS,
+                 capacity: int = INITIAL_CAPACITY, out: Optional[np.ndarray] = None):
+        if not 1 <= min_len <= max_len <= MAX_ID_DIGITS:
+            raise ValueError(f"need 1 <= min_len <= max_len <= {MAX_ID_DIGITS}, got {min_len}, {max_len}")
+        self.min_len = min_len
+        self.max_len = max_len
+        self.margin = max_len + MARKER_LEN
+        self.bytes_in = 0
+        self.count = 0
+        self._out = out if out is not None else np.empty(capacity, dtype=np.int64)
+        self._carry = np.empty(0, dtype=np.uint8)
+
+    @property
+    def ids(self) -> np.ndarray:
+        """IDs found so far"""
+        return self._out[:self.count]
+
+    def _append(self, values: np.ndarray) -> None:
+        end = self.count + len(values)
+        if end > len(self._out):
+            grown = np.empty(max(end, 2 * len(self._out)), dtype=np.int64)
+            grown[:self.count] = self._out[:self.count]
+            self._out = grown
+        self._out[self.count:end] = values
+        self.count = end
+
+    def feed(self, data) -> int:
+        """Scan the next chunk; returns how many IDs were completed by it"""
+        buf = _as_bytes_array(data)
+        if not len(buf):
+            return 0
+        self.bytes_in += len(buf)
+        before = self.count
+        carried = len(self._carry)
+        total = carried + len(buf)
+
+        # IDs starting in the carried tail: scan it together with the head of this chunk
+        if carried:
+            joint = np.concatenate([self._carry, buf[:self.margin]])
+            self._append(_scan(joint, min(carried, total - self.margin), self.min_len, self.max_len))
+        # IDs starting in this chunk that are complete within it
+        self._append(_scan(buf, len(buf) - self.margin, self.min_len, self.max_len))
+
+        if len(buf) >= self.margin:
+            self._carry = buf[-self.margin:].copy()
+        else:
+            self._carry = np.concatenate([self._carry, buf])[-self.margin:]
+        return self.count - before
+
+    def close(self) -> np.ndarray:
+        """Scan what is left of the last chunk and return all IDs"""
+        if len(self._carry):
+            padded = np.concatenate([self._carry, np.zeros(self.margin, dtype=np.uint8)])
+            self._append(_scan(padded, len(self._carry), self.min_len, self.max_len))
+            self._carry = np.empty(0, dtype=np.uint8)
+        return self.ids
+
+
+def extract_ids(data, min_len: int = 1, max_len: int = MAX_ID_DIGITS,
+                out: Optional[np.ndarray] = None) -> np.ndarray:
+    """All IDs in a buffer as int64, in order of appearance (repeats included)"""
+    scanner = IdScanner(min_len, max_len, out=out)
+    scanner.feed(data)
+    return scanner.close()
+
+
+def extract_id_set(data, min_len: int = 1, max_len: int = MAX_ID_DIGITS) -> Set[str]:
+    """Unique IDs in a buffer as strings, the form the crawl scripts store"""
+    return {str(i) for i in sorted_unique(extract_ids(data, min_len, max_len)).tolist()}
+
+
+def href_ids(hrefs: Iterable[str], min_len: int = 1, max_len: int = MAX_ID_DIGITS) -> Set[str]:
+    """Unique IDs of a page's links, scanned in one pass instead of one regex call per href"""
+    return extract_id_set("\n".join(hrefs), min_len, max_len)
+
+
+def extract_file_ids(path: str, min_len: int = 1, max_len: int = MAX_ID_DIGITS) -> np.ndarray:
+    """IDs in a local file, scanned through a memory map without reading it into Python"""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return np.empty(0, dtype=np.int64)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            ids = extract_ids(mapped, min_len, max_len)
+            # Drop the view on the map before it is closed
+            return ids.copy()
+
+
+# ---------------------------------------------------------------------------
+# Benchmark against the regex / split approaches used in the crawl scripts
+# ---------------------------------------------------------------------------
+
+def _sample_sitemap(count: int) -> bytes:
+    """Sitemap-like body; every third <loc> is an episode link (".../id123?i=456"), which split("id") gets wrong"""
+    rows = []
+    for n in range(count):
+        query = f"?i={2000000000 + n}" if n % 3 == 0 else ""
+        rows.append(f"<url><loc>https://podcasts.apple.com/us/podcast/daily-news/id{1000000000 + n * 7}{query}</loc></url>")
+    return ("<urlset>\n" + "\n".join(rows) + "\n</urlset>\n").encode("utf-8")
+
+
+def _findall_text(data: bytes, min_len: int, max_len: int) -> np.ndarray:
+    found = re.findall(r"/id(\d+)", data.decode("utf-8"))
+    return as_id_array(m for m in found if min_len <= len(m) <= max_len)
+
+
+def _search_per_line(data: bytes, min_len: int, max_len: int) -> np.ndarray:
+    ids = set()
+    for line in data.decode("utf-8").splitlines():
+        match = re.search(r"/id(\d+)", line)
+        if match and min_len <= len(match.group(1)) <= max_len:
+            ids.add(match.group(1))
+    return as_id_array(ids)
+
+
+def _split_id(data: bytes, min_len: int, max_len: int) -> np.ndarray:
+    ids = set()
+    for line in data.decode("utf-8").splitlines():
+        if "<loc>" in line:
+            url = line.split("<loc>")[1].split("</loc>")[0]
+            ids.add(url.split("id")[-1])
+    return as_id_array(ids)
+
+
+def _scan_bytes(data: bytes, min_len: int, max_len: int) -> np.ndarray:
+    return sorted_unique(extract_ids(data, min_len, max_len))
+
+
+def benchmark(data: bytes, min_len: int = 1, max_len: int = MAX_ID_DIGITS, repeat: int = 3) -> None:
+    """Time each approach from raw body to sorted unique int64 IDs, the form id_store works with"""
+    methods: List[Tuple[str, Callable]] = [
+        ("re.findall on decoded text", _findall_text),
+        ("re.search per line/href", _search_per_line),
+        ('url.split("id")', _split_id),
+        ("extract_ids on bytes", _scan_bytes),
+    ]
+    expected = _scan_bytes(data, min_len, max_len)
+    mb = len(data) / 1e6
+    print(f"📏 {mb:.1f} MB, {len(expected)} unique IDs (min_len={min_len}, max_len={max_len})")
+    for name, fn in methods:
+        best = float("inf")
+        for _ in range(repeat):
+            started = time.perf_counter()
+            found = fn(data, min_len, max_len)
+            best = min(best, time.perf_counter() - started)
+        status = "✅" if np.array_equal(found, expected) else "❌ different IDs"
+        print(f"   {name:<28} {best * 1000:8.1f} ms  {mb / best:8.1f} MB/s  {status}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract Apple IDs from files, or benchmark the extractor")
+    parser.add_argument("files", nargs="*", help="Files to scan (a synthetic sitemap is used for --benchmark if none)")
+    parser.add_argument("--min-len", type=int, default=1)
+    parser.add_argument("--max-len", type=int, default=MAX_ID_DIGITS)
+    parser.add_argument("--benchmark", action="store_true", help="Compare against the regex approaches")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        samples = [(path, open(path, "rb").read()) for path in args.files] or [("synthetic", _sample_sitemap(500_000))]
+        for name, data in samples:
+            print(f"\n🏁 {name}")
+            benchmark(data, args.min_len, args.max_len)
+        return
+
+    for path in args.files:
+        ids = sorted_unique(extract_file_ids(path, args.min_len, args.max_len))
+        print(f"📄 {path}: {len(ids)} unique IDs")
+
+
+if __name__ == "__main__":
+    main()
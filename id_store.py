@@ -0,0 +1,184 @@
+# Persistent, memory-mapped store of known Apple IDs
+import argparse
+import os
+from typing import Iterable, Optional
+
+import numpy as np
+
+from id_validation import BIGINT_MAX, ValidationReport, read_id_chunks, validate_chunks
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+KNOWN_IDS_CSV = os.path.join(ROOT_DIR, "apple_ids.csv")
+
+
+def _is_id(value) -> bool:
+    """Scalar form of id_validation's rule: a positive integer that fits a signed BIGINT"""
+    if isinstance(value, str):
+        value = value.strip()
+        if not (value.isascii() and value.isdigit()):
+            return False
+        value = int(value)
+    if isinstance(value, (int, np.integer)):
+        return 0 < value <= int(BIGINT_MAX)
+    return False
+
+
+def sorted_unique(arr: np.ndarray) -> np.ndarray:
+    """Sort and deduplicate an int64 array (much faster than np.unique on large inputs)"""
+    arr = np.sort(arr)
+    if len(arr) < 2:
+        return arr
+    keep = np.empty(len(arr), dtype=bool)
+    keep[0] = True
+    np.not_equal(arr[1:], arr[:-1], out=keep[1:])
+    return arr[keep]
+
+
+def as_id_array(values: Iterable) -> np.ndarray:
+    """Convert str/int IDs to a sorted, unique int64 array, skipping anything non-numeric"""
+    if isinstance(values, np.ndarray):
+        return sorted_unique(values.astype(np.int64, copy=False))
+    arr = np.fromiter((int(v) for v in values if _is_id(v)), dtype=np.int64)
+    return sorted_unique(arr)
+
+
+def read_csv_ids(csv_path: str) -> np.ndarray:
+    """Read the first column of an ID CSV in chunks and return sorted unique IDs"""
+    # No header expected; a header line is simply rejected as not being an ID
+    chunks = read_id_chunks(csv_path, has_header=False)
+    parts = [sorted_unique(ids) for ids in validate_chunks(chunks, ValidationReport())]
+    if not parts:
+        return np.empty(0, dtype=np.int64)
+    return sorted_unique(np.concatenate(parts))
+
+
+def store_path_for(csv_path: str) -> str:
+    """The store lives next to its CSV: apple_ids.csv -> apple_ids.npy"""
+    return os.path.splitext(csv_path)[0] + ".npy"
+
+
+class KnownIdStore:
+    """Sorted, deduplicated int64 IDs in a memory-mapped .npy file.
+
+    Membership and set-difference queries run as binary searches directly
+    on the mapped file, so opening the store costs nothing no matter how
+    many IDs it holds. When the store shadows a CSV, appended IDs are
+    written to the CSV too, so a later rebuild keeps them.
+    """
+
+    def __init__(self, path: str, csv_path: Optional[str] = None):
+        self.path = path
+        self.csv_path = csv_path
+        self.ids = self._map()
+
+    @classmethod
+    def open(cls, csv_path: str = KNOWN_IDS_CSV, path: Optional[str] = None) -> "KnownIdStore":
+        """Open the store for a CSV, (re)building it first if the CSV is newer"""
+        path = path or store_path_for(csv_path)
+        if os.path.exists(csv_path) and (
+            not os.path.exists(path) or os.path.getmtime(csv_path) > os.path.getmtime(path)
+        ):
+            print(f"🔨 Building ID store {path} from {csv_path}...")
+            store = cls(path, csv_path)
+            store.replace(read_csv_ids(csv_path))
+            print(f"✅ ID store ready: {len(store)} IDs")
+            return store
+        if not os.path.exists(path):
+            print(f"⚠️ File not found: {csv_path}, treating as empty")
+        return cls(path, csv_path)
+
+    def _map(self) -> np.ndarray:
+        if not os.path.exists(self.path):
+            return np.empty(0, dtype=np.int64)
+        try:
+            return np.load(self.path, mmap_mode="r")
+        except ValueError:
+            # An empty array cannot be memory-mapped
+            return np.load(self.path)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, value) -> bool:
+        if not _is_id(value):
+            return False
+        value = int(value)
+        idx = np.searchsorted(self.ids, value)
+        return bool(idx < len(self.ids) and self.ids[idx] == value)
+
+    def contains(self, ids: Iterable) -> np.ndarray:
+        """Boolean mask telling which of the (sorted, unique) query IDs are known"""
+        query = as_id_array(ids)
+        if len(self.ids) == 0:
+            return np.zeros(len(query), dtype=bool)
+        idx = np.searchsorted(self.ids, query)
+        idx[idx == len(self.ids)] = 0
+        return self.ids[idx] == query
+
+    def missing(self, ids: Iterable) -> np.ndarray:
+        """IDs from ``ids`` that are not in the store"""
+        query = as_id_array(ids)
+        return query[~self.contains(query)]
+
+    def not_in(self, ids: Iterable) -> np.ndarray:
+        """IDs in the store that are not in ``ids``"""
+        other = as_id_array(ids)
+        return np.setdiff1d(self.ids, other, assume_unique=True)
+
+    def append(self, ids: Iterable) -> int:
+        """Add IDs to the store (and its CSV) and return how many were new"""
+        new = self.missing(ids)
+        if len(new) == 0:
+            return 0
+        if self.csv_path:
+            self._append_csv(new)
+        # Written after the CSV, so the store stays newer and is not rebuilt on the next open
+        self.replace(sorted_unique(np.concatenate([self.ids, new])))
+        return len(new)
+
+    def _append_csv(self, ids: np.ndarray) -> None:
+        needs_newline = False
+        if os.path.exists(self.csv_path) and os.path.getsize(self.csv_path):
+            with open(self.csv_path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                needs_newline = f.read(1) != b"\n"
+        with open(self.csv_path, "a", encoding="utf-8") as f:
+            if needs_newline:
+                f.write("\n")
+            f.write("\n".join(ids.astype(str)) + "\n")
+
+    def replace(self, ids: np.ndarray) -> None:
+        """Make the store hold exactly ``ids`` (sorted, unique int64); always rewrites the file"""
+        # Release the old mapping before replacing the file (required on Windows)
+        self.ids = np.empty(0, dtype=np.int64)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, ids)
+        os.replace(tmp_path, self.path)
+        self.ids = self._map()
+
+
+def open_known_ids(csv_path: str = KNOWN_IDS_CSV) -> KnownIdStore:
+    """Open the known-ID store that shadows ``csv_path``"""
+    store = KnownIdStore.open(csv_path)
+    print(f"📂 Loaded {len(store)} known IDs from {store.path}")
+    return store
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage the memory-mapped known Apple ID store")
+    parser.add_argument("--csv", default=KNOWN_IDS_CSV, help="CSV the store shadows")
+    parser.add_argument("--add", nargs="*", default=[],
+                        help="TXT files (one ID per line) to append to the store and CSV")
+    parser.add_argument("--rebuild", action="store_true", help="Rebuild the store from the CSV")
+    args = parser.parse_args()
+
+    if args.rebuild and os.path.exists(store_path_for(args.csv)):
+        os.remove(store_path_for(args.csv))
+
+    store = open_known_ids(args.csv)
+    for txt_path in args.add:
+        with open(txt_path, "r", encoding="utf-8") as f:
+            added = store.append(line.strip() for line in f)
+        print(f"➕ Added {added} new IDs from {txt_path}")
+    print(f"✅ Store holds {len(store)} IDs")
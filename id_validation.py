@@ -0,0 +1,194 @@
+# Vectorized Apple ID validation shared by every loader
+import argparse
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+except ImportError:
+    pa = None
+
+# Apple IDs are at most 18 digits, which always fits in a signed 64-bit integer
+MAX_ID_DIGITS = 18
+MIN_ID_DIGITS = 1
+CSV_CHUNK_ROWS = 1_000_000      # pandas fallback reader
+CSV_BLOCK_BYTES = 16 << 20      # pyarrow reader: ~1M short rows per block
+STRING_DTYPE = "string[pyarrow]" if pa is not None else "string"
+BIGINT_MAX = str(np.iinfo(np.int64).max)
+# Loaders accept anything that fits a signed BIGINT column; callers can pass a stricter max_len
+MAX_BIGINT_DIGITS = len(BIGINT_MAX)
+
+# Reject reasons, in the order they are checked; the code is the index
+REASONS = np.array(["valid", "empty", "not_digits", "not_positive", "bigint_overflow", "too_short", "too_long"],
+                   dtype=object)
+VALID, EMPTY, NOT_DIGITS, NOT_POSITIVE, BIGINT_OVERFLOW, TOO_SHORT, TOO_LONG = range(len(REASONS))
+
+
+def classify_ids(values: pd.Series, min_len: int = MIN_ID_DIGITS,
+                 max_len: int = MAX_BIGINT_DIGITS) -> Tuple[np.ndarray, np.ndarray]:
+    """Classify a whole column of candidate IDs at once.
+
+    Returns (mask, reasons): ``mask`` is True for valid IDs and
+    ``reasons`` holds one int8 code per value (see REASONS). Surrounding
+    whitespace is ignored; only ASCII digits count, so other scripts'
+    digits are rejected. The length bounds apply to the digits as written.
+    """
+    text = values.astype(STRING_DTYPE).str.strip()
+    length = text.str.len().fillna(0).to_numpy(np.int64)
+    digits = text.str.fullmatch("[0-9]+").fillna(False).to_numpy(bool)
+    zero = text.str.fullmatch("0+").fillna(False).to_numpy(bool)
+    # Checked before the length bounds: a value that cannot fit a BIGINT is reported as such.
+    # Compared as digit strings (leading zeros dropped), so nothing is ever converted out of range
+    overflow = np.zeros(len(text), dtype=bool)
+    wide = digits & (length >= len(BIGINT_MAX))
+    if wide.any():
+        significant = text[wide].str.lstrip("0")
+        width = significant.str.len().to_numpy(np.int64)
+        overflow[wide] = (width > len(BIGINT_MAX)) | (
+            (width == len(BIGINT_MAX)) & (significant > BIGINT_MAX).to_numpy(bool))
+    reasons = np.select(
+        [length == 0, ~digits, zero, overflow, length < min_len, length > max_len],
+        [EMPTY, NOT_DIGITS, NOT_POSITIVE, BIGINT_OVERFLOW, TOO_SHORT, TOO_LONG],
+        VALID,
+    ).astype(np.int8)
+    return reasons == VALID, reasons
+
+
+def to_ids(values: pd.Series, mask: np.ndarray) -> np.ndarray:
+    """int64 IDs of the values ``mask`` marks as valid"""
+    text = values[mask].astype(STRING_DTYPE).str.strip()
+    if pa is not None:
+        # Arrow's string -> int cast is an order of magnitude faster than NumPy's
+        return text.astype("int64[pyarrow]").to_numpy(np.int64)
+    return text.astype(np.int64).to_numpy()
+
+
+def to_text_ids(values: pd.Series, mask: np.ndarray) -> np.ndarray:
+    """Valid values as written (whitespace stripped), for ID columns stored as text"""
+    return values[mask].astype(STRING_DTYPE).str.strip().to_numpy(object)
+
+
+def reason_counts(reasons: np.ndarray) -> Dict[str, int]:
+    """Number of values per reject reason (valid values left out)"""
+    counts = np.bincount(reasons, minlength=len(REASONS))
+    return {REASONS[code]: int(n) for code, n in enumerate(counts) if code != VALID and n}
+
+
+def rejected_values(values: pd.Series, reasons: np.ndarray) -> List[Tuple[str, str]]:
+    """(value, reason) for every invalid value, in input order"""
+    bad = reasons != VALID
+    return [("" if pd.isna(value) else str(value), REASONS[code])
+            for value, code in zip(values[bad].tolist(), reasons[bad].tolist())]
+
+
+def read_id_chunks(csv_path: str, column: str = "apple_id", chunk_rows: int = CSV_CHUNK_ROWS,
+                   has_header: bool = True) -> Iterator[pd.Series]:
+    """String chunks of an ID column; the first column is used when the header has no ``column``.
+
+    With pyarrow installed the file is parsed block by block by its
+    streaming reader; otherwise pandas reads ``chunk_rows`` rows at a time.
+    """
+    index = 0
+    if has_header:
+        header = pd.read_csv(csv_path, nrows=0).columns
+        index = header.get_loc(column) if column in header else 0
+    if pa is not None:
+        name = f"f{index}"
+        reader = pacsv.open_csv(
+            csv_path,
+            read_options=pacsv.ReadOptions(skip_rows=int(has_header), autogenerate_column_names=True,
+                                           block_size=CSV_BLOCK_BYTES),
+            convert_options=pacsv.ConvertOptions(column_types={name: pa.string()}, include_columns=[name]),
+        )
+        for batch in reader:
+            yield pd.Series(batch.column(0), dtype=STRING_DTYPE)
+        return
+    for chunk in pd.read_csv(csv_path, header=0 if has_header else None, usecols=[index], dtype=str,
+                             keep_default_na=False, chunksize=chunk_rows):
+        yield chunk.iloc[:, 0]
+
+
+class ValidationReport:
+    """Running counts over a chunked validation"""
+
+    def __init__(self):
+        self.rows = 0
+        self.valid = 0
+        self.reasons: Dict[str, int] = {}
+        self.started = time.time()
+        self.elapsed = 0.0
+
+    @property
+    def invalid(self) -> int:
+        return self.rows - self.valid
+
+    def add(self, reasons: np.ndarray) -> None:
+        self.rows += len(reasons)
+        self.valid += int(np.count_nonzero(reasons == VALID))
+        for name, n in reason_counts(reasons).items():
+            self.reasons[name] = self.reasons.get(name, 0) + n
+
+    def finish(self) -> "ValidationReport":
+        self.elapsed = time.time() - self.started
+        return self
+
+    def print_report(self) -> None:
+        rate = self.rows / self.elapsed if self.elapsed else 0.0
+        print(f"✅ Valid apple_ids: {self.valid} of {self.rows}")
+        if self.reasons:
+            print("❌ Rejected: " + ", ".join(f"{name}: {n}" for name, n in self.reasons.items()))
+        print(f"⚡ Validated in {self.elapsed:.1f}s ({rate:,.0f} rows/sec)")
+
+
+def validate_chunks(chunks: Iterator[pd.Series], report: ValidationReport,
+                    rejects: Optional[List[Tuple[str, str]]] = None, min_len: int = MIN_ID_DIGITS,
+                    max_len: int = MAX_BIGINT_DIGITS, as_text: bool = False) -> Iterator[np.ndarray]:
+    """Valid int64 IDs of each chunk, counting every chunk into ``report``.
+
+    Only one chunk is held at a time. Invalid values are appended to
+    ``rejects`` as (value, reason) when it is given. With ``as_text`` the
+    valid values are yielded as strings, so leading zeros survive.
+    """
+    convert = to_text_ids if as_text else to_ids
+    for values in chunks:
+        mask, reasons = classify_ids(values, min_len, max_len)
+        report.add(reasons)
+        if rejects is not None and not mask.all():
+            rejects.extend(rejected_values(values, reasons))
+        yield convert(values, mask)
+
+
+def validate_csv(csv_path: str, column: str = "apple_id", rejects: Optional[List[Tuple[str, str]]] = None,
+                 chunk_rows: int = CSV_CHUNK_ROWS, min_len: int = MIN_ID_DIGITS,
+                 max_len: int = MAX_BIGINT_DIGITS) -> ValidationReport:
+    """Validate an ID CSV in constant memory (one chunk at a time)"""
+    report = ValidationReport()
+    for _ in validate_chunks(read_id_chunks(csv_path, column, chunk_rows), report, rejects, min_len, max_len):
+        pass
+    return report.finish()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate an Apple ID CSV and count rejects by reason")
+    parser.add_argument("csv", nargs="?", default="apple_ids.csv")
+    parser.add_argument("--column", default="apple_id")
+    parser.add_argument("--chunk-rows", type=int, default=CSV_CHUNK_ROWS)
+    parser.add_argument("--min-len", type=int, default=MIN_ID_DIGITS)
+    parser.add_argument("--max-len", type=int, default=MAX_BIGINT_DIGITS)
+    parser.add_argument("--rejects", help="Write rejected values and reasons to this CSV")
+    args = parser.parse_args()
+
+    rejects = [] if args.rejects else None
+    report = validate_csv(args.csv, args.column, rejects, args.chunk_rows, args.min_len, args.max_len)
+    report.print_report()
+    if args.rejects:
+        pd.DataFrame(rejects, columns=["value", "reason"]).to_csv(args.rejects, index=False)
+        print(f"💾 {len(rejects)} rejects saved to {args.rejects}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+# Async, batched validation of Apple IDs against the iTunes lookup API
+import asyncio
+import json
+import random
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import httpx
+
+from http_client import get_async_client
+from rate_governor import get_governor
+
+LOOKUP_URL = "https://itunes.apple.com/lookup"
+BATCH_SIZE = 150            # IDs per lookup request (comma-separated)
+MAX_CONCURRENCY = 4         # Lookup requests in flight at once
+REQUESTS_PER_MINUTE = 20    # Starting budget; the host governor adapts it
+RETRIES = 3
+
+PODCAST_GENRES = [
+    "Podcasts", "Arts", "Business", "Comedy", "Education", "Fiction", "Government",
+    "Health & Fitness", "History", "Kids & Family", "Leisure", "Music", "News",
+    "Religion & Spirituality", "Science", "Society & Culture", "Sports", "Technology",
+    "True Crime", "TV & Film"
+]
+
+# Status values reported per ID
+VALID = "valid"
+INVALID = "invalid"
+FAILED = "failed"
+
+# (itunes_id, status, message)
+LookupResult = Tuple[str, str, str]
+
+
+def classify_result(result: dict) -> Tuple[bool, str]:
+    """Decide whether one lookup result is a podcast"""
+    kind = result.get("kind", "")
+    wrapper_type = result.get("wrapperType", "")
+
+    # Valid podcast indicators
+    is_podcast = (
+        kind == "podcast" or
+        wrapper_type == "track" and
+        result.get("primaryGenreName") in PODCAST_GENRES
+    )
+    if is_podcast:
+        return True, f"Valid podcast: {result.get('collectionName', 'Unknown')}"
+    return False, f"Not a podcast: {kind}/{wrapper_type}"
+
+
+def map_results(batch: List[str], data: dict) -> List[LookupResult]:
+    """Map a multi-ID lookup response back onto the IDs that were asked for"""
+    by_id: Dict[str, dict] = {}
+    for result in data.get("results", []):
+        for key in ("collectionId", "trackId"):
+            value = result.get(key)
+            if value is not None:
+                by_id.setdefault(str(value), result)
+
+    mapped = []
+    for itunes_id in batch:
+        result = by_id.get(itunes_id)
+        if result is None:
+            mapped.append((itunes_id, INVALID, "No results found (resultCount: 0)"))
+            continue
+        is_podcast, message = classify_result(result)
+        mapped.append((itunes_id, VALID if is_podcast else INVALID, message))
+    return mapped
+
+
+class BatchLookupValidator:
+    """Validate Apple IDs with comma-separated lookup batches run concurrently.
+
+    Concurrency is capped by a semaphore and request starts are paced by the
+    lookup host's adaptive rate governor, so the number of IDs checked per
+    request is what drives throughput.
+    """
+
+    def __init__(self, batch_size: int = BATCH_SIZE, max_concurrency: int = MAX_CONCURRENCY,
+                 requests_per_minute: float = REQUESTS_PER_MINUTE, retries: int = RETRIES,
+                 timeout: float = 30, user_agents: Optional[List[str]] = None):
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+        self.requests_per_minute = requests_per_minute
+        self.retries = retries
+        self.timeout = timeout
+        self.user_agents = user_agents or ["Mozilla/5.0 (compatible; ApplePodcastScraper/1.0)"]
+        self.governor = get_governor(LOOKUP_URL, rate=requests_per_minute / 60.0)
+        self.requests_made = 0
+        self.ids_checked = 0
+
+    def _headers(self) -> Dict[str, str]:
+        return {
+            "User-Agent": random.choice(self.user_agents),
+            "Accept": "application/json, text/plain, */*",
+            "Accept-Language": "en-US,en;q=0.9",
+        }
+
+    async def _lookup_batch(self, client: httpx.AsyncClient, batch: List[str],
+                            semaphore: asyncio.Semaphore) -> List[LookupResult]:
+        params = {"id": ",".join(batch), "entity": "podcast"}
+        error = "All retries failed"
+        for attempt in range(self.retries):
+            async with semaphore:
+                await self.governor.acquire_async()
+                self.requests_made += 1
+                try:
+                    response = await client.get(LOOKUP_URL, params=params, headers=self._headers())
+                except httpx.TimeoutException:
+                    error = "Timeout"
+                    print(f"⚠️ Timeout for batch of {len(batch)} (attempt {attempt + 1})")
+                    continue
+                except httpx.HTTPError as e:
+                    error = f"Request error: {e}"
+                    print(f"⚠️ Request error for batch of {len(batch)} (attempt {attempt + 1}): {e}")
+                    continue
+
+            self.governor.record_response(response)
+            if response.status_code == 429:
+                # The governor has already slowed down and honours Retry-After
+                print(f"⚠️ Rate limited (attempt {attempt + 1}), now at {self.governor.rate * 60:.0f} req/min")
+                error = "HTTP 429"
+                continue
+            if response.status_code != 200:
+                error = f"HTTP {response.status_code}"
+                print(f"⚠️ HTTP {response.status_code} for batch of {len(batch)} (attempt {attempt + 1})")
+                continue
+            try:
+                return map_results(batch, response.json())
+            except json.JSONDecodeError as e:
+                error = f"JSON decode error: {e}"
+                print(f"⚠️ JSON decode error for batch of {len(batch)} (attempt {attempt + 1}): {e}")
+
+        return [(itunes_id, FAILED, error) for itunes_id in batch]
+
+    async def validate_async(self, ids: Iterable,
+                             on_results: Optional[Callable[[List[LookupResult]], None]] = None
+                             ) -> List[LookupResult]:
+        """Validate all IDs; ``on_results`` is called with each finished batch"""
+        ids = [str(i) for i in ids]
+        batches = [ids[i:i + self.batch_size] for i in range(0, len(ids), self.batch_size)]
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        results: List[LookupResult] = []
+        start_time = time.time()
+
+        # Pooled keep-alive connections (HTTP/2 when available), one per concurrent batch
+        async with get_async_client(max_connections=self.max_concurrency, timeout=self.timeout,
+                                    follow_redirects=True) as client:
+            tasks = [asyncio.create_task(self._lookup_batch(client, b, semaphore)) for b in batches]
+            for done, task in enumerate(asyncio.as_completed(tasks), 1):
+                batch_results = await task
+                results.extend(batch_results)
+                self.ids_checked += len(batch_results)
+                if on_results:
+                    on_results(batch_results)
+                elapsed = time.time() - start_time
+                rate = self.ids_checked / elapsed if elapsed else 0.0
+                print(f"📊 Batch {done}/{len(batches)}: {self.ids_checked}/{len(ids)} IDs "
+                      f"({rate:.1f} IDs/sec)")
+
+        elapsed = time.time() - start_time
+        rate = len(ids) / elapsed if elapsed else 0.0
+        print(f"⚡ Checked {len(ids)} IDs with {self.requests_made} requests in {elapsed:.1f}s "
+              f"({rate:.1f} IDs/sec)")
+        return results
+
+    def validate(self, ids: Iterable,
+                 on_results: Optional[Callable[[List[LookupResult]], None]] = None) -> List[LookupResult]:
+        """Blocking wrapper around :meth:`validate_async`"""
+        return asyncio.run(self.validate_async(ids, on_results))
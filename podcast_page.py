@@ -0,0 +1,465 @@
+# Apple podcast detail pages: rating, latest episode date and title via Playwright or plain HTTP
+import argparse
+import asyncio
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+import httpx
+from selectolax.lexbor import LexborHTMLParser
+
+from http_client import get_async_client
+from rate_governor import get_governor
+
+RATING_SELECTORS = [
+    ".we-customer-ratings__averages__display",
+    ".we-rating-stars",
+    "[data-test-rating]",
+    ".rating-value"
+]
+DATE_SELECTORS = [
+    ".episode-date",
+    ".release-date",
+    "[data-test-episode-date]",
+    ".we-truncate time",
+    "time[datetime]"
+]
+TITLE_SELECTORS = [
+    "h1.product-header__title",
+    ".we-truncate.we-truncate--single-line h1",
+    "h1"
+]
+
+# Fast mode: what the browser is not allowed to download
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font"}
+THIRD_PARTY_BLOCKED_TYPES = {"script", "xhr", "fetch", "ping", "eventsource", "websocket", "other"}
+FIRST_PARTY_SUFFIXES = ("apple.com",)
+DATE_WAIT_MS = 2000  # Extra wait for the episode list once the title is there
+
+# Embedded JSON: schema.org ld+json and the serialized server data
+EMBEDDED_SCRIPT = re.compile(
+    r'<script[^>]*type="application/(?:ld\+json|json)"[^>]*>(.*?)</script>', re.S
+)
+PODCAST_LINK_ID = re.compile(r'/podcast/[^/"\s]*/id(\d+)')
+PODCAST_HREF = re.compile(r'[^"]*podcast/[^/]+/id\d+')
+PODCAST_URL_ID = re.compile(r'/id(\d+)')
+RATING_KEYS = ("ratingValue", "ratingAverage", "averageUserRating")
+DATE_KEYS = ("datePublished", "releaseDate")
+# Keys that tie a server-data object to a podcast (the show itself or its episodes)
+SERVER_ID_KEYS = ("id", "adamId", "storeAdamID", "podcastId", "collectionId")
+
+# HTTP-only detail fetching
+HTTP_CONCURRENCY = 8        # Detail pages in flight at once
+HTTP_RATE = 4.0             # Starting requests/sec for podcasts.apple.com; the governor adapts it
+HTTP_RETRIES = 3
+
+
+def is_first_party(url: str) -> bool:
+    host = urlparse(url).hostname or ""
+    return any(host == s or host.endswith("." + s) for s in FIRST_PARTY_SUFFIXES)
+
+
+class PageLoadStats:
+    """Per-page latency, transferred bytes and blocked requests, shared by threads"""
+
+    def __init__(self, label: str = "pages"):
+        self.label = label
+        self.latencies: List[float] = []
+        self.page_bytes: List[int] = []
+        self.blocked = Counter()
+        self._lock = threading.Lock()
+
+    def record_page(self, latency: float, transferred: int) -> None:
+        with self._lock:
+            self.latencies.append(latency)
+            self.page_bytes.append(transferred)
+
+    def record_blocked(self, resource_type: str) -> None:
+        with self._lock:
+            self.blocked[resource_type] += 1
+
+    def average_latency(self) -> float:
+        return sum(self.latencies) / len(self.latencies) if self.latencies else 0.0
+
+    def average_bytes(self) -> float:
+        return sum(self.page_bytes) / len(self.page_bytes) if self.page_bytes else 0.0
+
+    def print_report(self) -> None:
+        with self._lock:
+            latencies = sorted(self.latencies)
+            blocked = dict(self.blocked)
+        if not latencies:
+            print(f"⏱️ {self.label}: no pages loaded")
+            return
+        p50 = latencies[len(latencies) // 2]
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        print(f"⏱️ {self.label}: {len(latencies)} pages, avg {self.average_latency():.2f}s, "
+              f"p50 {p50:.2f}s, p95 {p95:.2f}s, {self.average_bytes() / 1024:.0f} KB/page")
+        if blocked:
+            total = sum(blocked.values())
+            kinds = ", ".join(f"{k}: {v}" for k, v in sorted(blocked.items()))
+            print(f"   🚫 Blocked {total} requests ({total / len(latencies):.1f}/page) - {kinds}")
+
+
+def enable_fast_mode(target, stats: Optional[PageLoadStats] = None) -> None:
+    """Abort images, media, fonts and third-party scripts/beacons on a page or browser context"""
+
+    def handle(route):
+        request = route.request
+        resource_type = request.resource_type
+        if resource_type in BLOCKED_RESOURCE_TYPES or (
+            resource_type in THIRD_PARTY_BLOCKED_TYPES and not is_first_party(request.url)
+        ):
+            if stats:
+                stats.record_blocked(resource_type)
+            route.abort()
+        else:
+            route.continue_()
+
+    target.route("**/*", handle)
+
+
+def _walk(node):
+    """Yield every dict inside a parsed JSON document"""
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            yield node
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            stack.extend(node)
+
+
+def podcast_id_from_url(url: str) -> Optional[str]:
+    match = PODCAST_URL_ID.search(url or "")
+    return match.group(1) if match else None
+
+
+def _podcast_nodes(document, podcast_id: str):
+    """Objects of the server data that belong to ``podcast_id`` and everything inside them.
+
+    The page model also carries related and "you might also like" shows,
+    so only subtrees whose root names the podcast by one of SERVER_ID_KEYS
+    are walked.
+    """
+    seen = set()
+    for root in _walk(document):
+        if not any(str(root[key]) == podcast_id for key in SERVER_ID_KEYS if key in root):
+            continue
+        for node in _walk(root):
+            if id(node) not in seen:
+                seen.add(id(node))
+                yield node
+
+
+def _as_rating(value) -> Optional[float]:
+    try:
+        rating = float(value)
+    except (TypeError, ValueError):
+        return None
+    return rating if 0 < rating <= 5 else None
+
+
+def extract_embedded_data(html: str, podcast_id: Optional[str] = None) -> Dict:
+    """Read rating, latest episode date, title and linked podcast IDs from the page's embedded JSON.
+
+    Apple pages ship a schema.org ld+json block for the show and the full
+    page model as serialized-server-data; the ld+json values win when both
+    have a field. From the server data only the objects of ``podcast_id``
+    are read (none without it), since it also describes other shows.
+    Missing fields are None, so callers can fall back to the DOM.
+    """
+    documents = []
+    for raw in EMBEDDED_SCRIPT.findall(html):
+        try:
+            documents.append((json.loads(raw), '"@context"' in raw))
+        except ValueError:
+            continue
+    # schema.org first, then the server data
+    documents.sort(key=lambda doc: not doc[1])
+
+    data = {'rating': None, 'recent_episode_date': None, 'title': None}
+    for document, is_schema in documents:
+        if is_schema:
+            nodes = _walk(document)
+        elif podcast_id:
+            nodes = _podcast_nodes(document, podcast_id)
+        else:
+            continue
+        dates = []
+        for node in nodes:
+            if data['rating'] is None:
+                for key in RATING_KEYS:
+                    if key in node:
+                        data['rating'] = _as_rating(node[key])
+                        break
+            if is_schema and data['title'] is None and node.get("@type") in ("CreativeWorkSeries", "PodcastSeries"):
+                data['title'] = node.get("name")
+            for key in DATE_KEYS:
+                if isinstance(node.get(key), str):
+                    dates.append(node[key])
+        if data['recent_episode_date'] is None and dates:
+            data['recent_episode_date'] = max(dates)  # ISO-8601 strings sort chronologically
+
+    data['podcast_ids'] = list(dict.fromkeys(
+        pid for raw in EMBEDDED_SCRIPT.findall(html) for pid in PODCAST_LINK_ID.findall(raw)
+    ))
+    return data
+
+
+def _rating_from_dom(page) -> Optional[float]:
+    for selector in RATING_SELECTORS:
+        if page.locator(selector).count() > 0:
+            rating_text = page.locator(selector).first.inner_text().strip()
+            # Extract numeric rating
+            rating_match = re.search(r'(\d+\.?\d*)', rating_text)
+            if rating_match:
+                return float(rating_match.group(1))
+    return None
+
+
+def _date_from_dom(page) -> Optional[str]:
+    for selector in DATE_SELECTORS:
+        elements = page.locator(selector)
+        if elements.count() > 0:
+            # Get the first (most recent) episode date
+            first_element = elements.first
+
+            # Try to get datetime attribute first
+            datetime_attr = first_element.get_attribute("datetime")
+            if datetime_attr:
+                return datetime_attr
+
+            # Otherwise get text content
+            date_text = first_element.inner_text().strip()
+            if date_text:
+                return date_text
+    return None
+
+
+def _title_from_dom(page) -> Optional[str]:
+    for selector in TITLE_SELECTORS:
+        if page.locator(selector).count() > 0:
+            return page.locator(selector).first.inner_text().strip()
+    return None
+
+
+def podcast_links(page) -> List[str]:
+    """Podcast links currently in the DOM, in page order, from a single in-page query"""
+    hrefs = page.eval_on_selector_all(
+        "a[href*='/podcast/']", "els => els.map(e => e.getAttribute('href'))"
+    )
+    return [href for href in dict.fromkeys(hrefs) if href and PODCAST_HREF.fullmatch(href)]
+
+
+DOM_FALLBACKS = (
+    ('rating', _rating_from_dom, "rating"),
+    ('recent_episode_date', _date_from_dom, "recent episode date"),
+    ('title', _title_from_dom, "title"),
+)
+
+
+def _wait_for_fields(page, timeout: int) -> None:
+    """Wait for the elements we read instead of for network idle"""
+    page.wait_for_selector(", ".join(TITLE_SELECTORS), state="attached", timeout=timeout)
+    try:
+        # Not every show has dated episodes; don't fail the page over it
+        page.wait_for_selector(", ".join(DATE_SELECTORS), state="attached", timeout=DATE_WAIT_MS)
+    except Exception:
+        pass
+
+
+def scrape_podcast_details(page, podcast_url: str, fast: bool = False,
+                           stats: Optional[PageLoadStats] = None) -> Dict:
+    """Scrape ratings and recent episode date from a specific podcast page.
+
+    The fields come from the embedded JSON of one ``page.content()`` call;
+    the CSS selector chain only runs for fields the JSON did not have. In
+    fast mode the page is read as soon as the DOM is there; combine it with
+    :func:`enable_fast_mode` on the page/context.
+    """
+    transferred = [0]
+
+    def count_bytes(request):
+        # Measured sizes, not content-length: chunked, HTTP/2 and compressed responses often omit it
+        sizes = request.sizes()
+        transferred[0] += max(0, sizes["responseBodySize"]) + max(0, sizes["responseHeadersSize"])
+
+    try:
+        print(f"    🔍 Visiting: {podcast_url}")
+        if stats:
+            page.on("requestfinished", count_bytes)
+        started = time.time()
+        try:
+            if fast:
+                page.goto(podcast_url, wait_until="domcontentloaded", timeout=10000)
+                embedded = extract_embedded_data(page.content(), podcast_id_from_url(podcast_url))
+                if any(embedded[field] is None for field, _, _ in DOM_FALLBACKS):
+                    _wait_for_fields(page, timeout=10000)
+            else:
+                page.goto(podcast_url, wait_until="networkidle", timeout=10000)
+                embedded = extract_embedded_data(page.content(), podcast_id_from_url(podcast_url))
+        finally:
+            if stats:
+                page.remove_listener("requestfinished", count_bytes)
+        if stats:
+            stats.record_page(time.time() - started, transferred[0])
+        if not fast:
+            time.sleep(random.uniform(1, 2))  # Random delay to be respectful
+
+        podcast_data = {field: embedded[field] for field, _, _ in DOM_FALLBACKS}
+        for field, from_dom, label in DOM_FALLBACKS:
+            if podcast_data[field] is not None:
+                continue
+            try:
+                podcast_data[field] = from_dom(page)
+            except Exception as e:
+                print(f"      ⚠️ Could not get {label}: {e}")
+
+        print(f"      ✅ Rating: {podcast_data['rating']}, Date: {podcast_data['recent_episode_date']}")
+        return podcast_data
+
+    except Exception as e:
+        print(f"      ❌ Error scraping {podcast_url}: {e}")
+        return {
+            'rating': None,
+            'recent_episode_date': None,
+            'title': None,
+            'error': str(e)
+        }
+
+
+def parse_podcast_html(html: str, podcast_id: Optional[str] = None) -> Dict:
+    """Rating, latest episode date and title from server-rendered HTML.
+
+    Same fields as :func:`scrape_podcast_details`: the embedded JSON first,
+    then the same selector chain run with selectolax instead of a browser.
+    """
+    embedded = extract_embedded_data(html, podcast_id)
+    podcast_data = {field: embedded[field] for field, _, _ in DOM_FALLBACKS}
+    if all(value is not None for value in podcast_data.values()):
+        return podcast_data
+
+    tree = LexborHTMLParser(html)
+    if podcast_data['rating'] is None:
+        for selector in RATING_SELECTORS:
+            node = tree.css_first(selector)
+            if node is not None:
+                rating_match = re.search(r'(\d+\.?\d*)', node.text(strip=True))
+                if rating_match:
+                    podcast_data['rating'] = float(rating_match.group(1))
+                    break
+    if podcast_data['recent_episode_date'] is None:
+        for selector in DATE_SELECTORS:
+            node = tree.css_first(selector)
+            if node is not None:
+                recent_date = node.attributes.get("datetime") or node.text(strip=True)
+                if recent_date:
+                    podcast_data['recent_episode_date'] = recent_date
+                    break
+    if podcast_data['title'] is None:
+        for selector in TITLE_SELECTORS:
+            node = tree.css_first(selector)
+            if node is not None:
+                podcast_data['title'] = node.text(strip=True)
+                break
+    return podcast_data
+
+
+async def _fetch_details(client: httpx.AsyncClient, podcast_url: str, semaphore: asyncio.Semaphore,
+                         retries: int, stats: Optional[PageLoadStats]) -> Dict:
+    governor = get_governor(podcast_url, rate=HTTP_RATE)
+    error = "All retries failed"
+    for attempt in range(retries):
+        async with semaphore:
+            await governor.acquire_async()
+            started = time.time()
+            try:
+                response = await client.get(podcast_url)
+            except httpx.HTTPError as e:
+                error = f"Request error: {e}"
+                continue
+        governor.record_response(response)
+        if response.status_code in (429, 503):
+            error = f"HTTP {response.status_code}"
+            continue
+        if response.status_code != 200:
+            error = f"HTTP {response.status_code}"
+            break
+        if stats:
+            stats.record_page(time.time() - started, len(response.content))
+
+        podcast_data = parse_podcast_html(response.text, podcast_id_from_url(podcast_url))
+        print(f"      ✅ {podcast_url} Rating: {podcast_data['rating']}, "
+              f"Date: {podcast_data['recent_episode_date']}")
+        return podcast_data
+
+    print(f"      ❌ Error scraping {podcast_url}: {error}")
+    return {
+        'rating': None,
+        'recent_episode_date': None,
+        'title': None,
+        'error': error
+    }
+
+
+async def fetch_podcast_details_async(podcast_urls: List[str], max_concurrency: int = HTTP_CONCURRENCY,
+                                      retries: int = HTTP_RETRIES,
+                                      stats: Optional[PageLoadStats] = None) -> List[Dict]:
+    """Fetch detail pages over pooled HTTP; results are in the order of ``podcast_urls``"""
+    semaphore = asyncio.Semaphore(max_concurrency)
+    async with get_async_client(max_connections=max_concurrency, follow_redirects=True) as client:
+        return await asyncio.gather(*(
+            _fetch_details(client, url, semaphore, retries, stats) for url in podcast_urls
+        ))
+
+
+def fetch_podcast_details(podcast_urls: List[str], max_concurrency: int = HTTP_CONCURRENCY,
+                          retries: int = HTTP_RETRIES, stats: Optional[PageLoadStats] = None) -> List[Dict]:
+    """Blocking wrapper around :func:`fetch_podcast_details_async`"""
+    start_time = time.time()
+    results = asyncio.run(fetch_podcast_details_async(podcast_urls, max_concurrency, retries, stats))
+    elapsed = time.time() - start_time
+    rate = len(podcast_urls) / elapsed if elapsed else 0.0
+    print(f"⚡ Fetched {len(podcast_urls)} detail pages over HTTP in {elapsed:.1f}s ({rate:.1f} pages/sec)")
+    return results
+
+
+def compare_modes(urls: List[str], headless: bool = True) -> None:
+    """Load the same pages in normal and fast mode and print both timings"""
+    from playwright.sync_api import sync_playwright
+
+    normal = PageLoadStats("normal mode")
+    fast = PageLoadStats("fast mode")
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=headless)
+        for stats, is_fast in ((normal, False), (fast, True)):
+            # Fresh context per mode so neither run benefits from the other's cache
+            context = browser.new_context()
+            if is_fast:
+                enable_fast_mode(context, stats)
+            page = context.new_page()
+            for url in urls:
+                scrape_podcast_details(page, url, fast=is_fast, stats=stats)
+            context.close()
+        browser.close()
+
+    normal.print_report()
+    fast.print_report()
+    if fast.average_latency():
+        print(f"📊 Fast mode: {normal.average_latency() / fast.average_latency():.1f}x faster, "
+              f"{(normal.average_bytes() - fast.average_bytes()) / 1024:.0f} KB saved per page")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare normal and fast podcast page loads")
+    parser.add_argument("urls", nargs="+", help="Podcast page URLs to load")
+    parser.add_argument("--show-browser", action="store_true", help="Run with a visible browser")
+    args = parser.parse_args()
+    compare_modes(args.urls, headless=not args.show_browser)
@@ -0,0 +1,179 @@
+# Adaptive per-host token-bucket rate governor
+import asyncio
+import email.utils
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+import requests
+
+DEFAULT_RATE = 2.0          # Starting requests/sec for an unknown host
+MIN_RATE = 0.1
+MAX_RATE = 50.0
+INCREASE_AFTER = 20         # Consecutive successes before speeding up
+INCREASE_STEP = 0.5         # Additive increase (req/sec)
+DECREASE_FACTOR = 0.5       # Multiplicative decrease on 429/503
+DECREASE_COOLDOWN = 1.0     # 429s within this many seconds count as one
+
+
+def host_of(url_or_host: str) -> str:
+    """Return the host part of a URL (or the argument itself if it is a host)"""
+    if "://" in url_or_host:
+        return urlparse(url_or_host).netloc.lower()
+    return url_or_host.lower()
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After as seconds; accepts delta-seconds or an HTTP date"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+class RateGovernor:
+    """Token bucket for one host whose refill rate adapts to the server (AIMD).
+
+    Every request takes a token first. A run of successful responses raises
+    the rate additively; a 429/503 halves it and, when the server sends
+    Retry-After, pauses the host for that long. A burst of 429s from
+    requests that were already in flight only counts once. Tokens are reserved under a
+    thread lock and the waiting happens outside it, so the same governor can
+    be shared by threads (``acquire``) and asyncio tasks (``acquire_async``).
+    """
+
+    def __init__(self, host: str, rate: float = DEFAULT_RATE, min_rate: float = MIN_RATE,
+                 max_rate: float = MAX_RATE, burst: Optional[float] = None,
+                 increase_after: int = INCREASE_AFTER, increase_step: float = INCREASE_STEP,
+                 decrease_factor: float = DECREASE_FACTOR,
+                 decrease_cooldown: float = DECREASE_COOLDOWN):
+        self.host = host
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self.increase_after = increase_after
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.decrease_cooldown = decrease_cooldown
+
+        self.tokens = self.burst
+        self.blocked_until = 0.0
+        self.success_streak = 0
+        self.total_requests = 0
+        self.throttled = 0
+        self.total_wait = 0.0
+        self._last_refill = time.monotonic()
+        self._last_decrease = float("-inf")
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Take one token and return how long the caller must wait for it"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self._last_refill) * self.rate)
+            self._last_refill = now
+            self.tokens -= 1
+            self.total_requests += 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            wait = max(wait, self.blocked_until - now)
+            self.total_wait += wait
+            return wait
+
+    def acquire(self) -> None:
+        """Block the calling thread until a request may be sent"""
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self) -> None:
+        """Suspend the calling task until a request may be sent"""
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def record(self, status_code: int, retry_after: Optional[str] = None) -> None:
+        """Adapt the rate to the outcome of a request"""
+        with self._lock:
+            if status_code in (429, 503):
+                now = time.monotonic()
+                self.throttled += 1
+                self.success_streak = 0
+                if now - self._last_decrease >= self.decrease_cooldown:
+                    self._last_decrease = now
+                    self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+                pause = parse_retry_after(retry_after)
+                if pause:
+                    self.blocked_until = max(self.blocked_until, now + pause)
+                # Drop any saved-up burst so the slowdown takes effect at once
+                self.tokens = min(self.tokens, 0.0)
+            elif 200 <= status_code < 400:
+                self.success_streak += 1
+                if self.success_streak >= self.increase_after:
+                    self.success_streak = 0
+                    self.rate = min(self.max_rate, self.rate + self.increase_step)
+                    self.burst = max(self.burst, self.rate)
+
+    def record_response(self, response) -> None:
+        """Convenience wrapper for requests/httpx response objects"""
+        self.record(response.status_code, response.headers.get("Retry-After"))
+
+    def print_report(self) -> None:
+        print(f"🚦 Rate governor [{self.host}]: {self.rate:.2f} req/s now, "
+              f"{self.total_requests} requests, {self.throttled} throttled, "
+              f"{self.total_wait:.1f}s spent waiting")
+
+
+_governors: Dict[str, RateGovernor] = {}
+_registry_lock = threading.Lock()
+
+
+def get_governor(url_or_host: str, **kwargs) -> RateGovernor:
+    """Shared governor for a host; ``kwargs`` only apply when it is first created"""
+    host = host_of(url_or_host)
+    with _registry_lock:
+        governor = _governors.get(host)
+        if governor is None:
+            governor = RateGovernor(host, **kwargs)
+            _governors[host] = governor
+        return governor
+
+
+def print_governor_report() -> None:
+    """Print the state of every governor used in this process"""
+    with _registry_lock:
+        governors = list(_governors.values())
+    for governor in governors:
+        governor.print_report()
+
+
+def governed_request(method: str, url: str, session=None, max_retries: int = 3, **kwargs):
+    """Send a request through the host's governor, retrying 429/503 answers after backing off.
+
+    Exceptions from the HTTP library propagate; the last response is
+    returned when retries run out.
+    """
+    sender = session.request if session is not None else requests.request
+    governor = get_governor(url)
+    response = None
+    for _ in range(max_retries + 1):
+        governor.acquire()
+        response = sender(method, url, **kwargs)
+        governor.record_response(response)
+        if response.status_code not in (429, 503):
+            break
+    return response
+
+
+def governed_get(url: str, session=None, max_retries: int = 3, **kwargs):
+    """GET through the host's governor (see :func:`governed_request`)"""
+    return governed_request("GET", url, session=session, max_retries=max_retries, **kwargs)
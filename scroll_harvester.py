@@ -0,0 +1,144 @@
+# Incremental link harvesting for infinite-scroll pages via an in-page MutationObserver
+import time
+from typing import List, Optional
+
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+APPLE_PODCAST_HREF = r"podcast/[^/]+/id\d+$"
+SPOTIFY_SHOW_HREF = r"/show/[A-Za-z0-9]+"
+
+SCROLL_STEP = 2000          # Pixels per wheel step
+INITIAL_IDLE = 2.0          # Seconds to wait for new links before anything has been measured
+MIN_IDLE = 0.5
+MAX_IDLE = 5.0
+IDLE_FACTOR = 3.0           # Idle timeout = this many times the typical load latency
+MAX_SCROLLS = 200
+
+# Collects matching hrefs of every <a> already in the page and of every one added
+# later, and counts the new matching links so Python can tell when the list stopped
+# growing (carousels, ads and lazy images add nodes too, so those are not counted).
+INSTALL_JS = """
+(pattern) => {
+    if (window.__harvest) window.__harvest.observer.disconnect();
+    const re = new RegExp(pattern);
+    const seen = new Set();
+    const state = { buffer: [], added: 0, observer: null };
+    const take = (el) => {
+        const href = el.getAttribute && el.getAttribute('href');
+        if (href && re.test(href) && !seen.has(href)) {
+            seen.add(href);
+            state.buffer.push(href);
+            state.added += 1;
+        }
+    };
+    const scan = (node) => {
+        if (node.nodeType !== 1) return;
+        if (node.tagName === 'A') take(node);
+        node.querySelectorAll('a[href]').forEach(take);
+    };
+    scan(document.body);
+    state.observer = new MutationObserver((mutations) => {
+        for (const m of mutations) {
+            if (m.type === 'attributes') {
+                take(m.target);  // Recycled list rows get a new href
+                continue;
+            }
+            m.addedNodes.forEach(scan);
+        }
+    });
+    state.observer.observe(document.body,
+        { childList: true, subtree: true, attributes: true, attributeFilter: ['href'] });
+    window.__harvest = state;
+}
+"""
+
+DRAIN_JS = """
+() => {
+    const state = window.__harvest;
+    const links = state.buffer.splice(0);
+    state.added = 0;
+    return links;
+}
+"""
+
+
+class ScrollHarvester:
+    """Scroll a page and collect the links it lazily adds, without re-reading the DOM.
+
+    The observer is installed once; each step scrolls, waits until new
+    matching links show up (or the idle timeout passes) and drains only
+    the hrefs added since the last drain. The idle timeout follows how
+    long the page has actually been taking to add content.
+    """
+
+    def __init__(self, page, pattern: str = APPLE_PODCAST_HREF, scroll_step: int = SCROLL_STEP,
+                 max_links: Optional[int] = None, max_scrolls: int = MAX_SCROLLS,
+                 min_idle: float = MIN_IDLE, max_idle: float = MAX_IDLE):
+        self.page = page
+        self.pattern = pattern
+        self.scroll_step = scroll_step
+        self.max_links = max_links
+        self.max_scrolls = max_scrolls
+        self.min_idle = min_idle
+        self.max_idle = max_idle
+        self.links: List[str] = []
+        self.scrolls = 0
+        self._installed = False
+        self._latency: Optional[float] = None
+
+    def install(self) -> "ScrollHarvester":
+        """Start observing; links already on the page are picked up by the first drain"""
+        self.page.evaluate(INSTALL_JS, self.pattern)
+        self._installed = True
+        return self
+
+    def drain(self) -> List[str]:
+        """New matching hrefs since the last drain"""
+        new_links = self.page.evaluate(DRAIN_JS)
+        self.links.extend(new_links)
+        return new_links
+
+    def idle_timeout(self) -> float:
+        if self._latency is None:
+            return INITIAL_IDLE
+        return min(self.max_idle, max(self.min_idle, IDLE_FACTOR * self._latency))
+
+    def wait_for_growth(self) -> bool:
+        """Wait until the page adds matching links; False if it stays idle for the whole timeout"""
+        started = time.time()
+        try:
+            self.page.wait_for_function("() => window.__harvest.added > 0",
+                                        timeout=self.idle_timeout() * 1000)
+        except PlaywrightTimeoutError:
+            return False
+        latency = time.time() - started
+        self._latency = latency if self._latency is None else 0.7 * self._latency + 0.3 * latency
+        return True
+
+    def harvest(self) -> List[str]:
+        """Scroll until the page stops growing and return every matching href, in order of appearance"""
+        if not self._installed:
+            self.install()
+        started = time.time()
+        self.drain()
+        while self.scrolls < self.max_scrolls:
+            if self.max_links and len(self.links) >= self.max_links:
+                break
+            self.page.mouse.wheel(0, self.scroll_step)
+            self.scrolls += 1
+            if not self.wait_for_growth():
+                break
+            self.drain()
+        self.drain()
+        self.page.evaluate("() => window.__harvest.observer.disconnect()")
+
+        print(f"   🧲 Harvested {len(self.links)} links in {self.scrolls} scrolls "
+              f"({time.time() - started:.1f}s, idle timeout {self.idle_timeout():.1f}s)")
+        if self.max_links:
+            return self.links[:self.max_links]
+        return self.links
+
+
+def harvest_links(page, pattern: str = APPLE_PODCAST_HREF, **kwargs) -> List[str]:
+    """One-shot helper: install, scroll until idle, return the hrefs"""
+    return ScrollHarvester(page, pattern=pattern, **kwargs).install().harvest()
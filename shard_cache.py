@@ -0,0 +1,147 @@
+# On-disk cache of sitemap shards for conditional GETs
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+from id_store import as_id_array
+
+DEFAULT_CACHE_PATH = "shard_cache.db"
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+def extraction_key(extractor: str, min_len: int, max_len: int) -> str:
+    """Identify how a shard's IDs were extracted, e.g. 'loc:8-15'"""
+    return f"{extractor}:{min_len}-{max_len}"
+
+
+class CachedShard:
+    """Validators and extracted IDs (sorted unique int64) for one cached shard"""
+    def __init__(self, url: str, extraction: str, etag: Optional[str], last_modified: Optional[str], ids: np.ndarray):
+        self.url = url
+        self.extraction = extraction
+        self.etag = etag
+        self.last_modified = last_modified
+        self.ids = ids
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """Headers that let the server answer 304 Not Modified"""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ShardCache:
+    """SQLite-backed shard cache keyed by shard URL and extraction, with LRU eviction.
+
+    Tools extract IDs from the same shard with different rules (XML
+    ``<loc>`` parsing or a raw byte scan, different length bounds), so an
+    entry is only reused by a lookup with the same extraction key; any
+    other rule is a miss. Each entry keeps the shard's ETag/Last-Modified and its IDs packed as
+    64-bit integers. The total size of the packed IDs is capped at
+    ``max_bytes``; least recently used shards are evicted first.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(shards)")]
+        if columns and "extraction" not in columns:
+            # Cache written before entries were keyed by extraction: its IDs can't be attributed, start over
+            self._conn.execute("DROP TABLE shards")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS shards (
+                url TEXT NOT NULL,
+                extraction TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                ids BLOB NOT NULL,
+                id_count INTEGER NOT NULL,
+                size_bytes INTEGER NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (url, extraction)
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_shards_last_used ON shards(last_used)")
+        self._conn.commit()
+
+    def get(self, url: str, extraction: str) -> Optional[CachedShard]:
+        """Return the cached entry for a shard extracted with ``extraction``, or None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified, ids FROM shards WHERE url = ? AND extraction = ?", (url, extraction)
+            ).fetchone()
+        if row is None:
+            return None
+        etag, last_modified, blob = row
+        return CachedShard(url, extraction, etag, last_modified, np.frombuffer(blob, dtype=np.int64))
+
+    def record_hit(self, url: str, extraction: str) -> None:
+        """Count a 304 response and refresh the entry's LRU position"""
+        with self._lock:
+            self.hits += 1
+            self._conn.execute("UPDATE shards SET last_used = ? WHERE url = ? AND extraction = ?",
+                               (time.time(), url, extraction))
+            self._conn.commit()
+
+    def store(self, url: str, extraction: str, ids: Iterable, etag: Optional[str],
+              last_modified: Optional[str]) -> None:
+        """Count a full download and cache its IDs (int64 array or str/int IDs) if the server sent validators"""
+        with self._lock:
+            self.misses += 1
+            if not etag and not last_modified:
+                # Nothing to revalidate against later
+                return
+            ids = as_id_array(ids)
+            blob = ids.astype("<i8", copy=False).tobytes()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO shards VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, extraction, etag, last_modified, blob, len(ids), len(blob), time.time())
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        total = self._conn.execute("SELECT COALESCE(SUM(size_bytes), 0) FROM shards").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for url, extraction, size in self._conn.execute(
+            "SELECT url, extraction, size_bytes FROM shards ORDER BY last_used ASC"
+        ).fetchall():
+            self._conn.execute("DELETE FROM shards WHERE url = ? AND extraction = ?", (url, extraction))
+            self.evictions += 1
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def size_bytes(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(SUM(size_bytes), 0) FROM shards").fetchone()[0]
+
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def print_report(self) -> None:
+        """Print this run's hit/miss statistics"""
+        print(f"🗄️ Shard cache ({os.path.abspath(self.path)}):")
+        print(f"   ✅ Hits (304, reused): {self.hits}")
+        print(f"   ⬇️ Misses (downloaded): {self.misses}")
+        print(f"   📊 Hit ratio: {self.hit_ratio() * 100:.1f}%")
+        print(f"   🧹 Evicted: {self.evictions}")
+        print(f"   💾 Size: {self.size_bytes() / (1024 * 1024):.1f} MB / {self.max_bytes / (1024 * 1024):.0f} MB")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,346 @@
+# Concurrent, streaming ingestion of Apple sitemap .gz shards
+import mmap
+import os
+import re
+import threading
+import time
+import zlib
+import xml.etree.ElementTree as ET
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait
+from multiprocessing import resource_tracker, shared_memory
+from typing import Iterable, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+import requests
+
+from http_client import get_session
+from id_extract import IdScanner
+from id_store import sorted_unique
+from shard_cache import ShardCache, extraction_key
+
+ID_PATTERN = re.compile(r'/id(\d+)')
+GZIP_MAGIC = b"\x1f\x8b"
+CHUNK_SIZE = 64 * 1024
+LOCAL_CHUNK_SIZE = 1024 * 1024
+MAX_WORKERS = 8
+DECODE_CHUNK_SIZE = 1024 * 1024
+DECODE_BACKLOG = 2          # Downloaded shards allowed to wait per decode process
+
+
+def _local_name(tag: str) -> str:
+    """Strip the XML namespace from a tag name"""
+    return tag.rsplit("}", 1)[-1]
+
+
+class LocIdParser:
+    """Incrementally inflate a sitemap shard and pull podcast IDs out of its <loc> tags.
+
+    Bytes are fed as they arrive from the network. Gzip bodies are inflated
+    with a streaming decompressor, the XML is parsed with a pull parser and
+    every finished <url> element is dropped again, so memory use does not
+    depend on the size of the shard.
+    """
+
+    def __init__(self, min_len: int = 1, max_len: int = 15):
+        self.min_len = min_len
+        self.max_len = max_len
+        self.ids: Set[str] = set()
+        self.loc_count = 0
+        self.bytes_in = 0
+        self._head = b""
+        self._inflater = None
+        self._sniffed = False
+        self._xml = ET.XMLPullParser(events=("start", "end"))
+        self._root = None
+
+    def feed(self, chunk: bytes) -> None:
+        """Feed the next raw chunk of the response body"""
+        if not chunk:
+            return
+        self.bytes_in += len(chunk)
+
+        # Wait for the first two bytes to tell gzip from plain XML
+        if not self._sniffed:
+            self._head += chunk
+            if len(self._head) < 2:
+                return
+            chunk, self._head = self._head, b""
+            self._sniffed = True
+            if chunk[:2] == GZIP_MAGIC:
+                self._inflater = zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+        if self._inflater is None:
+            self._feed_xml(chunk)
+            return
+
+        data = self._inflater.decompress(chunk)
+        # Concatenated gzip members: start a fresh decompressor on the leftovers
+        while self._inflater.eof and self._inflater.unused_data:
+            leftover = self._inflater.unused_data
+            self._feed_xml(data)
+            self._inflater = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            data = self._inflater.decompress(leftover)
+        self._feed_xml(data)
+
+    def close(self) -> Set[str]:
+        """Flush buffered input and return the IDs found"""
+        if not self._sniffed and self._head:
+            self._sniffed = True
+            self._feed_xml(self._head)
+        if self._inflater is not None:
+            self._feed_xml(self._inflater.flush())
+        self._xml.close()
+        self._drain()
+        return self.ids
+
+    def _feed_xml(self, data: bytes) -> None:
+        if data:
+            self._xml.feed(data)
+            self._drain()
+
+    def _drain(self) -> None:
+        for event, elem in self._xml.read_events():
+            if event == "start":
+                if self._root is None:
+                    self._root = elem
+                continue
+
+            name = _local_name(elem.tag)
+            if name == "loc":
+                self.loc_count += 1
+                if elem.text:
+                    match = ID_PATTERN.search(elem.text)
+                    if match and self.min_len <= len(match.group(1)) <= self.max_len:
+                        self.ids.add(match.group(1))
+            elif name in ("url", "sitemap") and self._root is not None:
+                # Finished entry: release everything parsed so far
+                self._root.clear()
+
+
+def stream_shard_ids(session: requests.Session, gz_url: str, timeout: int = 60,
+                     chunk_size: int = CHUNK_SIZE, cache: Optional[ShardCache] = None,
+                     min_len: int = 1, max_len: int = 15) -> Set[str]:
+    """Download one shard and extract its IDs while the body is still arriving.
+
+    With a cache, the request is made conditional and a 304 answer returns
+    the cached IDs without downloading or parsing anything.
+    """
+    extraction = extraction_key("loc", min_len, max_len)
+    cached = cache.get(gz_url, extraction) if cache else None
+    headers = cached.conditional_headers() if cached else {}
+
+    parser = LocIdParser(min_len=min_len, max_len=max_len)
+    with session.get(gz_url, stream=True, timeout=timeout, headers=headers) as response:
+        if response.status_code == 304 and cached:
+            cache.record_hit(gz_url, extraction)
+            return {str(i) for i in cached.ids.tolist()}
+        response.raise_for_status()
+        for chunk in response.iter_content(chunk_size):
+            parser.feed(chunk)
+        ids = parser.close()
+        if cache:
+            cache.store(gz_url, extraction, ids, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+    return ids
+
+
+def read_local_shard(path: str, chunk_size: int = LOCAL_CHUNK_SIZE,
+                     min_len: int = 1, max_len: int = 15) -> Set[str]:
+    """Extract the IDs of a downloaded shard (.xml or .gz) read through a memory map.
+
+    The mapped file is fed to the streaming parser in slices, so neither
+    the compressed nor the inflated document is ever held in memory whole.
+    """
+    parser = LocIdParser(min_len=min_len, max_len=max_len)
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                with memoryview(mapped) as view:
+                    for start in range(0, len(view), chunk_size):
+                        parser.feed(view[start:start + chunk_size])
+    return parser.close()
+
+
+def ingest_shards(gz_urls: Iterable[str], max_workers: int = MAX_WORKERS,
+                  timeout: int = 60, cache: Optional[ShardCache] = None,
+                  min_len: int = 1, max_len: int = 15) -> Tuple[Set[str], List[str]]:
+    """Fetch all shards concurrently over the shared pooled session.
+
+    Returns the union of all IDs and the list of shard URLs that failed.
+    """
+    gz_urls = list(gz_urls)
+    all_ids: Set[str] = set()
+    failed: List[str] = []
+    start_time = time.time()
+
+    # The shared keep-alive session, with a pool large enough for every worker
+    session = get_session(max_workers)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(stream_shard_ids, session, url, timeout, CHUNK_SIZE, cache, min_len, max_len): url
+            for url in gz_urls
+        }
+        for i, future in enumerate(as_completed(futures), 1):
+            url = futures[future]
+            try:
+                ids = future.result()
+            except Exception as e:
+                print(f"Error parsing {url}: {e}")
+                failed.append(url)
+                continue
+
+            before_count = len(all_ids)
+            all_ids.update(ids)
+            print(f"File {i}/{len(gz_urls)}: Found {len(ids)} podcasts, "
+                  f"{len(all_ids) - before_count} new unique IDs ({url})")
+
+    elapsed = time.time() - start_time
+    print(f"Ingested {len(gz_urls) - len(failed)}/{len(gz_urls)} shards in {elapsed:.1f}s "
+          f"with {max_workers} workers")
+    if cache:
+        cache.print_report()
+    return all_ids, failed
+
+
+def _inflate(body) -> Iterator[bytes]:
+    """Inflated content of a gzip (possibly multi-member) or plain body, in chunks"""
+    view = memoryview(body)
+    if bytes(view[:2]) != GZIP_MAGIC:
+        yield view
+        return
+    inflater = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    for start in range(0, len(view), DECODE_CHUNK_SIZE):
+        data = inflater.decompress(view[start:start + DECODE_CHUNK_SIZE])
+        while inflater.eof and inflater.unused_data:
+            leftover = inflater.unused_data
+            yield data
+            inflater = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            data = inflater.decompress(leftover)
+        yield data
+    yield inflater.flush()
+
+
+def decode_shard(body: bytes, min_len: int = 1, max_len: int = 15) -> Tuple[str, int]:
+    """Process-pool task: inflate a raw shard, scan it for IDs and return them through shared memory.
+
+    Returns the name of a shared memory block holding the sorted unique
+    IDs as int64 and how many there are. The block belongs to the caller,
+    which has to unlink it (see :func:`take_shared_ids`).
+    """
+    scanner = IdScanner(min_len, max_len)
+    for data in _inflate(body):
+        scanner.feed(data)
+    ids = sorted_unique(scanner.close())
+
+    block = shared_memory.SharedMemory(create=True, size=max(ids.nbytes, 1))
+    shared = np.ndarray(len(ids), dtype=np.int64, buffer=block.buf)
+    shared[:] = ids
+    del shared
+    # Ownership passes to the parent; stop this process's tracker from unlinking the block on exit.
+    # Only POSIX blocks are tracked, under their name with the leading slash that .name leaves out
+    if os.name == "posix":
+        resource_tracker.unregister("/" + block.name, "shared_memory")
+    block.close()
+    return block.name, len(ids)
+
+
+def take_shared_ids(name: str, count: int) -> np.ndarray:
+    """Copy the IDs out of a block written by :func:`decode_shard` and free it"""
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        return np.ndarray(count, dtype=np.int64, buffer=block.buf).copy()
+    finally:
+        block.close()
+        block.unlink()
+
+
+def ingest_shards_parallel(gz_urls: Iterable[str], max_workers: int = MAX_WORKERS,
+                           decode_workers: Optional[int] = None, timeout: int = 60,
+                           cache: Optional[ShardCache] = None,
+                           min_len: int = 1, max_len: int = 15) -> Tuple[np.ndarray, List[str]]:
+    """Download shards on threads and decode them in a pool of worker processes.
+
+    Inflating and scanning a shard is CPU-bound, so with threads alone it
+    is serialized by the GIL. Here download threads only fetch the raw
+    compressed bytes and hand them to ``decode_workers`` processes (all
+    cores by default); downloads keep going while earlier shards decode,
+    up to DECODE_BACKLOG waiting shards per process. The ``<loc>`` URLs
+    are scanned as raw bytes with :class:`id_extract.IdScanner` rather than
+    XML-parsed. Returns sorted unique int64 IDs and the shard URLs that failed.
+    """
+    gz_urls = list(gz_urls)
+    decode_workers = decode_workers or os.cpu_count() or 1
+    backlog = threading.BoundedSemaphore(decode_workers * DECODE_BACKLOG)
+    session = get_session(max_workers)
+    parts: List[np.ndarray] = []
+    failed: List[str] = []
+    bytes_in = 0
+    start_time = time.time()
+    extraction = extraction_key("scan", min_len, max_len)
+
+    with ProcessPoolExecutor(max_workers=decode_workers) as decoders, \
+            ThreadPoolExecutor(max_workers=max_workers) as downloaders:
+
+        def download(url: str):
+            """Fetch one shard; returns its cached IDs, or the decode future and validators"""
+            cached = cache.get(url, extraction) if cache else None
+            headers = cached.conditional_headers() if cached else {}
+            backlog.acquire()
+            try:
+                response = session.get(url, timeout=timeout, headers=headers)
+                if response.status_code == 304 and cached:
+                    cache.record_hit(url, extraction)
+                    backlog.release()
+                    return cached.ids
+                response.raise_for_status()
+                future = decoders.submit(decode_shard, response.content, min_len, max_len)
+            except Exception:
+                backlog.release()
+                raise
+            future.add_done_callback(lambda _: backlog.release())
+            validators = (response.headers.get("ETag"), response.headers.get("Last-Modified"))
+            return future, validators, len(response.content)
+
+        downloads = {downloaders.submit(download, url): url for url in gz_urls}
+        decodes = {}
+        done_count = 0
+        while downloads or decodes:
+            finished, _ = wait(set(downloads) | set(decodes), return_when=FIRST_COMPLETED)
+            for future in finished:
+                if future in downloads:
+                    url = downloads.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        print(f"Error downloading {url}: {e}")
+                        failed.append(url)
+                        continue
+                    if isinstance(result, np.ndarray):
+                        ids = result
+                    else:
+                        decode_future, validators, size = result
+                        bytes_in += size
+                        decodes[decode_future] = (url, validators)
+                        continue
+                else:
+                    url, validators = decodes.pop(future)
+                    try:
+                        ids = take_shared_ids(*future.result())
+                    except Exception as e:
+                        print(f"Error decoding {url}: {e}")
+                        failed.append(url)
+                        continue
+                    if cache:
+                        cache.store(url, extraction, ids, *validators)
+
+                parts.append(ids)
+                done_count += 1
+                print(f"File {done_count}/{len(gz_urls)}: Found {len(ids)} podcasts ({url})")
+
+    all_ids = sorted_unique(np.concatenate(parts)) if parts else np.empty(0, dtype=np.int64)
+    elapsed = time.time() - start_time
+    print(f"Ingested {len(gz_urls) - len(failed)}/{len(gz_urls)} shards ({bytes_in / 1e6:.1f} MB downloaded) "
+          f"in {elapsed:.1f}s with {max_workers} download threads and {decode_workers} decode processes: "
+          f"{len(all_ids)} unique IDs")
+    if cache:
+        cache.print_report()
+    return all_ids, failed
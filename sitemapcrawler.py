@@ -1,60 +1,122 @@
-from bs4 import BeautifulSoup
-import re
+import argparse
 import csv
 import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
+import numpy as np
 
-# to get podcast_ids from the sitemap
-def get_podcast_ids_from_local_file(file_path):
-    
-    with open(file_path, "r", encoding="utf-8") as file:
-        content = file.read()
-    
-    soup = BeautifulSoup(content, "lxml-xml")  
-    loc_tags = soup.find_all("loc")
+from id_store import as_id_array, sorted_unique
+from id_validation import MAX_ID_DIGITS
+from sitemap_ingest import read_local_shard
 
-    podcast_ids = []
-    
-    for loc in loc_tags:
-        url = loc.text.strip()
+# Default sitemap file and the compact output (sorted, unique int64 IDs, same format as the ID store)
+DEFAULT_SITEMAP = "sitemaps_podcasts_podcast_100_1.xml"
+OUTPUT_FILE = "podcast_ids.npy"
+SHARD_SUFFIXES = (".xml", ".gz")
 
-        # Regex to match `/id/` followed by digits
-        match = re.search(r"id(\d+)", url)
-        if match:
-            podcast_id = match.group(1)
-            podcast_ids.append(podcast_id)
-            
-    return podcast_ids
+
+# to get podcast_ids from one downloaded sitemap (runs in a worker process)
+def get_podcast_ids_from_local_file(file_path, min_len=1, max_len=MAX_ID_DIGITS):
+    return as_id_array(read_local_shard(file_path, min_len=min_len, max_len=max_len))
+
+
+# expand directories into the sitemap files they contain
+def find_sitemap_files(paths):
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(
+                os.path.join(path, name) for name in sorted(os.listdir(path))
+                if name.endswith(SHARD_SUFFIXES)
+            )
+        else:
+            files.append(path)
+    return files
+
+
+# parse every file in a pool of worker processes, one file per task
+def collect_podcast_ids(files, workers=None, min_len=1, max_len=MAX_ID_DIGITS):
+    workers = min(workers or os.cpu_count() or 1, len(files)) or 1
+    parts = []
+    failed = []
+    start_time = time.time()
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(get_podcast_ids_from_local_file, path, min_len, max_len): path
+            for path in files
+        }
+        for i, future in enumerate(as_completed(futures), 1):
+            path = futures[future]
+            try:
+                ids = future.result()
+            except Exception as e:
+                print(f"❌ {path}: {e}")
+                failed.append(path)
+                continue
+            parts.append(ids)
+            print(f"📄 {i}/{len(files)} {path}: {len(ids)} IDs")
+
+    all_ids = sorted_unique(np.concatenate(parts)) if parts else np.empty(0, dtype=np.int64)
+    elapsed = time.time() - start_time
+    print(f"⚡ Parsed {len(files) - len(failed)}/{len(files)} files in {elapsed:.1f}s with {workers} processes")
+    return all_ids, failed
+
+
+# to store podcast_ids compactly (np.load(..., mmap_mode="r") reads them back)
+def save_to_npy(podcast_ids, filename=OUTPUT_FILE):
+    tmp_path = filename + ".tmp"
+    with open(tmp_path, "wb") as f:
+        np.save(f, podcast_ids)
+    os.replace(tmp_path, filename)
+    print(f"💾 Saved {len(podcast_ids)} IDs to {filename}")
 
 
 # to store podcast_ids in json
 def save_to_json(podcast_ids, filename="podcast_ids.json"):
     with open(filename, "w", encoding="utf-8") as f:
-        json.dump(sorted(podcast_ids), f, indent=4)
+        json.dump([str(pid) for pid in podcast_ids], f, indent=4)
 
 
 # to store podcast_ids in csv
 def save_to_csv(podcast_ids, filename="podcastid.csv"):
     with open(filename, mode="w", newline="", encoding="utf-8") as file:
         writer = csv.writer(file)
-        writer.writerow(["Podcast ID"])  
+        writer.writerow(["Podcast ID"])
         for pid in podcast_ids:
             writer.writerow([pid])
 
 
-# definig file path of sitemap
-file_path = "sitemaps_podcasts_podcast_100_1.xml"
+def main():
+    parser = argparse.ArgumentParser(description="Extract podcast IDs from downloaded sitemap files")
+    parser.add_argument("paths", nargs="*", default=[DEFAULT_SITEMAP],
+                        help="Sitemap files (.xml or .gz) or directories of them")
+    parser.add_argument("--output", default=OUTPUT_FILE, help="Compact .npy output")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--min-len", type=int, default=1)
+    parser.add_argument("--max-len", type=int, default=MAX_ID_DIGITS)
+    parser.add_argument("--json", action="store_true", help="Also write podcast_ids.json")
+    parser.add_argument("--csv", action="store_true", help="Also write podcastid.csv")
+    args = parser.parse_args()
 
-# function call to get ids from sitemap
-podcast_ids = get_podcast_ids_from_local_file(file_path)
+    files = find_sitemap_files(args.paths)
+    if not files:
+        print("⚠️ No sitemap files found")
+        return
 
-# converting ids to set to retain only unique ids
-podcast_ids_set = set(podcast_ids)
+    podcast_ids, failed = collect_podcast_ids(files, args.workers, args.min_len, args.max_len)
+    print("length", len(podcast_ids))
 
-#print(podcast_ids_set length)
-print("length", len(podcast_ids_set))
+    save_to_npy(podcast_ids, args.output)
+    if args.json:
+        save_to_json(podcast_ids)
+    if args.csv:
+        save_to_csv(podcast_ids)
+    for path in failed:
+        print(f"⚠️ Failed: {path}")
 
-# saving ids in json format
-save_to_json(podcast_ids_set)
-save_to_csv(podcast_ids_set)
 
+if __name__ == "__main__":
+    main()
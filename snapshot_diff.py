@@ -0,0 +1,285 @@
+# Bounded-memory diff of two chart snapshots (database tables or CSV files)
+import argparse
+import csv
+import os
+import re
+import tempfile
+import time
+import zlib
+from itertools import groupby
+from operator import itemgetter
+from typing import Iterable, Iterator, Optional, Sequence, Tuple
+
+KEY_COLUMNS = ["showId", "countryCode", "category"]
+VALUE_COLUMNS = ["chart_rank"]
+FETCH_SIZE = 10_000
+PARTITIONS = 32
+IDENTIFIER = re.compile(r"^[A-Za-z0-9_]+$")
+
+Row = Tuple[Tuple[str, ...], Tuple[str, ...]]   # (key, values), all as strings
+
+
+class DiffStats:
+    """Counters for one comparison"""
+
+    def __init__(self, left: str, right: str):
+        self.left = left
+        self.right = right
+        self.left_rows = 0
+        self.right_rows = 0
+        self.added = 0
+        self.removed = 0
+        self.changed = 0
+        self.unchanged = 0
+        self.started = time.time()
+        self.elapsed = 0.0
+
+    def finish(self) -> "DiffStats":
+        self.elapsed = time.time() - self.started
+        return self
+
+    def print_report(self) -> None:
+        rows = self.left_rows + self.right_rows
+        rate = rows / self.elapsed if self.elapsed else 0.0
+        print(f"🔍 {self.left} ({self.left_rows} rows) vs {self.right} ({self.right_rows} rows)")
+        print(f"   ➕ Added: {self.added}   ➖ Removed: {self.removed}   "
+              f"🔀 Changed: {self.changed}   ✅ Unchanged: {self.unchanged}")
+        print(f"   ⚡ {rows} rows in {self.elapsed:.1f}s ({rate:,.0f} rows/sec)")
+
+
+def _counted(rows: Iterable[Row], stats: DiffStats, side: str) -> Iterator[Row]:
+    for row in rows:
+        setattr(stats, side, getattr(stats, side) + 1)
+        yield row
+
+
+def _group_diff(key: Tuple[str, ...], left: Sequence[Tuple[str, ...]], right: Sequence[Tuple[str, ...]],
+                stats: DiffStats) -> Iterator[Tuple[str, Row, Row]]:
+    """Diff the values of one key as multisets: equal values match first, the rest pair up in sorted order"""
+    unmatched = list(right)
+    removed = []
+    for values in sorted(left):
+        if values in unmatched:
+            unmatched.remove(values)
+            stats.unchanged += 1
+        else:
+            removed.append(values)
+    added = sorted(unmatched)
+    for i in range(max(len(removed), len(added))):
+        a = (key, removed[i]) if i < len(removed) else None
+        b = (key, added[i]) if i < len(added) else None
+        kind = "changed" if a and b else "removed" if a else "added"
+        setattr(stats, kind, getattr(stats, kind) + 1)
+        yield kind, a, b
+
+
+def merge_diff(left: Iterable[Row], right: Iterable[Row], stats: DiffStats) -> Iterator[Tuple[str, Row, Row]]:
+    """Merge two key-ordered row streams and yield ("added"|"removed"|"changed", left_row, right_row).
+
+    Only the rows of the current key are held in memory. Rows sharing a
+    key (several episodes of one show in a top_episodes chart) are
+    compared as multisets of their values, so their order does not
+    matter. Keys must be in ascending string order on both sides; a
+    stream that is not raises ValueError instead of producing a wrong diff.
+
+    >>> stats = DiffStats("old", "new")
+    >>> key = ("a", "us", "top_episodes")
+    >>> list(merge_diff([(key, ("7",)), (key, ("3",))], [(key, ("7",))], stats))
+    [('removed', (('a', 'us', 'top_episodes'), ('3',)), None)]
+    >>> stats.unchanged, stats.changed
+    (1, 0)
+    """
+    def ordered(rows: Iterator[Row], name: str) -> Iterator[Row]:
+        previous = None
+        for row in rows:
+            if previous is not None and row[0] < previous:
+                raise ValueError(f"{name} is not sorted by key at {row[0]!r}")
+            previous = row[0]
+            yield row
+
+    left_groups = groupby(ordered(_counted(left, stats, "left_rows"), stats.left), key=itemgetter(0))
+    right_groups = groupby(ordered(_counted(right, stats, "right_rows"), stats.right), key=itemgetter(0))
+    a = next(left_groups, None)
+    b = next(right_groups, None)
+    while a is not None or b is not None:
+        if b is None or (a is not None and a[0] < b[0]):
+            yield from _group_diff(a[0], [values for _, values in a[1]], [], stats)
+            a = next(left_groups, None)
+        elif a is None or b[0] < a[0]:
+            yield from _group_diff(b[0], [], [values for _, values in b[1]], stats)
+            b = next(right_groups, None)
+        else:
+            yield from _group_diff(a[0], [values for _, values in a[1]], [values for _, values in b[1]], stats)
+            a = next(left_groups, None)
+            b = next(right_groups, None)
+
+
+# ---------------------------------------------------------------------------
+# Database tables: both sides streamed in key order from the server
+# ---------------------------------------------------------------------------
+
+def _check_identifiers(*names: str) -> None:
+    for name in names:
+        if not IDENTIFIER.match(name):
+            raise ValueError(f"Invalid table or column name: {name!r}")
+
+
+def table_rows(conn, table: str, key_columns: Sequence[str] = KEY_COLUMNS,
+               value_columns: Sequence[str] = VALUE_COLUMNS, fetch_size: int = FETCH_SIZE) -> Iterator[Row]:
+    """Stream a table ordered by its key through an unbuffered cursor.
+
+    Keys are ordered as binary strings so the server's order matches
+    Python's string comparison whatever the column collation or type.
+    """
+    _check_identifiers(table, *key_columns, *value_columns)
+    columns = ", ".join(f"`{c}`" for c in (*key_columns, *value_columns))
+    order = ", ".join(f"CAST(`{c}` AS CHAR) COLLATE utf8mb4_bin" for c in key_columns)
+    cursor = conn.cursor(buffered=False)
+    try:
+        cursor.execute(f"SELECT {columns} FROM `{table}` ORDER BY {order}")
+        width = len(key_columns)
+        while True:
+            batch = cursor.fetchmany(fetch_size)
+            if not batch:
+                break
+            for row in batch:
+                row = tuple("" if v is None else str(v) for v in row)
+                yield row[:width], row[width:]
+    finally:
+        cursor.close()
+
+
+def diff_tables(left_conn, right_conn, table1: str, table2: str, writer: "DiffWriter",
+                key_columns: Sequence[str] = KEY_COLUMNS,
+                value_columns: Sequence[str] = VALUE_COLUMNS) -> DiffStats:
+    """Diff two snapshot tables.
+
+    Both result sets are streamed at the same time, and a connection can
+    only stream one unbuffered result, so each table needs its own
+    connection.
+    """
+    stats = DiffStats(table1, table2)
+    left = table_rows(left_conn, table1, key_columns, value_columns)
+    right = table_rows(right_conn, table2, key_columns, value_columns)
+    for kind, a, b in merge_diff(left, right, stats):
+        writer.write(kind, a, b)
+    return stats.finish()
+
+
+# ---------------------------------------------------------------------------
+# Files: unsorted CSVs, hash-partitioned to temp files and diffed one partition at a time
+# ---------------------------------------------------------------------------
+
+def file_rows(path: str, key_columns: Sequence[str] = KEY_COLUMNS,
+              value_columns: Sequence[str] = VALUE_COLUMNS) -> Iterator[Row]:
+    """Rows of a CSV snapshot with a header naming the key and value columns"""
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        missing = [c for c in (*key_columns, *value_columns) if c not in header]
+        if missing:
+            raise ValueError(f"{path} has no column(s) {', '.join(missing)}")
+        key_idx = [header.index(c) for c in key_columns]
+        value_idx = [header.index(c) for c in value_columns]
+        for row in reader:
+            if row:
+                yield tuple(row[i] for i in key_idx), tuple(row[i] for i in value_idx)
+
+
+def _partition_of(key: Tuple[str, ...], partitions: int) -> int:
+    return zlib.crc32("\x1f".join(key).encode("utf-8")) % partitions
+
+
+def partition_rows(rows: Iterable[Row], directory: str, partitions: int) -> None:
+    """Spread rows over ``partitions`` temp files by a stable hash of their key"""
+    files = [open(os.path.join(directory, f"part-{i:03d}.csv"), "w", newline="", encoding="utf-8")
+             for i in range(partitions)]
+    try:
+        writers = [csv.writer(f) for f in files]
+        for key, values in rows:
+            writers[_partition_of(key, partitions)].writerow(key + values)
+    finally:
+        for f in files:
+            f.close()
+
+
+def _read_partition(path: str, width: int) -> Iterator[Row]:
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.reader(f):
+            yield tuple(row[:width]), tuple(row[width:])
+
+
+def diff_files(path1: str, path2: str, writer: "DiffWriter",
+               key_columns: Sequence[str] = KEY_COLUMNS, value_columns: Sequence[str] = VALUE_COLUMNS,
+               partitions: int = PARTITIONS) -> DiffStats:
+    """Diff two CSV snapshots in any row order.
+
+    Both files are hash-partitioned on the key, so matching rows land in
+    the same partition pair; each pair is then sorted and merge-diffed.
+    Memory is bounded by one partition (about 1/``partitions`` of a file).
+    """
+    stats = DiffStats(path1, path2)
+    width = len(key_columns)
+    with tempfile.TemporaryDirectory(prefix="snapshot_diff_") as tmp:
+        for side, path in (("left", path1), ("right", path2)):
+            os.makedirs(os.path.join(tmp, side))
+            partition_rows(file_rows(path, key_columns, value_columns), os.path.join(tmp, side), partitions)
+        for i in range(partitions):
+            name = f"part-{i:03d}.csv"
+            left = sorted(_read_partition(os.path.join(tmp, "left", name), width))
+            right = sorted(_read_partition(os.path.join(tmp, "right", name), width))
+            for kind, a, b in merge_diff(left, right, stats):
+                writer.write(kind, a, b)
+    return stats.finish()
+
+
+# ---------------------------------------------------------------------------
+# Output
+# ---------------------------------------------------------------------------
+
+class DiffWriter:
+    """CSV of differences: change, key columns, old and new value columns"""
+
+    def __init__(self, path: str, key_columns: Sequence[str] = KEY_COLUMNS,
+                 value_columns: Sequence[str] = VALUE_COLUMNS):
+        self.path = path
+        self._file = open(path, "w", newline="", encoding="utf-8")
+        self._writer = csv.writer(self._file)
+        self._empty = ("",) * len(value_columns)
+        self._writer.writerow(["change", *key_columns,
+                               *(f"old_{c}" for c in value_columns), *(f"new_{c}" for c in value_columns)])
+
+    def write(self, kind: str, left: Optional[Row], right: Optional[Row]) -> None:
+        key = (left or right)[0]
+        old = left[1] if left else self._empty
+        new = right[1] if right else self._empty
+        self._writer.writerow([kind, *key, *old, *new])
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> "DiffWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Diff two chart snapshot CSV files in bounded memory")
+    parser.add_argument("old", help="Older snapshot CSV")
+    parser.add_argument("new", help="Newer snapshot CSV")
+    parser.add_argument("--key", nargs="+", default=KEY_COLUMNS, help="Columns identifying a chart entry")
+    parser.add_argument("--value", nargs="+", default=VALUE_COLUMNS, help="Columns compared for changes")
+    parser.add_argument("--partitions", type=int, default=PARTITIONS)
+    parser.add_argument("--output", default="different.csv")
+    args = parser.parse_args()
+
+    with DiffWriter(args.output, args.key, args.value) as writer:
+        stats = diff_files(args.old, args.new, writer, args.key, args.value, args.partitions)
+    stats.print_report()
+    print(f"💾 Differences saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
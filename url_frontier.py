@@ -0,0 +1,81 @@
+# URL frontier with insert-time dedup and content fingerprinting
+import hashlib
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, Optional, Set
+from urllib.parse import urlsplit, urlunsplit
+
+
+def normalize_url(url: str) -> str:
+    """Canonical form used for dedup: lowercase scheme/host, no fragment, no trailing slash"""
+    parts = urlsplit(url.strip())
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, parts.query, ""))
+
+
+def fingerprint(body) -> str:
+    """Content hash of a response body (str or bytes)"""
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+class UrlFrontier:
+    """FIFO of URLs to fetch that refuses duplicates and remembers page contents.
+
+    URLs are deduplicated when they are added, so a repeated genre ID or
+    country never becomes a second request. Parsed results are remembered
+    by the content hash of the page they came from; when a later page has
+    the same body, :meth:`parsed` returns the earlier result instead of
+    parsing it again.
+    """
+
+    def __init__(self, urls: Iterable[str] = ()):
+        self._queue: Deque[str] = deque()
+        self._seen: Set[str] = set()
+        self._results: Dict[str, Any] = {}
+        self.offered = 0
+        self.duplicate_urls = 0
+        self.pages_seen = 0
+        self.duplicate_pages = 0
+        self.add_many(urls)
+
+    def add(self, url: str) -> bool:
+        """Queue a URL unless it was added before; True if it was queued"""
+        self.offered += 1
+        key = normalize_url(url)
+        if key in self._seen:
+            self.duplicate_urls += 1
+            return False
+        self._seen.add(key)
+        self._queue.append(url)
+        return True
+
+    def add_many(self, urls: Iterable[str]) -> int:
+        return sum(self.add(url) for url in urls)
+
+    def pop(self) -> Optional[str]:
+        return self._queue.popleft() if self._queue else None
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def __iter__(self):
+        """Drain the frontier in insertion order (URLs added while iterating are included)"""
+        while self._queue:
+            yield self._queue.popleft()
+
+    def parsed(self, body) -> Optional[Any]:
+        """Result stored for a page with the same content, or None if it has to be parsed"""
+        self.pages_seen += 1
+        result = self._results.get(fingerprint(body))
+        if result is not None:
+            self.duplicate_pages += 1
+        return result
+
+    def remember(self, body, result: Any) -> None:
+        """Store the parse result of a page under its content hash"""
+        self._results[fingerprint(body)] = result
+
+    def print_report(self) -> None:
+        print(f"🧭 Frontier: {self.offered} URLs offered, {self.duplicate_urls} duplicate fetches avoided, "
+              f"{self.duplicate_pages} of {self.pages_seen} pages had already-seen content (parse skipped)")
@@ -1,7 +1,17 @@
-import requests
 from bs4 import BeautifulSoup
-import re
-import time
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from rate_governor import print_governor_report
+from http_client import http_get, print_connection_report
+from crawl_checkpoint import CrawlCheckpoint
+from id_extract import href_ids
+
+parser = argparse.ArgumentParser(description="Collect podcast IDs from every country's browse page")
+parser.add_argument("--fresh", action="store_true", help="Ignore an unfinished checkpoint and start over")
+args = parser.parse_args()
 
 countries = [
 'dz', 'ao', 'am', 'az', 'bh', 'bj', 'bw', 'bn', 'bf', 'cm', 'cv', 'td', 'ci', 'cd', 'eg',
@@ -22,34 +32,39 @@ headers = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/115.0.0.0 Safari/537.36"
 }
 
-all_ids = set()
 falied = []
+# Each finished country is committed with its IDs, so a restart skips it
+checkpoint = CrawlCheckpoint("browse_pages", fresh=args.fresh)
+done_countries = checkpoint.done_units()
 for country in countries:
+    if country in done_countries:
+        continue
     url = f"https://podcasts.apple.com/{country}/browse"
     print(f"Fetching: {url}")
 
     try:
-        r = requests.get(url, headers=headers, timeout=10)
+        # Paced by the adaptive per-host governor instead of a fixed 5s pause
+        r = http_get(url, headers=headers, timeout=10)
         if r.status_code != 200:
             print(f"❌ Failed for {country} - Status {r.status_code}")
             falied.append(country)
+            checkpoint.mark_failed(country, f"status {r.status_code}")
             continue
 
         soup = BeautifulSoup(r.text, "html.parser")
 
         # Select all <a> tags with href containing /id<number>
-        for a in soup.select("a[href*='/id']"):
-            href = a["href"]
-            match = re.search(r'/id(\d+)', href)
-            if match:
-                all_ids.add(match.group(1))
+        page_ids = href_ids(a["href"] for a in soup.select("a[href*='/id']"))
+        checkpoint.mark_done(country, page_ids)
 
-        print(f"✅ {country}: Found {len(all_ids)} total IDs so far")
-
-        time.sleep(5)  
+        print(f"✅ {country}: Found {len(page_ids)} IDs")
 
     except Exception as e:
         print(f"Error fetching {country}: {e}")
+        checkpoint.mark_failed(country, str(e))
+
+# Includes the countries finished before a restart
+all_ids = checkpoint.all_ids()
 
 # Save to file
 with open("browse_page_ids.txt", "w", encoding="utf-8") as f:
@@ -60,3 +75,7 @@ for i in falied:
     print(i)
 
 print(f"\n🎯 Done! Found {len(all_ids)} Apple Podcast IDs.")
+print_governor_report()
+checkpoint.print_report()
+print_connection_report()
+checkpoint.finish()
@@ -1,12 +1,18 @@
 import sqlite3
 import csv
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from id_store import as_id_array
+from id_diff import subtract_ids
 
 
 old_data = "itunes_ids.txt"
 
-# Load existing Apple IDs from TXT (one ID per line)
+# Load existing Apple IDs from TXT (one ID per line) as a sorted int64 array
 with open(old_data, "r", encoding="utf-8") as f:
-    existing_ids = {line.strip() for line in f if line.strip()}
+    existing_ids = as_id_array(line for line in f)
 
 # Connect to SQLite database
 conn = sqlite3.connect("podcastindex_feeds.db")
@@ -24,10 +30,10 @@ cursor.execute("""
       AND itunesId != '' 
       AND itunesId != '0'
 """)
-db_ids = {str(row[0]).strip() for row in cursor.fetchall()}
+db_ids = as_id_array(str(row[0]) for row in cursor)
 
-# Compare to find new IDs
-new_ids = existing_ids - db_ids
+# Compare to find new IDs (vectorized sorted-array difference)
+new_ids = subtract_ids(existing_ids, db_ids)
 
 
 # Output result
@@ -1,22 +1,15 @@
 import sqlite3
 import csv
-import requests
-import random
-import time
-import json
+import os
+import sys
 
-# Load old apple_ids.csv
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from id_store import open_known_ids
+from itunes_lookup import BatchLookupValidator, VALID, FAILED
+
+# Open the known Apple ID store for ../apple_ids.csv
 print("📂 Loading existing Apple IDs...")
-existing_ids = set()
-try:
-    with open("../apple_ids.csv", "r", encoding="utf-8") as f:
-        reader = csv.reader(f)
-        for row in reader:
-            if row and len(row) > 0:
-                existing_ids.add(row[0].strip())
-    print(f"✅ Loaded {len(existing_ids)} existing IDs")
-except FileNotFoundError:
-    print("⚠️ apple_ids.csv not found, starting fresh")
+known_ids = open_known_ids("../apple_ids.csv")
 
 
 # Load itunesIds from SQLite DB
@@ -35,7 +28,7 @@ print(f"✅ Loaded {len(db_ids)} IDs from database")
 
 
 # Determine new IDs
-new_ids = list(existing_ids - db_ids)
+new_ids = [str(i) for i in known_ids.not_in(db_ids)]
 print(f"🔍 Total new IDs to check: {len(new_ids)}")
 
 
@@ -54,116 +47,6 @@ USER_AGENTS = [
 ]
 
 
-def get_random_headers(prev=None):
-    """Get random headers, ensuring different from previous"""
-    max_attempts = 10
-    attempts = 0
-    
-    while attempts < max_attempts:
-        ua = random.choice(USER_AGENTS)
-        headers = {
-            "User-Agent": ua,
-            "Accept": "application/json, text/plain, */*",
-            "Accept-Language": "en-US,en;q=0.9",
-            "Accept-Encoding": "gzip, deflate, br",
-            "Connection": "keep-alive",
-            "Upgrade-Insecure-Requests": "1"
-        }
-        
-        if prev is None or headers["User-Agent"] != prev.get("User-Agent"):
-            return headers
-        attempts += 1
-    
-    # If we can't find a different one, just return a random one
-    return headers
-
-
-def is_valid_itunes_id(itunes_id, prev_headers, retries=3):
-    """Check if iTunes ID is valid with retry logic"""
-    url = "https://itunes.apple.com/lookup"
-    params = {"id": itunes_id, "entity": "podcast"}
-    
-    for attempt in range(retries):
-        try:
-            headers = get_random_headers(prev_headers)
-            
-            # Add random delay to avoid rate limiting
-            if attempt > 0:
-                time.sleep(random.uniform(2, 5))
-            
-            response = requests.get(
-                url, 
-                params=params, 
-                headers=headers, 
-                timeout=10,  # Increased timeout
-                allow_redirects=True
-            )
-            
-            # Check if request was successful
-            if response.status_code == 200:
-                try:
-                    data = response.json()
-                    result_count = data.get("resultCount", 0)
-                    
-                    # Additional validation - check if it's actually a podcast
-                    if result_count > 0:
-                        results = data.get("results", [])
-                        if results:
-                            # Check if it's a podcast (not music, app, etc.)
-                            first_result = results[0]
-                            kind = first_result.get("kind", "")
-                            wrapper_type = first_result.get("wrapperType", "")
-                            
-                            # Valid podcast indicators
-                            is_podcast = (
-                                kind == "podcast" or 
-                                wrapper_type == "track" and 
-                                first_result.get("primaryGenreName") in ["Podcasts", "Arts", "Business", "Comedy", "Education", "Fiction", "Government", "Health & Fitness", "History", "Kids & Family", "Leisure", "Music", "News", "Religion & Spirituality", "Science", "Society & Culture", "Sports", "Technology", "True Crime", "TV & Film"]
-                            )
-                            
-                            if is_podcast:
-                                return True, headers, f"Valid podcast: {first_result.get('collectionName', 'Unknown')}"
-                            else:
-                                return False, headers, f"Not a podcast: {kind}/{wrapper_type}"
-                    
-                    return False, headers, f"No results found (resultCount: {result_count})"
-                    
-                except json.JSONDecodeError as e:
-                    print(f"⚠️ JSON decode error for {itunes_id} (attempt {attempt + 1}): {e}")
-                    if attempt == retries - 1:
-                        return False, headers, f"JSON decode error: {e}"
-                    continue
-                    
-            elif response.status_code == 429:
-                print(f"⚠️ Rate limited for {itunes_id} (attempt {attempt + 1}), waiting...")
-                time.sleep(random.uniform(5, 10))
-                continue
-            else:
-                print(f"⚠️ HTTP {response.status_code} for {itunes_id} (attempt {attempt + 1})")
-                if attempt == retries - 1:
-                    return False, headers, f"HTTP {response.status_code}"
-                continue
-                
-        except requests.exceptions.Timeout:
-            print(f"⚠️ Timeout for {itunes_id} (attempt {attempt + 1})")
-            if attempt == retries - 1:
-                return False, headers if 'headers' in locals() else None, "Timeout"
-            continue
-            
-        except requests.exceptions.RequestException as e:
-            print(f"⚠️ Request error for {itunes_id} (attempt {attempt + 1}): {e}")
-            if attempt == retries - 1:
-                return False, headers if 'headers' in locals() else None, f"Request error: {e}"
-            continue
-            
-        except Exception as e:
-            print(f"⚠️ Unexpected error for {itunes_id} (attempt {attempt + 1}): {e}")
-            if attempt == retries - 1:
-                return False, headers if 'headers' in locals() else None, f"Unexpected error: {e}"
-            continue
-    
-    return False, None, "All retries failed"
-
 # Initialize tracking variables
 valid_ids = []
 invalid_ids = []
@@ -185,37 +68,30 @@ with open("new_apple_ids_valid.csv", "w", encoding="utf-8", newline="") as valid
     invalid_writer.writerow(["itunes_id", "reason"])
     failed_writer.writerow(["itunes_id", "error"])
     
-    prev_headers = None
-    
-    for idx, apple_id in enumerate(new_ids, 1):
-        print(f"\n📊 Progress: {idx}/{len(new_ids)} ({idx/len(new_ids)*100:.1f}%)")
-        print(f"🔍 Checking ID: {apple_id}")
-        
-        is_valid, prev_headers, message = is_valid_itunes_id(apple_id, prev_headers)
-        
-        if is_valid:
-            print(f"✅ VALID: {apple_id} - {message}")
-            valid_writer.writerow([apple_id, message.replace("Valid podcast: ", "")])
-            valid_ids.append(apple_id)
-        elif "error" in message.lower() or "timeout" in message.lower() or "failed" in message.lower():
-            print(f"🔄 FAILED: {apple_id} - {message}")
-            failed_writer.writerow([apple_id, message])
-            failed_ids.append(apple_id)
-        else:
-            print(f"❌ INVALID: {apple_id} - {message}")
-            invalid_writer.writerow([apple_id, message])
-            invalid_ids.append(apple_id)
-        
-        # Flush files periodically
-        if idx % 10 == 0:
-            valid_file.flush()
-            invalid_file.flush()
-            failed_file.flush()
-            print(f"💾 Progress saved - Valid: {len(valid_ids)}, Invalid: {len(invalid_ids)}, Failed: {len(failed_ids)}")
-        
-        # Random delay between requests
-        delay = random.uniform(1, 3)
-        time.sleep(delay)
+    def record(batch_results):
+        for apple_id, status, message in batch_results:
+            if status == VALID:
+                print(f"✅ VALID: {apple_id} - {message}")
+                valid_writer.writerow([apple_id, message.replace("Valid podcast: ", "")])
+                valid_ids.append(apple_id)
+            elif status == FAILED:
+                print(f"🔄 FAILED: {apple_id} - {message}")
+                failed_writer.writerow([apple_id, message])
+                failed_ids.append(apple_id)
+            else:
+                print(f"❌ INVALID: {apple_id} - {message}")
+                invalid_writer.writerow([apple_id, message])
+                invalid_ids.append(apple_id)
+
+        # Flush files after every batch
+        valid_file.flush()
+        invalid_file.flush()
+        failed_file.flush()
+        print(f"💾 Progress saved - Valid: {len(valid_ids)}, Invalid: {len(invalid_ids)}, Failed: {len(failed_ids)}")
+
+    # Multi-ID lookup batches, run concurrently within the request budget
+    validator = BatchLookupValidator(user_agents=USER_AGENTS)
+    validator.validate(new_ids, on_results=record)
 
 # Final summary
 print(f"\n🎉 VALIDATION COMPLETE!")
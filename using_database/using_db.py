@@ -1,12 +1,16 @@
 import sqlite3
 import csv
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from id_store import open_known_ids, as_id_array
+from id_diff import subtract_ids
 
 old_data = "../apple_ids.csv"
 
-# Load existing Apple IDs from CSV
-with open(old_data, "r", encoding="utf-8") as csvfile:
-    reader = csv.reader(csvfile)
-    existing_ids = {row[0].strip() for row in reader if row}
+# Open the known Apple ID store (rebuilt from the CSV only when it changes)
+known_ids = open_known_ids(old_data)
 
 # Connect to SQLite database
 conn = sqlite3.connect("podcastindex_feeds.db")
@@ -24,14 +28,14 @@ cursor.execute("""
       AND itunesId != '' 
       AND itunesId != '0'
 """)
-db_ids = {str(row[0]).strip() for row in cursor.fetchall()}
+db_ids = as_id_array(str(row[0]) for row in cursor)
 
-# Compare to find new IDs
-new_ids = db_ids - existing_ids
+# Compare to find new IDs (vectorized sorted-array difference)
+new_ids = subtract_ids(db_ids, known_ids)
 
 # Output result
 print(f"Total itunesIds in DB: {len(db_ids)}")
-print(f"Total ituneIds in CSV: {len(existing_ids)}")
+print(f"Total ituneIds in CSV: {len(known_ids)}")
 print(f"Found {len(new_ids)} new Apple IDs to verify...")
     
 # Save only valid Apple IDs
@@ -1,13 +1,14 @@
 import sqlite3
 import csv
-import requests
-import random
-import time
+import os
+import sys
 
-# Load old apple_ids.csv
-with open("../apple_ids.csv", "r", encoding="utf-8") as f:
-    reader = csv.reader(f)
-    existing_ids = {row[0].strip() for row in reader if row}
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from id_store import open_known_ids
+from itunes_lookup import BatchLookupValidator, VALID
+
+# Open the known Apple ID store for ../apple_ids.csv
+known_ids = open_known_ids("../apple_ids.csv")
 
 # Load itunesIds from SQLite DB
 conn = sqlite3.connect("podcastindex_feeds.db")
@@ -21,7 +22,7 @@ cursor.execute("""
 db_ids = {str(row[0]).strip() for row in cursor.fetchall()}
 
 # Determine new IDs
-new_ids = list(db_ids - existing_ids)
+new_ids = [str(i) for i in known_ids.missing(db_ids)]
 print(f"🔍 Total new IDs to check: {len(new_ids)}")
 
 # List of 10 user-agent headers
@@ -38,40 +39,22 @@ USER_AGENTS = [
     "Mozilla/5.0 (Linux; Android 10; SM-G975F)"
 ]
 
-def get_random_headers(prev=None):
-    # Ensure not the same as previous header
-    headers = None
-    while True:
-        ua = random.choice(USER_AGENTS)
-        headers = {"User-Agent": ua}
-        if headers != prev:
-            return headers
-
-def is_valid_itunes_id(itunes_id, prev_headers):
-    url = "https://itunes.apple.com/lookup"
-    params = {"id": itunes_id, "entity": "podcast"}
-    headers = get_random_headers(prev_headers)
-    try:
-        response = requests.get(url, params=params, headers=headers, timeout=1)
-        data = response.json()
-        return data.get("resultCount", 0) > 0, headers
-    except Exception as e:
-        print(f"⚠️ Error on {itunes_id}: {e}")
-        return False, headers
-
 # Open CSV for writing valid IDs
 valid_ids = []
 with open("new_apple_ids.csv", "w", encoding="utf-8", newline="") as csvfile:
     writer = csv.writer(csvfile)
-    prev_headers = None
-    for idx, apple_id in enumerate(new_ids, 1):
-        is_valid, prev_headers = is_valid_itunes_id(apple_id, prev_headers)
-        if is_valid:
-            print(f"{idx} ✅ Valid: {apple_id}")
-            writer.writerow([apple_id])
-            valid_ids.append(apple_id)
-        else:
-            print(f"{idx} ❌ Invalid or Failed: {apple_id}")
-        time.sleep(1)
+
+    def record(batch_results):
+        for apple_id, status, message in batch_results:
+            if status == VALID:
+                print(f"✅ Valid: {apple_id}")
+                writer.writerow([apple_id])
+                valid_ids.append(apple_id)
+            else:
+                print(f"❌ Invalid or Failed: {apple_id} ({message})")
+        csvfile.flush()
+
+    # Comma-separated lookup batches instead of one request per ID
+    BatchLookupValidator(user_agents=USER_AGENTS).validate(new_ids, on_results=record)
 
 print(f"\n🎉 Finished. {len(valid_ids)} valid Apple IDs saved.")
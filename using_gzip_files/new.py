@@ -1,7 +1,4 @@
-import io
 from bs4 import BeautifulSoup
-import re
-import gzip
 import sys
 import requests
 import hashlib
@@ -11,6 +8,11 @@ import os
 
 sys.path.append(os.path.abspath("..")) 
 import password
+from sitemap_ingest import stream_shard_ids, ingest_shards_parallel
+from shard_cache import ShardCache
+from id_store import open_known_ids
+from id_diff import subtract_ids
+from http_client import get_session, http_get, http_request
 
 API_KEY = password.API_KEY
 API_SECRET = password.API_SECRET
@@ -21,18 +23,8 @@ new_ids_file = "new.txt"              # IDs you just scraped in your main script
 output_file = "new_unique_ids.txt"    # Output: only IDs that are new
 
 def load_existing_ids(csv_path):
-    existing = set()
-    try:
-        with open(csv_path, "r", encoding="utf-8") as csvfile:
-            reader = csv.reader(csvfile)
-            for row in reader:
-                if row:  # ignore blank rows
-                    existing.add(row[0].strip())
-        print(f"📂 Loaded {len(existing)} IDs from {csv_path}")
-    except FileNotFoundError:
-        print(f"⚠️ File not found: {csv_path}, treating as empty")
-        
-    return existing
+    # Memory-mapped store of the CSV's IDs, rebuilt only when the CSV changes
+    return open_known_ids(csv_path)
 
 # Apple country codes
 COUNTRY_CODES = [
@@ -50,17 +42,17 @@ VALID_FILE = "valid_ids.csv"
 INVALID_FILE = "invalid_ids.txt"
 
 # === Load newly scraped IDs from TXT ===
-def load_new_ids(existing_csv):
+def load_new_ids(txt_path):
     new_ids = set()
     try:
-        with open(existing_csv, "r", encoding="utf-8") as f:
+        with open(txt_path, "r", encoding="utf-8") as f:
             for line in f:
                 line = line.strip()
                 if line:
                     new_ids.add(line)
-        print(f"🆕 Loaded {len(new_ids)} scraped IDs from {existing_csv}")
+        print(f"🆕 Loaded {len(new_ids)} scraped IDs from {txt_path}")
     except FileNotFoundError:
-        print(f"⚠️ File not found: {existing_csv}, treating as empty")
+        print(f"⚠️ File not found: {txt_path}, treating as empty")
     return new_ids
 
 # === Save only unique IDs ===
@@ -81,7 +73,7 @@ def get_pi_headers():
         "Authorization": auth_hash
     }
 
-def check_apple_store(itunes_id, timeout=5, sleep_time=0.5):
+def check_apple_store(itunes_id, timeout=5):
     """
     Check if the podcast exists in any Apple country store
     """
@@ -89,12 +81,12 @@ def check_apple_store(itunes_id, timeout=5, sleep_time=0.5):
     for country in COUNTRY_CODES:
         url = base_url.format(country=country, pid=itunes_id)
         try:
-            r = requests.head(url, timeout=timeout, allow_redirects=True)
+            # Paced per host by the adaptive governor
+            r = http_request("HEAD", url, timeout=timeout, allow_redirects=True)
             if r.status_code == 200:
                 return True
         except requests.RequestException:
             pass
-        time.sleep(sleep_time)  # avoid hitting too hard
     return False
 
 def check_apple_lookup(itunes_id):
@@ -103,7 +95,7 @@ def check_apple_lookup(itunes_id):
     """
     url = f"https://itunes.apple.com/lookup?id={itunes_id}"
     try:
-        r = requests.get(url, timeout=5)
+        r = http_get(url, timeout=5)
         if r.status_code == 200:
             data = r.json()
             if data.get("resultCount", 0) > 0:
@@ -118,7 +110,7 @@ def check_podcastindex(itunes_id):
     """
     url = f"https://api.podcastindex.org/api/1.0/add/byitunesid?id={itunes_id}"
     try:
-        r = requests.post(url, headers=get_pi_headers(), timeout=5)
+        r = http_request("POST", url, headers=get_pi_headers(), timeout=5)
         if r.status_code == 200:
             data = r.json()
             if data.get("status") is True or data.get("feedId"):
@@ -169,7 +161,7 @@ def validate_ids(ids):
 def get_gz_links_from_index(xml_url):
     try:
         print(f"📥 Fetching sitemap index: {xml_url}")
-        r = requests.get(xml_url, timeout=10)
+        r = http_get(xml_url, timeout=10)
         r.raise_for_status()
         soup = BeautifulSoup(r.text, "xml")
         gz_links = [loc.text for loc in soup.find_all("loc") if loc.text.endswith(".gz")]
@@ -180,16 +172,11 @@ def get_gz_links_from_index(xml_url):
         return []
 
 # === Extract podcast IDs directly from .gz file contents ===
-def extract_ids_from_gz(gz_url):
+def extract_ids_from_gz(gz_url, cache=None):
     ids = set()
     try:
         print(f"➡️ Downloading .gz: {gz_url}")
-        r = requests.get(gz_url, timeout=15)
-        r.raise_for_status()
-        with gzip.open(io.BytesIO(r.content), "rt", encoding="utf-8") as f:
-            content = f.read()
-            found = re.findall(r'/id(\d{8,})', content)
-            ids.update(found)
+        ids = stream_shard_ids(get_session(), gz_url, timeout=15, cache=cache, min_len=8, max_len=15)
         print(f"   🎯 Found {len(ids)} IDs in this file")
     except Exception as e:
         print(f"❌ Error processing {gz_url}: {e}")
@@ -202,60 +189,22 @@ def save_ids_to_file(ids, filename="new.txt"):
             f.write(f"{pid}\n")
     print(f"✅ Saved {len(ids)} unique IDs to {filename}")
 
-existing_csv = "../apple_ids.csv"     # CSV with old IDs
-new_ids_file = "new.txt"              # TXT with newly scraped IDs
-output_file = "new_unique_ids.txt"    # Output: only IDs not in CSV
-
-# === Load existing IDs from CSV ===
-def load_existing_ids(csv_path):
-    existing = set()
-    try:
-        with open(csv_path, "r", encoding="utf-8") as csvfile:
-            reader = csv.reader(csvfile)
-            for row in reader:
-                if row:
-                    existing.add(row[0].strip())
-        print(f"📂 Loaded {len(existing)} IDs from {csv_path}")
-    except FileNotFoundError:
-        print(f"⚠️ File not found: {csv_path}, treating as empty")
-    return existing
-
-# === Load new scraped IDs from TXT ===
-def load_new_ids(txt_path):
-    new_ids = set()
-    try:
-        with open(txt_path, "r", encoding="utf-8") as f:
-            for line in f:
-                line = line.strip()
-                if line:
-                    new_ids.add(line)
-        print(f"🆕 Loaded {len(new_ids)} scraped IDs from {txt_path}")
-    except FileNotFoundError:
-        print(f"⚠️ File not found: {txt_path}, treating as empty")
-    return new_ids
-
-# === Save unique IDs to a file ===
-def save_unique_ids(unique_ids, filename):
-    with open(filename, "w", encoding="utf-8") as f:
-        for uid in sorted(unique_ids):
-            f.write(uid + "\n")
-    print(f"✅ Saved {len(unique_ids)} new unique IDs to {filename}")
-
 # === Main ===
 def main():
     existing_ids = load_existing_ids(existing_csv)
 
     # 2. Crawl sitemap and collect all new IDs
     index_url = "https://podcasts.apple.com/sitemaps_podcasts_index_podcast_1.xml"
-    all_ids = set()
     gz_links = get_gz_links_from_index(index_url)
-    for gz_url in gz_links:
-        ids = extract_ids_from_gz(gz_url)
-        all_ids.update(ids)
+    # Unchanged shards come back as 304 and are served from the cache; the rest
+    # are inflated and scanned in one worker process per core
+    cache = ShardCache("shard_cache.db")
+    all_ids, failed = ingest_shards_parallel(gz_links, timeout=15, cache=cache, min_len=8, max_len=15)
+    cache.close()
     print(f"\n🎧 Total IDs found in sitemaps: {len(all_ids)}")
 
     # 3. Keep only IDs not in existing CSV
-    unique_ids = all_ids - existing_ids
+    unique_ids = {str(i) for i in subtract_ids(all_ids, existing_ids)}
     print(f"✨ Found {len(unique_ids)} new IDs not in CSV")
 
     # 4. Save these new unique IDs
@@ -1,10 +1,14 @@
-import requests
-import gzip
-import io
-import csv
+import os
+import sys
 from bs4 import BeautifulSoup
 from datetime import datetime
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from sitemap_ingest import stream_shard_ids, ingest_shards
+from shard_cache import ShardCache
+from http_client import get_session, http_get
+from id_store import open_known_ids
+
 # Path to existing IDs CSV
 EXISTING_CSV = "../apple_ids.csv"
 
@@ -15,25 +19,19 @@ DIFFERENT_FILE = f"different_{timestamp}.txt"
 # Apple sitemap index
 INDEX_URL = "https://podcasts.apple.com/sitemaps_podcasts_index_podcast_1.xml"
 
+# Conditional-GET cache of already downloaded shards
+CACHE_FILE = "shard_cache.db"
+
 
 def load_existing_ids():
-    """Load old IDs from CSV into a set"""
-    existing_ids = set()
-    try:
-        with open(EXISTING_CSV, newline="", encoding="utf-8") as csvfile:
-            reader = csv.reader(csvfile)
-            for row in reader:
-                if row:  # skip empty
-                    existing_ids.add(row[0])
-    except FileNotFoundError:
-        print("⚠️ Existing CSV not found. Starting fresh.")
-    return existing_ids
+    """Open the memory-mapped store of old IDs from the CSV"""
+    return open_known_ids(EXISTING_CSV)
 
 
 def get_gz_links_from_index(xml_url):
     """Fetch sitemap index and extract .gz links"""
     print(f"📥 Fetching sitemap index: {xml_url}")
-    r = requests.get(xml_url, timeout=10)
+    r = http_get(xml_url, timeout=10)
     r.raise_for_status()
     soup = BeautifulSoup(r.text, "xml")
     gz_links = [loc.text for loc in soup.find_all("loc") if loc.text.endswith(".gz")]
@@ -41,26 +39,12 @@ def get_gz_links_from_index(xml_url):
     return gz_links
 
 
-def extract_ids_from_gz(gz_url):
+def extract_ids_from_gz(gz_url, cache=None):
     """Download and extract podcast IDs from .gz"""
     try:
         print(f"🔽 Downloading: {gz_url}")
-        r = requests.get(gz_url, timeout=20)
-        r.raise_for_status()
-        with gzip.GzipFile(fileobj=io.BytesIO(r.content)) as f:
-            content = f.read().decode("utf-8")
-        soup = BeautifulSoup(content, "xml")
-        ids = set()
-
         # Apple podcast URLs look like https://podcasts.apple.com/podcast/id123456789
-        for loc in soup.find_all("loc"):
-            url = loc.text.strip()
-            if "id" in url:
-                try:
-                    podcast_id = url.split("id")[-1]
-                    ids.add(podcast_id)
-                except Exception:
-                    continue
+        ids = stream_shard_ids(get_session(), gz_url, timeout=20, cache=cache)
         print(f"✅ Extracted {len(ids)} IDs")
         return ids
     except Exception as e:
@@ -70,18 +54,16 @@ def extract_ids_from_gz(gz_url):
 
 def main():
     existing_ids = load_existing_ids()
-    print(f"📂 Loaded {len(existing_ids)} existing IDs")
 
     gz_links = get_gz_links_from_index(INDEX_URL)
 
-    all_new_ids = set()
+    # Unchanged shards come back as 304 and are served from the cache
+    cache = ShardCache(CACHE_FILE)
+    all_ids, failed = ingest_shards(gz_links, timeout=20, cache=cache)
+    cache.close()
 
-    for gz in gz_links:
-        ids = extract_ids_from_gz(gz)
-        new_ids = ids - existing_ids
-        if new_ids:
-            print(f"➕ Found {len(new_ids)} new IDs in {gz}")
-            all_new_ids.update(new_ids)
+    all_new_ids = {str(i) for i in existing_ids.missing(all_ids)}
+    print(f"➕ Found {len(all_new_ids)} new IDs across {len(gz_links)} files")
 
     # Save new IDs to text file
     if all_new_ids:
@@ -1,14 +1,17 @@
-import requests
-import gzip
-import io
-import re
+import os
+import sys
 from bs4 import BeautifulSoup
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from sitemap_ingest import stream_shard_ids, ingest_shards
+from shard_cache import ShardCache
+from http_client import get_session, http_get
+
 # === Get all .gz sitemap links from the XML index ===
 def get_gz_links_from_index(xml_url):
     try:
         print(f"📥 Fetching sitemap index: {xml_url}")
-        r = requests.get(xml_url, timeout=10)
+        r = http_get(xml_url, timeout=10)
         r.raise_for_status()
         soup = BeautifulSoup(r.text, "xml")
         gz_links = [loc.text for loc in soup.find_all("loc") if loc.text.endswith(".gz")]
@@ -19,16 +22,11 @@ def get_gz_links_from_index(xml_url):
         return []
 
 # === Extract podcast IDs directly from .gz file contents ===
-def extract_ids_from_gz(gz_url):
+def extract_ids_from_gz(gz_url, cache=None):
     ids = set()
     try:
         print(f"➡️ Downloading .gz: {gz_url}")
-        r = requests.get(gz_url, timeout=15)
-        r.raise_for_status()
-        with gzip.open(io.BytesIO(r.content), "rt", encoding="utf-8") as f:
-            content = f.read()
-            found = re.findall(r'/id(\d{8,})', content)
-            ids.update(found)
+        ids = stream_shard_ids(get_session(), gz_url, timeout=15, cache=cache, min_len=8, max_len=15)
         print(f"   🎯 Found {len(ids)} IDs in this file")
     except Exception as e:
         print(f"❌ Error processing {gz_url}: {e}")
@@ -44,13 +42,13 @@ def save_ids_to_file(ids, filename="new.txt"):
 # === Main ===
 def main():
     index_url = "https://podcasts.apple.com/sitemaps_podcasts_index_podcast_1.xml"
-    all_ids = set()
+    cache = ShardCache("shard_cache.db")
 
     gz_links = get_gz_links_from_index(index_url)
 
-    for gz_url in gz_links:
-        ids = extract_ids_from_gz(gz_url)
-        all_ids.update(ids)
+    # Unchanged shards come back as 304 and are served from the cache
+    all_ids, failed = ingest_shards(gz_links, timeout=15, cache=cache, min_len=8, max_len=15)
+    cache.close()
 
     print(f"\n🎧 Total unique IDs collected: {len(all_ids)}")
     save_ids_to_file(all_ids, "new.txt")
@@ -11,6 +11,8 @@ import os
 
 sys.path.append(os.path.abspath("..")) 
 import password
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from http_client import http_get, http_request
 
 API_KEY = password.API_KEY
 API_SECRET = password.API_SECRET
@@ -46,19 +48,18 @@ def get_pi_headers():
 def check_apple_lookup(itunes_id):
     url = f"https://itunes.apple.com/lookup?id={itunes_id}"
     try:
-        r = requests.get(url, timeout=5)
+        r = http_get(url, timeout=5)
         if r.status_code == 200:
             data = r.json()
             return data.get("resultCount", 0) > 0
     except requests.RequestException:
         pass
-    time.sleep(1)
     return False
 
 def check_podcastindex(itunes_id):
     url = f"https://api.podcastindex.org/api/1.0/add/byitunesid?id={itunes_id}"
     try:
-        r = requests.post(url, headers=get_pi_headers(), timeout=5)
+        r = http_request("POST", url, headers=get_pi_headers(), timeout=5)
         if r.status_code == 200:
             data = r.json()
             return bool(data.get("status") or data.get("feedId"))
@@ -66,17 +67,17 @@ def check_podcastindex(itunes_id):
         pass
     return False
 
-def check_apple_store(itunes_id, timeout=5, sleep_time=1):
+def check_apple_store(itunes_id, timeout=5):
     base_url = "https://podcasts.apple.com/{country}/podcast/id{pid}"
     for country in COUNTRY_CODES:
         url = base_url.format(country=country, pid=itunes_id)
         try:
-            r = requests.head(url, timeout=timeout, allow_redirects=True)
+            # Paced per host by the adaptive governor
+            r = http_request("HEAD", url, timeout=timeout, allow_redirects=True)
             if r.status_code == 200:
                 return True
         except requests.RequestException:
             pass
-        time.sleep(sleep_time)
     return False
 
 def validate_ids(ids, valid_file="valid_ids.txt", invalid_file="invalid_ids.txt"):
@@ -1,33 +1,24 @@
-import requests
-import gzip
-import io
-import re
+import os
+import sys
 import xml.etree.ElementTree as ET
-import csv
 import sqlite3
-from typing import Set, Tuple
-
-def load_existing_csv_ids(csv_path: str) -> Set[str]:
-    """Load existing Apple IDs from CSV file."""
-    existing_ids = set()
-    try:
-        with open(csv_path, "r", encoding="utf-8") as csvfile:
-            reader = csv.reader(csvfile)
-            for row in reader:
-                if row and row[0].strip():  # Check if row exists and first column is not empty
-                    clean_id = row[0].strip()
-                    if clean_id and clean_id.isdigit():  # Only add valid numeric IDs
-                        existing_ids.add(clean_id)
-        print(f"Loaded {len(existing_ids)} existing IDs from CSV")
-    except FileNotFoundError:
-        print(f"CSV file {csv_path} not found. Starting with empty set.")
-    except Exception as e:
-        print(f"Error loading CSV: {e}")
-    return existing_ids
-
-def load_existing_db_ids(db_path: str) -> Set[str]:
-    """Load existing Apple IDs from SQLite database."""
-    existing_ids = set()
+from typing import Set
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from sitemap_ingest import stream_shard_ids, ingest_shards
+from shard_cache import ShardCache
+from http_client import get_session, http_get
+from id_store import KnownIdStore, open_known_ids, as_id_array
+from id_diff import diff_new_ids
+import numpy as np
+
+def load_existing_csv_ids(csv_path: str) -> KnownIdStore:
+    """Open the memory-mapped store of Apple IDs already in the CSV."""
+    return open_known_ids(csv_path)
+
+def load_existing_db_ids(db_path: str) -> np.ndarray:
+    """Load existing Apple IDs from SQLite database as a sorted int64 array."""
+    existing_ids = np.empty(0, dtype=np.int64)
     try:
         conn = sqlite3.connect(db_path)
         cursor = conn.cursor()
@@ -46,10 +37,8 @@ def load_existing_db_ids(db_path: str) -> Set[str]:
               AND itunesId != '0'
         """)
         
-        for row in cursor.fetchall():
-            clean_id = str(row[0]).strip()
-            if clean_id and clean_id.isdigit():  # Only add valid numeric IDs
-                existing_ids.add(clean_id)
+        # Only valid numeric IDs are kept
+        existing_ids = as_id_array(str(row[0]) for row in cursor)
         
         conn.close()
         print(f"Loaded {len(existing_ids)} existing IDs from database")
@@ -61,7 +50,7 @@ def load_existing_db_ids(db_path: str) -> Set[str]:
 def extract_gz_urls(sitemap_url: str) -> Set[str]:
     """Extract .gz URLs from sitemap index."""
     try:
-        response = requests.get(sitemap_url, timeout=30)
+        response = http_get(sitemap_url, timeout=30)
         response.raise_for_status()
         root = ET.fromstring(response.content)
         
@@ -75,39 +64,23 @@ def extract_gz_urls(sitemap_url: str) -> Set[str]:
         print(f"Error extracting .gz URLs from {sitemap_url}: {e}")
         return set()
 
-def decompress_gz_and_parse(gz_url: str) -> Set[Tuple[str, str]]:
-    """Download and parse a .gz sitemap file, returning (itunes_id, url) tuples."""
+def decompress_gz_and_parse(gz_url: str) -> Set[str]:
+    """Stream a .gz sitemap file and return the iTunes IDs in its <loc> tags."""
     try:
-        response = requests.get(gz_url, timeout=60)
-        response.raise_for_status()
-        
-        with gzip.GzipFile(fileobj=io.BytesIO(response.content)) as gz:
-            xml_data = gz.read()
-        
-        root = ET.fromstring(xml_data)
-        results = set()  # Use set to avoid duplicates within this file
-        
-        for loc in root.findall(".//{http://www.sitemaps.org/schemas/sitemap/0.9}loc"):
-            if loc.text:
-                podcast_url = loc.text.strip()
-                match = re.search(r'/id(\d+)', podcast_url)
-                if match:
-                    itunes_id = match.group(1)
-                    # Validate iTunes ID (should be numeric and reasonable length)
-                    if itunes_id.isdigit() and 1 <= len(itunes_id) <= 15:
-                        results.add((itunes_id, podcast_url))
-        
-        return results
+        return stream_shard_ids(get_session(), gz_url)
     except Exception as e:
         print(f"Error parsing {gz_url}: {e}")
         return set()
 
-def write_ids_to_file(filename: str, id_set: Set[str]) -> None:
+def write_ids_to_file(filename: str, id_set) -> None:
     """Write iTunes IDs to file, sorted and deduplicated."""
     try:
         with open(filename, "w", encoding="utf-8") as f:
-            # Sort numerically for better organization
-            sorted_ids = sorted(id_set, key=lambda x: int(x) if x.isdigit() else 0)
+            if isinstance(id_set, np.ndarray):
+                sorted_ids = id_set  # Already sorted by the diff engine
+            else:
+                # Sort numerically for better organization
+                sorted_ids = sorted(id_set, key=lambda x: int(x) if x.isdigit() else 0)
             for itunes_id in sorted_ids:
                 f.write(f"{itunes_id}\n")
         print(f"Successfully wrote {len(id_set)} IDs to {filename}")
@@ -119,6 +92,8 @@ def main():
     CSV_PATH = "../apple_ids.csv"
     DB_PATH = "../using_database/podcastindex_feeds.db"
     SITEMAP_INDEX = 'https://podcasts.apple.com/sitemaps_podcasts_index_podcast_1.xml'
+    MAX_WORKERS = 16  # Concurrent shard downloads
+    CACHE_PATH = "shard_cache.db"  # ETag/Last-Modified + IDs of shards already seen
     
     # Step 1: Load existing IDs
     print("Loading existing IDs...")
@@ -134,39 +109,30 @@ def main():
         print("No .gz files found. Exiting.")
         return
     
-    # Step 3: Extract and deduplicate all iTunes IDs
-    print("Processing .gz files...")
-    all_results = set()  # Global set to avoid duplicates across all files
-    
-    for i, url in enumerate(gz_urls, 1):
-        print(f"Processing file {i}/{len(gz_urls)}: {url}")
-        results = decompress_gz_and_parse(url)
-        
-        # Track duplicates within this file vs global set
-        before_count = len(all_results)
-        all_results.update(results)
-        after_count = len(all_results)
-        new_in_file = after_count - before_count
-        
-        print(f"File {i}: Found {len(results)} podcasts, {new_in_file} new unique IDs")
-    
-    # Step 4: Extract just the iTunes IDs from the result tuples
-    all_ids = {itunes_id for itunes_id, _ in all_results}
+    # Step 3: Stream all shards concurrently and deduplicate the iTunes IDs
+    print(f"Processing .gz files with {MAX_WORKERS} workers...")
+    cache = ShardCache(CACHE_PATH)
+    all_ids, failed_urls = ingest_shards(gz_urls, max_workers=MAX_WORKERS, cache=cache)
+    cache.close()
+    if failed_urls:
+        print(f"⚠️ {len(failed_urls)} .gz files failed:")
+        for url in failed_urls:
+            print(f"   {url}")
     print(f"Total unique iTunes IDs found: {len(all_ids)}")
     
-    # Step 5: Compare and filter (using set operations for efficiency)
-    new_ids_csv_only = all_ids - existing_ids_csv
-    new_ids_db_only = all_ids - existing_ids_db
-    new_ids_both = all_ids - (existing_ids_csv | existing_ids_db)  # Union operation
+    # Step 4: Compare and filter in one vectorized pass over sorted int64 arrays
+    new_ids_csv_only, new_ids_db_only, new_ids_both = diff_new_ids(
+        as_id_array(all_ids), existing_ids_csv, existing_ids_db
+    )
     
 
-    # Step 6: Write results to files
+    # Step 5: Write results to files
     print("Writing results to files...")
     write_ids_to_file("new_ids_not_in_csv.txt", new_ids_csv_only)
     write_ids_to_file("new_ids_not_in_db.txt", new_ids_db_only)
     write_ids_to_file("new_ids_not_in_csv_and_db.txt", new_ids_both)
     
-    # Step 7: Summary
+    # Step 6: Summary
     print("="*50)
     print("SUMMARY:")
     print(f"✅ Total unique iTunes IDs discovered: {len(all_ids):,}")
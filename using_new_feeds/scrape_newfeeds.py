@@ -1,14 +1,15 @@
 import time
 import hashlib
-import requests
 import sys
 import os
-import csv
 
 # Add parent directory to Python path
 sys.path.append(os.path.abspath('..'))
 
 import password  # your password.py must have API_KEY and API_SECRET
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from id_store import open_known_ids
+from http_client import get_session
 
 API_KEY = password.API_KEY
 API_SECRET = password.API_SECRET
@@ -32,7 +33,7 @@ itunes_ids = []
 def get_recent_feeds():
     url = "https://api.podcastindex.org/api/1.0/recent/feeds"
     headers = generate_headers()
-    response = requests.get(url, headers=headers)
+    response = get_session().get(url, headers=headers)
 
     if response.status_code == 200:
         data = response.json()
@@ -60,16 +61,14 @@ old_data = "../apple_ids.csv"
 #     reader = csv.reader(csvfile)
 #     existing_ids = {row[0].strip() for row in reader if row}
 
-with open(old_data, "r", encoding="utf-8") as csvfile:
-    reader = csv.reader(csvfile)
-    existing_ids = [row[0].strip() for row in reader if row]
+known_ids = open_known_ids(old_data)
 
 
 # Convert new itunes_ids to set of strings
 itunes_id_set = set(str(i).strip() for i in itunes_ids)
 
 # Get new IDs that are NOT in the CSV file
-new_ids = itunes_id_set - set(existing_ids)
+new_ids = {str(i) for i in known_ids.missing(itunes_id_set)}
 
 # Output the result
 print(f"Number of NEW IDs not in CSV: {len(new_ids)}")
@@ -5,114 +5,27 @@ import csv
 import json
 from datetime import datetime
 import random
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from podcast_page import (PageLoadStats, enable_fast_mode, fetch_podcast_details, podcast_links,
+                          scrape_podcast_details)
 
-def scrape_podcast_details(page, podcast_url):
-    """Scrape ratings and recent episode date from a specific podcast page"""
-    try:
-        print(f"  🔍 Visiting: {podcast_url}")
-        page.goto(podcast_url, wait_until="networkidle", timeout=10000)
-        time.sleep(random.uniform(1, 2))  # Random delay to be respectful
-        
-        podcast_data = {}
-        
-        # Try to get podcast rating
-        try:
-            # Look for rating elements (Apple uses different selectors)
-            rating_selectors = [
-                ".we-customer-ratings__averages__display",
-                ".we-rating-stars",
-                "[data-test-rating]",
-                ".rating-value"
-            ]
-            
-            rating = None
-            for selector in rating_selectors:
-                if page.locator(selector).count() > 0:
-                    rating_element = page.locator(selector).first
-                    rating_text = rating_element.inner_text().strip()
-                    # Extract numeric rating
-                    rating_match = re.search(r'(\d+\.?\d*)', rating_text)
-                    if rating_match:
-                        rating = float(rating_match.group(1))
-                        break
-            
-            podcast_data['rating'] = rating
-        except Exception as e:
-            print(f"      ⚠️ Could not get rating: {e}")
-            podcast_data['rating'] = None
-        
-        # Try to get recent episode date
-        try:
-            # Look for episode dates (common selectors)
-            date_selectors = [
-                ".episode-date",
-                ".release-date", 
-                "[data-test-episode-date]",
-                ".we-truncate time",
-                "time[datetime]"
-            ]
-            
-            recent_date = None
-            for selector in date_selectors:
-                elements = page.locator(selector)
-                if elements.count() > 0:
-                    # Get the first (most recent) episode date
-                    first_element = elements.first
-                    
-                    # Try to get datetime attribute first
-                    datetime_attr = first_element.get_attribute("datetime")
-                    if datetime_attr:
-                        recent_date = datetime_attr
-                        break
-                    
-                    # Otherwise get text content
-                    date_text = first_element.inner_text().strip()
-                    if date_text:
-                        recent_date = date_text
-                        break
-            
-            podcast_data['recent_episode_date'] = recent_date
-        except Exception as e:
-            print(f"      ⚠️ Could not get recent episode date: {e}")
-            podcast_data['recent_episode_date'] = None
-        
-        # Try to get podcast title for reference
-        try:
-            title_selectors = [
-                "h1.product-header__title",
-                ".we-truncate.we-truncate--single-line h1",
-                "h1"
-            ]
-            
-            title = None
-            for selector in title_selectors:
-                if page.locator(selector).count() > 0:
-                    title = page.locator(selector).first.inner_text().strip()
-                    break
-            
-            podcast_data['title'] = title
-        except Exception as e:
-            print(f"      ⚠️ Could not get title: {e}")
-            podcast_data['title'] = None
-        
-        print(f"      ✅ Rating: {podcast_data['rating']}, Date: {podcast_data['recent_episode_date']}")
-        return podcast_data
-        
-    except Exception as e:
-        print(f"      ❌ Error scraping {podcast_url}: {e}")
-        return {
-            'rating': None,
-            'recent_episode_date': None,
-            'title': None,
-            'error': str(e)
-        }
 
-def scrape_all_sections_with_details(country_code="us", max_podcasts_per_section=None):
+def scrape_all_sections_with_details(country_code="us", max_podcasts_per_section=None, fast=False,
+                                     browser_details=False):
     all_podcast_data = []
+    if browser_details:
+        load_stats = PageLoadStats("fast mode detail pages" if fast else "detail pages")
+    else:
+        load_stats = PageLoadStats("HTTP detail pages")
     
     with sync_playwright() as p:
         browser = p.chromium.launch(headless=False)  # Set to True for headless
         page = browser.new_page()
+        if fast and browser_details:
+            enable_fast_mode(page, load_stats)
         
         # Set a reasonable timeout
         page.set_default_timeout(15000)
@@ -142,47 +55,57 @@ def scrape_all_sections_with_details(country_code="us", max_podcasts_per_section
                 page.wait_for_selector("a[href*='/podcast/']", timeout=5000)
                 time.sleep(1)
 
-                # Get all podcast links in this section
-                html = page.content()
-                podcast_links = re.findall(r'href="([^"]*podcast/[^/]+/id\d+)"', html)
+                # Get all podcast links in this section (deduplicated)
+                unique_links = podcast_links(page)
                 
-                # Remove duplicates and limit if specified
-                unique_links = list(dict.fromkeys(podcast_links))
+                # Limit if specified
                 if max_podcasts_per_section:
                     unique_links = unique_links[:max_podcasts_per_section]
                 
                 print(f"   📦 Found {len(unique_links)} unique podcast links in this section")
 
-                # Visit each podcast page to get details
-                for link_idx, podcast_link in enumerate(unique_links):
-                    try:
-                        # Extract podcast ID from link
-                        id_match = re.search(r'id(\d+)', podcast_link)
-                        podcast_id = id_match.group(1) if id_match else None
-                        
-                        # Make sure link is absolute
-                        if podcast_link.startswith('/'):
-                            full_url = f"https://podcasts.apple.com{podcast_link}"
-                        else:
-                            full_url = podcast_link
-                        
-                        print(f"   🎯 Processing podcast {link_idx + 1}/{len(unique_links)} (ID: {podcast_id})")
-                        
-                        # Scrape podcast details
-                        podcast_data = scrape_podcast_details(page, full_url)
+                # Make sure links are absolute
+                section_podcasts = []
+                for podcast_link in unique_links:
+                    # Extract podcast ID from link
+                    id_match = re.search(r'id(\d+)', podcast_link)
+                    podcast_id = id_match.group(1) if id_match else None
+                    if podcast_link.startswith('/'):
+                        full_url = f"https://podcasts.apple.com{podcast_link}"
+                    else:
+                        full_url = podcast_link
+                    section_podcasts.append((podcast_id, full_url))
+
+                if not browser_details:
+                    # Detail pages are server-rendered: fetch the whole section over HTTP
+                    details = fetch_podcast_details([url for _, url in section_podcasts], stats=load_stats)
+                    for (podcast_id, full_url), podcast_data in zip(section_podcasts, details):
                         podcast_data['id'] = podcast_id
                         podcast_data['section'] = section_title
                         podcast_data['url'] = full_url
                         podcast_data['scraped_at'] = datetime.now().isoformat()
-                        
                         all_podcast_data.append(podcast_data)
+                else:
+                    # Visit each podcast page to get details
+                    for link_idx, (podcast_id, full_url) in enumerate(section_podcasts):
+                        try:
+                            print(f"   🎯 Processing podcast {link_idx + 1}/{len(section_podcasts)} (ID: {podcast_id})")
+                        
+                            # Scrape podcast details
+                            podcast_data = scrape_podcast_details(page, full_url, fast=fast, stats=load_stats)
+                            podcast_data['id'] = podcast_id
+                            podcast_data['section'] = section_title
+                            podcast_data['url'] = full_url
+                            podcast_data['scraped_at'] = datetime.now().isoformat()
+                        
+                            all_podcast_data.append(podcast_data)
                         
-                        # Small delay between podcasts
-                        time.sleep(random.uniform(0.5, 1.5))
+                            # Small delay between podcasts
+                            time.sleep(random.uniform(0.5, 1.5))
                         
-                    except Exception as e:
-                        print(f"      ❌ Error processing podcast {link_idx + 1}: {e}")
-                        continue
+                        except Exception as e:
+                            print(f"      ❌ Error processing podcast {link_idx + 1}: {e}")
+                            continue
                 
                 # Navigate back to charts page for next section
                 print(f"   🔙 Returning to charts page...")
@@ -201,6 +124,7 @@ def scrape_all_sections_with_details(country_code="us", max_podcasts_per_section
         browser.close()
 
     print(f"\n✅ Scraping complete! Collected data for {len(all_podcast_data)} podcasts")
+    load_stats.print_report()
     
     # Save to multiple formats
     save_results(all_podcast_data, country_code)
@@ -242,11 +166,18 @@ if __name__ == "__main__":
     parser.add_argument("--country", default="us", help="Country code (us, uk, ca, etc.)")
     parser.add_argument("--max-per-section", type=int, help="Maximum podcasts to scrape per section")
     parser.add_argument("--headless", action="store_true", help="Run in headless mode")
+    parser.add_argument("--browser-details", action="store_true",
+                        help="Scrape detail pages in the browser instead of over plain HTTP")
+    parser.add_argument("--fast", action="store_true",
+                        help="With --browser-details: block images/media/fonts/third-party scripts "
+                             "and wait only for the fields read")
     
     args = parser.parse_args()
     
     # Run the scraper
     scrape_all_sections_with_details(
         country_code=args.country,
-        max_podcasts_per_section=args.max_per_section
+        max_podcasts_per_section=args.max_per_section,
+        fast=args.fast,
+        browser_details=args.browser_details
     )
\ No newline at end of file
@@ -1,7 +1,11 @@
 from playwright.sync_api import sync_playwright
-import re
+import os
+import sys
 import time
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from id_extract import extract_id_set
+
 def scrape_all_sections(country_code="us"):
     all_ids = set()
     
@@ -30,7 +34,7 @@ def scrape_all_sections(country_code="us"):
             time.sleep(1)  # extra pause to let lazy-loading finish
 
             html = page.content()
-            ids = re.findall(r"/id(\d{8,})", html)
+            ids = extract_id_set(html, min_len=8)
             print(f"   📦 Found {len(ids)} IDs here")
             all_ids.update(ids)
 
@@ -5,122 +5,170 @@ import csv
 import json
 from datetime import datetime
 import random
+import queue
+import threading
+import sys
+import os
 
-def scrape_podcast_details(page, podcast_url):
-    """Scrape ratings and recent episode date from a specific podcast page"""
-    try:
-        print(f"    🔍 Visiting: {podcast_url}")
-        page.goto(podcast_url, wait_until="networkidle", timeout=10000)
-        time.sleep(random.uniform(1, 2))  # Random delay to be respectful
-        
-        podcast_data = {}
-        
-        
-    #Try to get podcast rating
-        try:
-           # Look for rating elements (Apple uses different selectors)
-            rating_selectors = [
-                ".we-customer-ratings__averages__display",
-                ".we-rating-stars",
-                "[data-test-rating]",
-                ".rating-value"
-            ]
-            
-            rating = None
-            for selector in rating_selectors:
-                if page.locator(selector).count() > 0:
-                    rating_element = page.locator(selector).first
-                    rating_text = rating_element.inner_text().strip()
-                   # Extract numeric rating
-                    rating_match = re.search(r'(\d+\.?\d*)', rating_text)
-                    if rating_match:
-                        rating = float(rating_match.group(1))
-                        break
-            
-            podcast_data['rating'] = rating
-        except Exception as e:
-            print(f"      ⚠️ Could not get rating: {e}")
-            podcast_data['rating'] = None
-        
-       # Try to get recent episode date
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from podcast_page import PageLoadStats, enable_fast_mode, fetch_podcast_details, scrape_podcast_details
+from scroll_harvester import ScrollHarvester
+
+
+DETAIL_WORKERS = 4  # Browser pages scraping podcast detail pages in parallel
+
+
+class DetailWorker(threading.Thread):
+    """Scrape podcast detail pages from a shared queue with its own browser.
+
+    Playwright's sync API is bound to the thread that started it, so every
+    worker runs its own sync_playwright instance, browser context and page.
+    A ``None`` on the queue tells the worker to stop.
+    """
+
+    def __init__(self, worker_id, tasks, results, headless=True, fast=False, load_stats=None):
+        super().__init__(name=f"detail-worker-{worker_id}", daemon=True)
+        self.worker_id = worker_id
+        self.tasks = tasks
+        self.results = results
+        self.headless = headless
+        self.fast = fast
+        self.load_stats = load_stats
+        self.scraped = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+
+    def run(self):
         try:
-            #Look for episode dates (common selectors)
-            date_selectors = [
-                ".episode-date",
-                ".release-date", 
-                "[data-test-episode-date]",
-                ".we-truncate time",
-                "time[datetime]"
-            ]
-            
-            recent_date = None
-            for selector in date_selectors:
-                elements = page.locator(selector)
-                if elements.count() > 0:
-                    #Get the first (most recent) episode date
-                    first_element = elements.first
-                    
-                    #Try to get datetime attribute first
-                    datetime_attr = first_element.get_attribute("datetime")
-                    if datetime_attr:
-                        recent_date = datetime_attr
-                        break
-                    
-                    #Otherwise get text content
-                    date_text = first_element.inner_text().strip()
-                    if date_text:
-                        recent_date = date_text
+            with sync_playwright() as p:
+                browser = p.chromium.launch(headless=self.headless)
+                context = browser.new_context()
+                if self.fast:
+                    enable_fast_mode(context, self.load_stats)
+                page = context.new_page()
+                page.set_default_timeout(15000)
+
+                while True:
+                    task = self.tasks.get()
+                    if task is None:
                         break
-            
-            podcast_data['recent_episode_date'] = recent_date
+                    podcast_id, section, full_url = task
+                    if page.is_closed():
+                        page = context.new_page()
+                        page.set_default_timeout(15000)
+
+                    started = time.time()
+                    print(f"   🎯 [worker {self.worker_id}] Processing podcast ID: {podcast_id} ({section})")
+                    podcast_data = scrape_podcast_details(page, full_url, fast=self.fast,
+                                                          stats=self.load_stats)
+                    podcast_data['id'] = podcast_id
+                    podcast_data['section'] = section
+                    podcast_data['url'] = full_url
+                    podcast_data['scraped_at'] = datetime.now().isoformat()
+                    self.results.append(podcast_data)
+
+                    self.scraped += 1
+                    if podcast_data.get('error'):
+                        self.errors += 1
+                    self.busy_seconds += time.time() - started
+
+                    #Small delay between podcasts
+                    time.sleep(random.uniform(0.5, 1.5))
+
+                browser.close()
         except Exception as e:
-            print(f"      ⚠️ Could not get recent episode date: {e}")
-            podcast_data['recent_episode_date'] = None
-        
-       # Try to get podcast title for reference
+            print(f"❌ Worker {self.worker_id} stopped: {e}")
+
+    def print_stats(self):
+        rate = self.scraped / self.busy_seconds * 60 if self.busy_seconds else 0.0
+        print(f"   👷 Worker {self.worker_id}: {self.scraped} pages, {self.errors} errors, "
+              f"{self.busy_seconds:.1f}s busy ({rate:.1f} pages/min)")
+
+
+def collect_section_links(page, charts_url, section_idx, expected_title, section_titles):
+    """Expand one chart section and return (section title, unique podcast links)"""
+    #Always start fresh from charts page
+    print(f"\n🔄 Navigating to charts page for section {section_idx + 1}/{len(section_titles)}")
+    page.goto(charts_url, wait_until="networkidle")
+    time.sleep(2)
+    
+    #Re-locate all buttons
+    buttons = page.locator("button.title__button")
+    current_button_count = buttons.count()
+    
+    if current_button_count != len(section_titles):
+        print(f"⚠️ Button count changed! Expected {len(section_titles)}, found {current_button_count}")
+    
+    #Find the button with matching title
+    target_button = None
+    actual_title = None
+    
+    for i in range(min(current_button_count, len(section_titles))):
         try:
-            title_selectors = [
-                "h1.product-header__title",
-                ".we-truncate.we-truncate--single-line h1",
-                "h1"
-            ]
-            
-            title = None
-            for selector in title_selectors:
-                if page.locator(selector).count() > 0:
-                    title = page.locator(selector).first.inner_text().strip()
-                    break
-            
-            podcast_data['title'] = title
+            btn = buttons.nth(i)
+            title = btn.inner_text().strip()
+            if title == expected_title or i == section_idx:
+                target_button = btn
+                actual_title = title
+                break
         except Exception as e:
-            print(f"      ⚠️ Could not get title: {e}")
-            podcast_data['title'] = None
-        
-        print(f"      ✅ Rating: {podcast_data['rating']}, Date: {podcast_data['recent_episode_date']}")
-        return podcast_data
-        
+            print(f"      ⚠️ Error checking button {i}: {e}")
+            continue
+    
+    if not target_button:
+        print(f"❌ Could not find button for section: {expected_title}")
+        return expected_title, []
+    
+    print(f"➡️ Processing section {section_idx + 1}/{len(section_titles)}: {actual_title}")
+    
+    # Observe the page before expanding so links added by the click are caught too
+    harvester = ScrollHarvester(page, max_links=200).install()
+
+    #Click to expand section
+    target_button.click()
+    
+    #Scroll until the section stops growing (hard limit of 200 links)
+    try:
+        unique_links = harvester.harvest()
     except Exception as e:
-        print(f"      ❌ Error scraping {podcast_url}: {e}")
-        return {
-            'rating': None,
-            'recent_episode_date': None,
-            'title': None,
-            'error': str(e)
-        }
-
-def scrape_all_sections_with_details(country_code="us", max_podcasts_per_section=None):
+        print(f"   ⚠️ No podcast links found in section: {actual_title} - {e}")
+        return actual_title, []
+    
+    return actual_title, unique_links
+
+
+def scrape_all_sections_with_details(country_code="us", max_podcasts_per_section=None,
+                                     headless=False, workers=DETAIL_WORKERS, fast=False,
+                                     browser_details=False):
     all_podcast_data = []
     seen_ids = set()  # Track seen IDs to avoid duplicates
+    start_time = time.time()
+
+    # The browser is only needed to expand chart sections; detail pages are plain
+    # HTTP unless browser_details is set, in which case the worker pool scrapes
+    # them while sections are still being collected
+    tasks = queue.Queue()
+    http_tasks = []
+    if browser_details:
+        load_stats = PageLoadStats("fast mode detail pages" if fast else "detail pages")
+        pool = [DetailWorker(i + 1, tasks, all_podcast_data, headless=headless, fast=fast, load_stats=load_stats)
+                for i in range(workers)]
+    else:
+        load_stats = PageLoadStats("HTTP detail pages")
+        pool = []
+    for worker in pool:
+        worker.start()
     
     with sync_playwright() as p:
-        browser = p.chromium.launch(headless=False)  # Set to True for headless
+        browser = p.chromium.launch(headless=headless)
         page = browser.new_page()
         
         #Set a reasonable timeout
         page.set_default_timeout(15000)
 
         charts_url = f"https://podcasts.apple.com/{country_code}/charts"  
-        print(f"🌐 Starting scrape of {charts_url}")
+        detail_mode = f"{len(pool)} browser detail workers" if pool else "HTTP detail fetching"
+        print(f"🌐 Starting scrape of {charts_url} with {detail_mode}")
         
        # First, get all section titles to process
         page.goto(charts_url, wait_until="networkidle")
@@ -143,84 +191,9 @@ def scrape_all_sections_with_details(country_code="us", max_podcasts_per_section
         #Process each section by title (more reliable than index)
         for section_idx, expected_title in enumerate(section_titles):
             try:
-                #Always start fresh from charts page
-                print(f"\n🔄 Navigating to charts page for section {section_idx + 1}/{len(section_titles)}")
-                page.goto(charts_url, wait_until="networkidle")
-                time.sleep(2)
-                
-                #Re-locate all buttons
-                buttons = page.locator("button.title__button")
-                current_button_count = buttons.count()
-                
-                if current_button_count != len(section_titles):
-                    print(f"⚠️ Button count changed! Expected {len(section_titles)}, found {current_button_count}")
-                
-                #Find the button with matching title
-                target_button = None
-                actual_title = None
-                
-                for i in range(min(current_button_count, len(section_titles))):
-                    try:
-                        btn = buttons.nth(i)
-                        title = btn.inner_text().strip()
-                        if title == expected_title or i == section_idx:
-                            target_button = btn
-                            actual_title = title
-                            break
-                    except Exception as e:
-                        print(f"      ⚠️ Error checking button {i}: {e}")
-                        continue
-                
-                if not target_button:
-                    print(f"❌ Could not find button for section: {expected_title}")
-                    continue
-                
-                print(f"➡️ Processing section {section_idx + 1}/{len(section_titles)}: {actual_title}")
-                
-                #Click to expand section
-                target_button.click()
-                time.sleep(2)  # Wait for expansion
-                
-                #Wait for podcast links to appear
-                try:
-                    # Scroll to load more podcasts
-                    seen_count = 0
-                    max_scroll_attempts = 20  # safety limit
-                    scroll_attempts = 0
-
-                    while True:
-                        # Get current links
-                        html = page.content()
-                        current_links = re.findall(r'href="([^"]*podcast/[^/]+/id\d+)"', html)
-                        current_count = len(set(current_links))
-
-                        # Stop if:
-                        # - no new items loaded after scrolling, OR
-                        # - reached the hard limit of 200
-                        if current_count == seen_count or current_count >= 200:
-                            break
-
-                        seen_count = current_count
-                        scroll_attempts += 1
-                        if scroll_attempts > max_scroll_attempts:
-                            break
-
-                        # Scroll down a bit
-                        page.mouse.wheel(0, 2000)
-                        time.sleep(1.5)  # wait for new content to load
-
-                except Exception as e:
-                    print(f"   ⚠️ No podcast links found in section: {actual_title} - {e}")
-                    continue
-                
-                time.sleep(1)  # Additional wait for content to load
-
-                #Get all podcast links in this section
-                html = page.content()
-                podcast_links = re.findall(r'href="([^"]*podcast/[^/]+/id\d+)"', html)
-                
-                #Remove duplicates and limit if specified
-                unique_links = list(dict.fromkeys(podcast_links))
+                actual_title, unique_links = collect_section_links(
+                    page, charts_url, section_idx, expected_title, section_titles
+                )
                 if max_podcasts_per_section:
                     unique_links = unique_links[:max_podcasts_per_section]
                 
@@ -230,49 +203,36 @@ def scrape_all_sections_with_details(country_code="us", max_podcasts_per_section
                     print(f"   ⚠️ No podcast links found in section: {actual_title}")
                     continue
 
-                #Visit each podcast page to get details
-                for link_idx, podcast_link in enumerate(unique_links):
-                    try:
-                        #Extract podcast ID from link
-                        id_match = re.search(r'id(\d+)', podcast_link)
-                        podcast_id = id_match.group(1) if id_match else None
-                        
-                        if not podcast_id:
-                            print(f"      ⚠️ Could not extract ID from: {podcast_link}")
-                            continue
-                        
-                        #Skip if we've already seen this ID
-                        if podcast_id in seen_ids:
-                            print(f"      ⏭️ Skipping duplicate ID: {podcast_id}")
-                            continue
-                        
-                        #Make sure link is absolute
-                        if podcast_link.startswith('/'):
-                            full_url = f"https://podcasts.apple.com{podcast_link}"
-                        else:
-                            full_url = podcast_link
-                        
-                        print(f"   🎯 Processing podcast {link_idx + 1}/{len(unique_links)} (ID: {podcast_id})")
-                        
-                       # Scrape podcast details
-                        podcast_data = scrape_podcast_details(page, full_url)
-                        podcast_data['id'] = podcast_id
-                        podcast_data['section'] = actual_title
-                        podcast_data['url'] = full_url
-                        podcast_data['scraped_at'] = datetime.now().isoformat()
-                        
-                        #Add to our data and mark as seen
-                        all_podcast_data.append(podcast_data)
-                        seen_ids.add(podcast_id)
-                        
-                        #Small delay between podcasts
-                        time.sleep(random.uniform(0.5, 1.5))
-                        
-                    except Exception as e:
-                        print(f"      ❌ Error processing podcast {link_idx + 1}: {e}")
+                #Queue each podcast page for the detail workers
+                queued = 0
+                for podcast_link in unique_links:
+                    #Extract podcast ID from link
+                    id_match = re.search(r'id(\d+)', podcast_link)
+                    podcast_id = id_match.group(1) if id_match else None
+                    
+                    if not podcast_id:
+                        print(f"      ⚠️ Could not extract ID from: {podcast_link}")
                         continue
+                    
+                    #Skip if we've already seen this ID
+                    if podcast_id in seen_ids:
+                        continue
+                    seen_ids.add(podcast_id)
+                    
+                    #Make sure link is absolute
+                    if podcast_link.startswith('/'):
+                        full_url = f"https://podcasts.apple.com{podcast_link}"
+                    else:
+                        full_url = podcast_link
+                    
+                    if pool:
+                        tasks.put((podcast_id, actual_title, full_url))
+                    else:
+                        http_tasks.append((podcast_id, actual_title, full_url))
+                    queued += 1
                 
-                print(f"   ✅ Completed section: {actual_title} ({len([d for d in all_podcast_data if d['section'] == actual_title])} podcasts)")
+                print(f"   ✅ Queued section: {actual_title} ({queued} new podcasts, "
+                      f"{len(unique_links) - queued} duplicates skipped)")
                 
             except Exception as e:
                 print(f"❌ Error processing section {section_idx + 1} ({expected_title}): {e}")
@@ -280,7 +240,26 @@ def scrape_all_sections_with_details(country_code="us", max_podcasts_per_section
 
         browser.close()
 
-    print(f"\n✅ Scraping complete! Collected data for {len(all_podcast_data)} podcasts")
+    # One stop marker per worker, then wait for the queue to drain
+    for _ in pool:
+        tasks.put(None)
+    for worker in pool:
+        worker.join()
+
+    if http_tasks:
+        details = fetch_podcast_details([url for _, _, url in http_tasks], stats=load_stats)
+        for (podcast_id, section, full_url), podcast_data in zip(http_tasks, details):
+            podcast_data['id'] = podcast_id
+            podcast_data['section'] = section
+            podcast_data['url'] = full_url
+            podcast_data['scraped_at'] = datetime.now().isoformat()
+            all_podcast_data.append(podcast_data)
+
+    elapsed = time.time() - start_time
+    print(f"\n✅ Scraping complete! Collected data for {len(all_podcast_data)} podcasts in {elapsed:.1f}s")
+    for worker in pool:
+        worker.print_stats()
+    load_stats.print_report()
     
     #Save to multiple formats
     save_results(all_podcast_data, country_code)
@@ -322,13 +301,24 @@ if __name__ == "__main__":
     parser.add_argument("--country", default="us", help="Country code (us, uk, ca, etc.)")
     parser.add_argument("--max-per-section", type=int, help="Maximum podcasts to scrape per section")
     parser.add_argument("--headless", action="store_true", help="Run in headless mode")
+    parser.add_argument("--workers", type=int, default=DETAIL_WORKERS,
+                        help="Browser pages scraping detail pages in parallel")
+    parser.add_argument("--browser-details", action="store_true",
+                        help="Scrape detail pages in browser workers instead of over plain HTTP")
+    parser.add_argument("--fast", action="store_true",
+                        help="With --browser-details: block images/media/fonts/third-party scripts "
+                             "and wait only for the fields read")
     
     args = parser.parse_args()
     
     #Run the scraper
     scrape_all_sections_with_details(
         country_code=args.country,
-        max_podcasts_per_section=args.max_per_section
+        max_podcasts_per_section=args.max_per_section,
+        headless=args.headless,
+        workers=max(1, args.workers),
+        fast=args.fast,
+        browser_details=args.browser_details
     )
 # import requests
 # import re
@@ -1,56 +1,39 @@
 # Inserting values with validation into varchar to avoid taking string entry
 
-import pandas as pd
 import mysql.connector
 import password
+from bulk_load import load_csv_ids
 
-# Step 1: Read CSV
-df = pd.read_csv("apple_ids.csv", dtype=str)
-print("Columns found:", df.columns)
-
-
-if df.columns[0].startswith("Unnamed"):
-    df.columns = ["apple_id"]
-
-# Step 1.5: Validate and store invalid entries
+# Invalid entries are collected here while the CSV is validated chunk by chunk
 skipped_entries = []
 
-def is_valid_apple_id(val):
-    if isinstance(val, str) and val.isdigit() and len(val) <= 20:
-        return True
-    skipped_entries.append(val)
-    return False
-
-valid_df = df[df['apple_id'].apply(is_valid_apple_id)]
-
-print(f"✅ Valid apple_ids found: {len(valid_df)}")
-print(f"❌ Skipped invalid entries: {len(skipped_entries)}")
-
-# Step 2: Connect to DB
+# Step 1: Connect to DB
 conn = mysql.connector.connect(
     host="localhost",
     user="root",
     password=password.Password,
-    database="store"
+    database="store",
+    allow_local_infile=True
 )
-cursor = conn.cursor()
 
-# Step 3: Insert clean data
-insert_query = "INSERT IGNORE INTO podcast (apple_id) VALUES (%s)"
-data = [(row['apple_id'],) for _, row in valid_df.iterrows()]
-cursor.executemany(insert_query, data)
-conn.commit()
+# Step 2: Validate and bulk insert clean data
+stats = load_csv_ids(conn, "apple_ids.csv", "podcast", rejects=skipped_entries, as_text=True)
 
-# Step 4: Final count
+print(f"✅ Valid apple_ids found: {stats.staged}")
+print(f"❌ Skipped invalid entries: {stats.invalid}")
+stats.print_report()
+
+# Step 3: Final count
+cursor = conn.cursor()
 cursor.execute("SELECT COUNT(*) FROM podcast")
 count = cursor.fetchone()[0]
 print(f"✅ Total apple_ids in table: {count}")
 
-# Step 5: Show skipped values
+# Step 4: Show skipped values
 if skipped_entries:
     print("\n❌ Skipped apple_ids:")
-    for s in skipped_entries:
-        print(f" - {s}")
+    for value, reason in skipped_entries:
+        print(f" - {value} ({reason})")
 
 # Cleanup
 cursor.close()